@@ -33,18 +33,24 @@ using version 8001 of the header from file:
 """
 
 __authors__ = ["Antonino Miceli", "Jon Wright", "Jérôme Kieffer", "Joel Bernier"]
-__date__ = "23/06/2026"
+__date__ = "17/10/2026"
 __status__ = "production"
 __copyright__ = "2007-2020 APS; 2010-2020 ESRF"
 __licence__ = "MIT"
 
 import io
+import os
+import logging
 import numpy
 import struct
 from .edfimage import EdfImage
-from .fabioimage import FabioImage
+from .fabioimage import FabioImage, RawLayout
+from . import fabioutils
 from .fabioutils import next_filename, previous_filename
 from .openimage import MAGIC_NUMBERS
+from .utils import instrumentation
+
+logger = logging.getLogger(__name__)
 
 EDF_MAGIC_NUMBERS = [(x, y) for x, y in MAGIC_NUMBERS if y == "edf"]
 
@@ -238,6 +244,14 @@ class GeImage(FabioImage):
     the GE detectors that are missing the magic bytes and header.
     """
 
+    def __init__(self, *args, **kwargs):
+        FabioImage.__init__(self, *args, **kwargs)
+        self.dataset = None
+        """Stack of all the frames of the sequence file as a
+        (nframes, rows, cols) :class:`numpy.memmap`, when the file was read
+        with `use_mmap`, else None. Frames and slices of frames taken from
+        it are not copied."""
+
     def _readheader(self, infile):
         """Read a GE image header."""
 
@@ -294,12 +308,22 @@ class GeImage(FabioImage):
         self.resetvals()
         infile = self._open(fname, "rb")
         self.sequencefilename = fname
-        self._readheader(infile)
+        with instrumentation.stage("header", self.codec_name(), fname):
+            self._readheader(infile)
         self._nframes = self.header["NumberOfFrames"]
+        self.dataset = None
+        if self.use_mmap and isinstance(infile, fabioutils.File):
+            with instrumentation.stage("mmap", self.codec_name(), fname) as st:
+                self.dataset = self._map_frames(fname)
+                if self.dataset is not None:
+                    st.nbytes = self.dataset.nbytes
         self._readframe(infile, frame)
         infile.close()
         return self
 
+    def _get_cache_filename(self):
+        return getattr(self, "sequencefilename", None)
+
     def _makeframename(self):
         """
         Represent a frame.
@@ -309,18 +333,15 @@ class GeImage(FabioImage):
         """
         self.filename = "%s$%04d" % (self.sequencefilename, self.currentframe)
 
-    def _readframe(self, filepointer, img_num):
+    def _locate_frame(self, img_num):
         """
-        Load only one image from the file.
+        Position of a frame in the file.
 
-        The first image in the sequence 0; raises an exception if you give an
-        invalid image index, otherwise fills in self.data.
-
-        :param filepointer: Pointer to the input file stream
         :param int img_num: Number of the frame (0 = 1st frame)
+        :return: offset, shape and datatype of the frame
         :raises: IndexError if the requested frame number is outside of the
             available frames
-        :raises: IOError if there is problem to decode or read the frame
+        :raises: IOError if the pixel format is not supported
         """
         if not (0 <= img_num < self.nframes):
             raise IndexError("Bad image number")
@@ -333,16 +354,91 @@ class GeImage(FabioImage):
 
         imglength = cols * rows * (bitdepth // 8)
         imgstart = standard_header_size + user_header_size + img_num * imglength
-        filepointer.seek(imgstart, io.SEEK_SET)
 
         datatype = self.BITDEPTH_TO_DATATYPES.get(bitdepth, None)
         if datatype is None:
             raise IOError("Data depth format %sbits is not supported" % bitdepth)
+        return imgstart, (rows, cols), datatype
+
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels of a frame of the file."""
+        if frame is None:
+            frame = 0
+        self.header = self.check_header()
+        self.resetvals()
+        self.sequencefilename = infile.name
+        self._readheader(infile)
+        self._nframes = self.header["NumberOfFrames"]
+        offset, shape, datatype = self._locate_frame(frame)
+        self.currentframe = int(frame)
+        self._makeframename()
+        stype = self.get_stype(datatype, "little")
+        return RawLayout(offset, shape, stype, numpy.dtype(datatype))
 
-        raw = filepointer.read(imglength)
-        data = numpy.frombuffer(raw, self.get_stype(datatype, "little")).copy()
-        data = data.reshape(rows, cols)
-        self.data = data
+    def _map_frames(self, fname):
+        """
+        Map all the frames of the file into memory, without copy.
+
+        :param str fname: name of the (uncompressed) sequence file
+        :return: numpy.memmap (copy-on-write) with shape (nframes, rows, cols)
+            or None if the frames can not be mapped
+        """
+        if self.nframes < 1:
+            return None
+        offset, (rows, cols), datatype = self._locate_frame(0)
+        stype = numpy.dtype(self.get_stype(datatype, "little"))
+        if not stype.isnative:
+            # a non-native map would have to be converted frame per frame
+            return None
+        framesize = rows * cols * stype.itemsize
+        available = (os.path.getsize(fname) - offset) // framesize
+        nframes = min(self.nframes, available)
+        if nframes < self.nframes:
+            logger.warning(
+                "%s is truncated: %s frames declared, %s available",
+                fname,
+                self.nframes,
+                nframes,
+            )
+        if nframes < 1:
+            return None
+        try:
+            return numpy.memmap(
+                fname, dtype=stype, mode="c", offset=offset, shape=(nframes, rows, cols)
+            )
+        except (ValueError, OSError) as error:
+            logger.debug("Unable to map %s: %s", fname, error)
+            return None
+
+    def _readframe(self, filepointer, img_num):
+        """
+        Load only one image from the file.
+
+        The first image in the sequence 0; raises an exception if you give an
+        invalid image index, otherwise fills in self.data.
+
+        :param filepointer: Pointer to the input file stream
+        :param int img_num: Number of the frame (0 = 1st frame)
+        :raises: IndexError if the requested frame number is outside of the
+            available frames
+        :raises: IOError if there is problem to decode or read the frame
+        """
+        imgstart, shape, datatype = self._locate_frame(img_num)
+        if self.dataset is not None and img_num < len(self.dataset):
+            self.data = self.dataset[img_num]
+        else:
+            filepointer.seek(imgstart, io.SEEK_SET)
+            rows, cols = shape
+            imglength = rows * cols * numpy.dtype(datatype).itemsize
+
+            codec = self.codec_name()
+            with instrumentation.stage("io", codec, self.sequencefilename) as st:
+                raw = filepointer.read(imglength)
+                st.nbytes = len(raw)
+            with instrumentation.stage("convert", codec, self.sequencefilename, len(raw)):
+                data = numpy.frombuffer(raw, self.get_stype(datatype, "little")).copy()
+                data = data.reshape(rows, cols)
+            self.data = data
         self._shape = None
         self.currentframe = int(img_num)
         self._makeframename()
@@ -359,6 +455,12 @@ class GeImage(FabioImage):
         # ??? isn't this a single frame by contruction?
         frame._nframes = self.nframes
         frame.sequencefilename = self.sequencefilename
+        frame.use_mmap = self.use_mmap
+        if self.dataset is not None and num < len(self.dataset):
+            # Served from the map of the file, no read needed
+            frame.dataset = self.dataset
+            frame._readframe(None, num)
+            return frame
         infile = frame._open(self.sequencefilename, "rb")
         frame._readframe(infile, num)
         infile.close()
@@ -45,7 +45,7 @@ Authors:
 __contact__ = "Jerome.Kieffer@esrf.fr"
 __license__ = "MIT"
 __copyright__ = "Jérôme Kieffer"
-__date__ = "17/06/2026"
+__date__ = "17/10/2026"
 
 import time
 import logging
@@ -53,8 +53,9 @@ import struct
 import numpy
 from numpy import rad2deg, deg2rad
 from .fabioimage import FabioImage
-from .compression import decTY1, compTY1
+from .compression import decTY1, compTY1, decTY5, compTY5
 from .fabioutils import to_str
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -254,8 +255,10 @@ class OxdImage(FabioImage):
         """
         self.header = self.check_header()
         self.resetvals()
+        codec = self.codec_name()
         with self._open(fname) as infile:
-            self._readheader(infile)
+            with instrumentation.stage("header", codec, fname):
+                self._readheader(infile)
 
             infile.seek(self.header["Header Size In Bytes"])
 
@@ -271,36 +274,47 @@ class OxdImage(FabioImage):
 
             if self.header["Compression"] == "TY1":
                 logger.debug("Compressed with the KM4CCD compression")
-                raw8 = infile.read(dim1 * dim2)
-                raw16 = None
-                raw32 = None
-                if self.header["OI"] > 0:
-                    raw16 = infile.read(self.header["OI"] * 2)
-                if self.header["OL"] > 0:
-                    raw32 = infile.read(self.header["OL"] * 4)
+                with instrumentation.stage("io", codec, fname) as st:
+                    raw8 = infile.read(dim1 * dim2)
+                    raw16 = None
+                    raw32 = None
+                    if self.header["OI"] > 0:
+                        raw16 = infile.read(self.header["OI"] * 2)
+                    if self.header["OL"] > 0:
+                        raw32 = infile.read(self.header["OL"] * 4)
+                    st.nbytes = len(raw8) + len(raw16 or b"") + len(raw32 or b"")
 
                 # endianess is handled at the decompression level
-                raw_data = decTY1(raw8, raw16, raw32)
+                with instrumentation.stage("decompress", codec, fname, st.nbytes):
+                    raw_data = decTY1(raw8, raw16, raw32)
             elif self.header["Compression"] == "TY5":
-                logger.info("Compressed with the TY5 compression")
-                dtype = numpy.dtype(numpy.int8)
-                raw8 = infile.read(dim1 * dim2)
-
-                if self.header["OI"] > 0:
-                    self.raw16 = infile.read(self.header["OI"] * 2)
-                else:
-                    self.raw16 = b""
-                if self.header["OL"] > 0:
-                    self.raw32 = infile.read(self.header["OL"] * 4)
-                else:
-                    self.raw32 = b""
-                self.rest = infile.read()
-                self.blob = raw8 + self.raw16 + self.raw32 + self.rest
-                raw_data = self.dec_TY5(raw8 + self.raw16 + self.raw32)
+                logger.debug("Compressed with the TY5 compression")
+                # exceptions are inlined: 2 or 4 extra bytes each
+                size8 = dim1 * dim2
+                size16 = max(self.header["OI"], 0) * 2
+                size32 = max(self.header["OL"], 0) * 4
+                with instrumentation.stage("io", codec, fname) as st:
+                    self.blob = infile.read()
+                    st.nbytes = len(self.blob)
+                self.raw16 = self.blob[size8 : size8 + size16]
+                self.raw32 = self.blob[size8 + size16 : size8 + size16 + size32]
+                self.rest = self.blob[size8 + size16 + size32 :]
+                raw_data = numpy.zeros(dim1 * dim2, dtype=numpy.int32)
+                with instrumentation.stage("decompress", codec, fname, st.nbytes):
+                    decoded = decTY5(
+                        memoryview(self.blob)[: size8 + size16 + size32], width=dim1, out=raw_data
+                    )
+                if decoded.size < raw_data.size:
+                    logger.warning("TY5 data truncated in %s", fname)
             else:
                 dtype = numpy.dtype(numpy.int32)
                 nbytes = dim1 * dim2 * dtype.itemsize
-                raw_data = numpy.frombuffer(infile.read(nbytes), self.get_stype(dtype, "little")).astype(dtype)
+                with instrumentation.stage("io", codec, fname) as st:
+                    raw = infile.read(nbytes)
+                    st.nbytes = len(raw)
+                with instrumentation.stage("convert", codec, fname, len(raw)):
+                    raw_data = numpy.frombuffer(raw, self.get_stype(dtype, "little"))
+                    raw_data = raw_data.astype(dtype)
 
         logger.debug("OVER_SHORT2: %s", raw_data.dtype)
         logger.debug("%s" % (raw_data < 0).sum())
@@ -540,21 +554,23 @@ class OxdImage(FabioImage):
 
     def write(self, fname):
         """Write Oxford diffraction images: this is still beta
-        Only TY1 compressed images is currently possible
+        Only TY1 and TY5 compressed images are currently possible
         :param fname: output filename
         """
-        if self.header.get("Compression") != "TY1":
-            logger.warning("Enforce TY1 compression")
-            self.header["Compression"] = "TY1"
-
-        datablock8, datablock16, datablock32 = compTY1(self.data)
-        self.header["OI"] = len(datablock16) // 2
-        self.header["OL"] = len(datablock32) // 4
+        if self.header.get("Compression") == "TY5":
+            datablock, self.header["OI"], self.header["OL"] = compTY5(self.data)
+            datablocks = [datablock]
+        else:
+            if self.header.get("Compression") != "TY1":
+                logger.warning("Enforce TY1 compression")
+                self.header["Compression"] = "TY1"
+            datablocks = compTY1(self.data)
+            self.header["OI"] = len(datablocks[1]) // 2
+            self.header["OL"] = len(datablocks[2]) // 4
         with self._open(fname, mode="wb") as outfile:
             outfile.write(self._writeheader())
-            outfile.write(datablock8)
-            outfile.write(datablock16)
-            outfile.write(datablock32)
+            for datablock in datablocks:
+                outfile.write(datablock)
 
     def getCompressionRatio(self):
         "calculate the compression factor obtained vs raw data"
@@ -578,46 +594,8 @@ class OxdImage(FabioImage):
         :param stream: input stream
         :return: 1D array with data
         """
-        logger.info("TY5 decompression is slow for now")
         array_size = self._shape[0] * self._shape[1]
-        stream_size = len(stream)
-        data = numpy.zeros(array_size)
-        raw = numpy.frombuffer(stream, dtype=numpy.uint8)
-        pos_inp = pos_out = current = ex1 = ex2 = 0
-
-        dim2 = self._shape[0]
-        while pos_inp < stream_size and pos_out < array_size:
-            if pos_out % dim2 == 0:
-                last = numpy.int64(0)
-            else:
-                last = current
-            value = raw[pos_inp]
-            if value < 254:
-                # this is the normal case
-                # 1 bytes encode one pixel
-                current = last + value - 127
-                pos_inp += 1
-            elif value == 254:
-                ex1 += 1
-                # this is the special case 1:
-                # if the marker 254 is found the next 2 bytes encode one pixel
-                value = raw[pos_inp + 1 : pos_inp + 3].view(LE_int16)
-                current = last + value[0]
-                pos_inp += 3
-
-            elif value == 255:
-                # this is the special case 2:
-                # if the marker 255 is found the next 4 bytes encode one pixel
-                ex2 += 1
-                logger.info("special case 32 bits.")
-                value = raw[pos_inp + 1 : pos_inp + 5].view(LE_int32)
-                current = last + value[0]
-                pos_inp += 5
-            data[pos_out] = current
-            pos_out += 1
-
-        logger.info("TY5: Exception: 16bits: %s, 32bits: %s", ex1, ex2)
-        return data
+        return decTY5(stream, array_size, self._shape[1])
 
 
 OXDimage = OxdImage
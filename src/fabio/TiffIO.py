@@ -27,14 +27,18 @@ __author__ = "V.A. Sole - ESRF"
 __contact__ = "sole@esrf.fr"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "17/06/2026"
+__date__ = "17/10/2026"
 
 import sys
 import os
 import struct
 import numpy
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from .fabioimage import FabioImage
+from .compression import decPackBits
+from .utils import instrumentation
 
 ALLOW_MULTIPLE_STRIPS = False
 
@@ -114,7 +118,15 @@ logger = logging.getLogger(__name__)
 
 
 class TiffIO(object):
-    def __init__(self, filename, mode=None, cache_length=20, mono_output=False):
+    def __init__(
+        self,
+        filename,
+        mode=None,
+        cache_length=20,
+        mono_output=False,
+        workers=None,
+        codec_name="TiffIO",
+    ):
         if mode is None:
             mode = "rb"
         if "b" not in mode:
@@ -136,6 +148,10 @@ class TiffIO(object):
         self._initInternalVariables(fd)
         self._maxImageCacheLength = cache_length
         self._forceMonoOutput = mono_output
+        # number of threads used to read and decode the strips of an image
+        self._workers = workers
+        # name of the codec reported to the instrumentation of the reads
+        self.codecName = codec_name
 
     def __enter__(self):
         return self
@@ -355,6 +371,108 @@ class TiffIO(object):
                 output = cleaned_output
         return output
 
+    def _getStripReader(self, fd):
+        """Returns a function reading `nBytes` at `offset` from `fd`, which
+        can be called from several threads."""
+        fileno = None
+        if hasattr(os, "pread"):
+            try:
+                fileno = fd.fileno()
+            except Exception:
+                # BytesIO and other in-memory streams
+                fileno = None
+        if fileno is not None:
+            if getattr(fd, "writable", lambda: False)():
+                fd.flush()
+
+            def readBytes(offset, nBytes):
+                return os.pread(fileno, nBytes, offset)
+
+        else:
+            lock = threading.Lock()
+
+            def readBytes(offset, nBytes):
+                with lock:
+                    fd.seek(offset)
+                    return fd.read(nBytes)
+
+        return readBytes
+
+    @staticmethod
+    def _getDtype(nBits, sampleFormat):
+        """Returns the numpy dtype of the samples"""
+        if sampleFormat == SAMPLE_FORMAT_FLOAT:
+            if nBits == 32:
+                dtype = numpy.float32
+            elif nBits == 64:
+                dtype = numpy.float64
+            else:
+                raise ValueError("Unsupported number of bits for a float: %d" % nBits)
+        elif sampleFormat in [SAMPLE_FORMAT_UINT, SAMPLE_FORMAT_VOID]:
+            if nBits in [8, (8, 8, 8), [8, 8, 8]]:
+                dtype = numpy.uint8
+            elif nBits in [16, (16, 16, 16), [16, 16, 16]]:
+                dtype = numpy.uint16
+            elif nBits in [32, (32, 32, 32), [32, 32, 32]]:
+                dtype = numpy.uint32
+            elif nBits in [64, (64, 64, 64), [64, 64, 64]]:
+                dtype = numpy.uint64
+            else:
+                raise ValueError(
+                    "Unsupported number of bits for unsigned int: %s" % (nBits,)
+                )
+        elif sampleFormat == SAMPLE_FORMAT_INT:
+            if nBits in [8, (8, 8, 8), [8, 8, 8]]:
+                dtype = numpy.int8
+            elif nBits in [16, (16, 16, 16), [16, 16, 16]]:
+                dtype = numpy.int16
+            elif nBits in [32, (32, 32, 32), [32, 32, 32]]:
+                dtype = numpy.int32
+            elif nBits in [64, (64, 64, 64), [64, 64, 64]]:
+                dtype = numpy.int64
+            else:
+                raise ValueError(
+                    "Unsupported number of bits for signed int: %s" % (nBits,)
+                )
+        else:
+            raise ValueError(
+                "Unsupported combination. Bits = %s  Format = %d"
+                % (nBits, sampleFormat)
+            )
+        return dtype
+
+    def getRawLayout(self, nImage):
+        """Locate the pixels of an image stored uncompressed in a single block
+
+        :param int nImage: index of the image
+        :return: (offset, shape, stype, dtype) or None for compressed,
+            palette, multi-sample or non contiguous images
+        """
+        if nImage >= len(self._IFD):
+            self._updateIFD()
+        oldMono = self._forceMonoOutput
+        self._forceMonoOutput = False
+        try:
+            info = self._readInfo(nImage, close=False)
+        finally:
+            self._forceMonoOutput = oldMono
+        if info["compression"] or info["colormap"] is not None:
+            return None
+        nBits = info["nBits"]
+        if hasattr(nBits, "index"):
+            return None
+        dtype = numpy.dtype(self._getDtype(nBits, info["sampleFormat"]))
+        shape = info["nRows"], info["nColumns"]
+        stripOffsets = info["stripOffsets"]
+        stripByteCounts = info["stripByteCounts"]
+        for i in range(1, len(stripOffsets)):
+            if stripOffsets[i] != stripOffsets[i - 1] + stripByteCounts[i - 1]:
+                return None
+        if sum(stripByteCounts) < shape[0] * shape[1] * dtype.itemsize:
+            return None
+        stype = FabioImage.get_stype(dtype, self._structChar)
+        return stripOffsets[0], shape, stype, dtype
+
     def getData(self, nImage, **kw):
         if nImage >= len(self._IFD):
             # update prior to raise an index error error
@@ -662,44 +780,7 @@ class TiffIO(object):
         if rowMax >= nRows:
             raise IndexError("Image only has %d rows" % nRows)
 
-        if sampleFormat == SAMPLE_FORMAT_FLOAT:
-            if nBits == 32:
-                dtype = numpy.float32
-            elif nBits == 64:
-                dtype = numpy.float64
-            else:
-                raise ValueError("Unsupported number of bits for a float: %d" % nBits)
-        elif sampleFormat in [SAMPLE_FORMAT_UINT, SAMPLE_FORMAT_VOID]:
-            if nBits in [8, (8, 8, 8), [8, 8, 8]]:
-                dtype = numpy.uint8
-            elif nBits in [16, (16, 16, 16), [16, 16, 16]]:
-                dtype = numpy.uint16
-            elif nBits in [32, (32, 32, 32), [32, 32, 32]]:
-                dtype = numpy.uint32
-            elif nBits in [64, (64, 64, 64), [64, 64, 64]]:
-                dtype = numpy.uint64
-            else:
-                raise ValueError(
-                    "Unsupported number of bits for unsigned int: %s" % (nBits,)
-                )
-        elif sampleFormat == SAMPLE_FORMAT_INT:
-            if nBits in [8, (8, 8, 8), [8, 8, 8]]:
-                dtype = numpy.int8
-            elif nBits in [16, (16, 16, 16), [16, 16, 16]]:
-                dtype = numpy.int16
-            elif nBits in [32, (32, 32, 32), [32, 32, 32]]:
-                dtype = numpy.int32
-            elif nBits in [64, (64, 64, 64), [64, 64, 64]]:
-                dtype = numpy.int64
-            else:
-                raise ValueError(
-                    "Unsupported number of bits for signed int: %s" % (nBits,)
-                )
-        else:
-            raise ValueError(
-                "Unsupported combination. Bits = %s  Format = %d"
-                % (nBits, sampleFormat)
-            )
+        dtype = self._getDtype(nBits, sampleFormat)
         if hasattr(nBits, "index"):
             image = numpy.zeros((nRows, nColumns, len(nBits)), dtype=dtype)
         elif colormap is not None and interpretation == 3:
@@ -718,7 +799,7 @@ class TiffIO(object):
         ]  # bytes in strip since I do not support compression
 
         rowStart = 0
-        if len(stripOffsets) == 1:
+        if len(stripOffsets) == 1 and not compression:
             bytesPerRow = int(stripByteCounts[0] / rowsPerStrip)
             nBytes = stripByteCounts[0]
             if nRows == rowsPerStrip:
@@ -727,18 +808,23 @@ class TiffIO(object):
                     logger.warning("Bogus StripByteCounts information")
                     bytesPerRow = actualBytesPerRow
                     nBytes = (rowMax - rowMin + 1) * bytesPerRow
-            fd.seek(stripOffsets[0] + rowMin * bytesPerRow)
-            stype = FabioImage.get_stype(dtype, self._structChar)
-            readout = numpy.frombuffer(fd.read(nBytes), stype).astype(dtype)
-            if hasattr(nBits, "index"):
-                readout = readout.reshape(-1, nColumns, len(nBits))
-            elif info["colormap"] is not None and interpretation == 3:
-                readout = colormap[readout]
-                readout = readout.reshape(-1, nColumns, 3)
-            else:
-                readout = readout.reshape(-1, nColumns)
-            image[...] = readout
+            with instrumentation.stage("io", self.codecName, fd) as st:
+                fd.seek(stripOffsets[0] + rowMin * bytesPerRow)
+                buffer = fd.read(nBytes)
+                st.nbytes = len(buffer)
+            with instrumentation.stage("convert", self.codecName, fd, image.nbytes):
+                stype = FabioImage.get_stype(dtype, self._structChar)
+                readout = numpy.frombuffer(buffer, stype).astype(dtype)
+                if hasattr(nBits, "index"):
+                    readout = readout.reshape(-1, nColumns, len(nBits))
+                elif info["colormap"] is not None and interpretation == 3:
+                    readout = colormap[readout]
+                    readout = readout.reshape(-1, nColumns, 3)
+                else:
+                    readout = readout.reshape(-1, nColumns)
+                image[...] = readout
         else:
+            strips = []
             for i in range(len(stripOffsets)):
                 # the amount of rows
                 nRowsToRead = rowsPerStrip
@@ -748,54 +834,41 @@ class TiffIO(object):
                     continue
                 if rowStart > rowMax:
                     break
-                # we are in position
-                fd.seek(stripOffsets[i])
-                # the amount of bytes to read
-                nBytes = stripByteCounts[i]
-                if compression_type == 32773:
-                    try:
-                        bufferBytes = bytes()
-                    except Exception:
-                        # python 2.5 ...
-                        bufferBytes = ""
-                    # packBits
-                    readBytes = 0
-                    # intermediate buffer
-                    tmpBuffer = fd.read(nBytes)
-                    while readBytes < nBytes:
-                        n = struct.unpack("b", tmpBuffer[readBytes : (readBytes + 1)])[
-                            0
-                        ]
-                        readBytes += 1
-                        if n >= 0:
-                            # should I prevent reading more than the
-                            # length of the chain? Let's python raise
-                            # the exception...
-                            bufferBytes += tmpBuffer[readBytes : readBytes + (n + 1)]
-                            readBytes += n + 1
-                        elif n > -128:
-                            bufferBytes += (-n + 1) * tmpBuffer[
-                                readBytes : (readBytes + 1)
-                            ]
-                            readBytes += 1
-                        else:
-                            # if read -128 ignore the byte
-                            continue
-                    stype = FabioImage.get_stype(dtype, self._structChar)
-                    readout = numpy.frombuffer(bufferBytes, stype).astype(dtype)
+                strips.append((stripOffsets[i], stripByteCounts[i], rowStart, rowEnd))
+                rowStart += nRowsToRead
 
-                    if hasattr(nBits, "index"):
-                        readout = readout.reshape(-1, nColumns, len(nBits))
-                    elif info["colormap"] is not None:
-                        readout = colormap[readout]
-                        readout = readout.reshape(-1, nColumns, 3)
+            stype = FabioImage.get_stype(dtype, self._structChar)
+            # PackBits strips can be expanded straight into the image
+            inplace = (colormap is None) and (numpy.dtype(stype) == image.dtype)
+            readBytes = self._getStripReader(fd)
+            codec = self.codecName
+
+            def readStrip(strip):
+                offset, nBytes, rowStart, rowEnd = strip
+                target = image[rowStart:rowEnd]
+                with instrumentation.stage("io", codec, fd) as st:
+                    buffer = readBytes(offset, nBytes)
+                    st.nbytes = len(buffer)
+                if compression_type == 32773:
+                    if colormap is None:
+                        expected = target.size * numpy.dtype(stype).itemsize
                     else:
-                        readout = readout.reshape(-1, nColumns)
-                    image[rowStart:rowEnd, :] = readout
-                else:
-                    stype = FabioImage.get_stype(dtype, self._structChar)
-                    readout = numpy.frombuffer(fd.read(nBytes), stype).astype(dtype)
-
+                        # indexes of the RGB colormap
+                        expected = target.size // 3 * numpy.dtype(stype).itemsize
+                    with instrumentation.stage("decompress", codec, fd, len(buffer)):
+                        if inplace:
+                            buffer = decPackBits(buffer, target.nbytes, out=target)
+                        else:
+                            buffer = decPackBits(buffer, target.nbytes)
+                    if buffer.nbytes != expected:
+                        raise IOError(
+                            "Truncated PackBits strip at offset %d: %d bytes decoded, %d expected"
+                            % (offset, buffer.nbytes, expected)
+                        )
+                    if inplace:
+                        return
+                with instrumentation.stage("convert", codec, fd, target.nbytes):
+                    readout = numpy.frombuffer(buffer, stype).astype(dtype)
                     if hasattr(nBits, "index"):
                         readout = readout.reshape(-1, nColumns, len(nBits))
                     elif colormap is not None:
@@ -803,8 +876,17 @@ class TiffIO(object):
                         readout = readout.reshape(-1, nColumns, 3)
                     else:
                         readout = readout.reshape(-1, nColumns)
-                    image[rowStart:rowEnd, :] = readout
-                rowStart += nRowsToRead
+                    target[...] = readout
+
+            workers = kw.get("workers", self._workers)
+            if workers is not None and workers > 1 and len(strips) > 1:
+                # the decoders release the GIL, so do os.pread and file reads
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # list() propagates the exceptions
+                    list(executor.map(readStrip, strips))
+            else:
+                for strip in strips:
+                    readStrip(strip)
         if close:
             self.__makeSureFileIsClosed()
 
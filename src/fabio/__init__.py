@@ -56,6 +56,8 @@ from .compression import COMPRESSORS  # noqa
 from .openimage import openimage as open  # noqa
 from .openimage import open_series as open_series  # noqa
 from .openimage import openheader as openheader  # noqa
+from .openimage import openheaders as openheaders  # noqa
+from .openimage import read_stack as read_stack  # noqa
 
 if "ps1" in dir(sys):
     # configure logging with interactive console
@@ -64,7 +66,7 @@ if "ps1" in dir(sys):
 # provide a global fabio API
 factory = _fabioformats.factory
 
-# feed the library with all the available formats
+# feed the library with all the available formats, imported on demand
 _fabioformats.register_default_formats()
 
 # Compatibility with outside world:
@@ -98,6 +100,14 @@ def register(codec_class):
     return codec_class
 
 
+def __getattr__(name):
+    """Import the codec modules on first access, like `fabio.edfimage`"""
+    for module_name, _ in _fabioformats._default_codecs:
+        if name == module_name:
+            return _fabioformats.importer(__name__ + "." + name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 def tests():
     """
     Run the FabIO test suite.
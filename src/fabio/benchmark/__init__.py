@@ -21,7 +21,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-"""Benchmark for file reading"""
+"""Benchmark for file reading
+
+This module times the reading of reference test images. The suite in
+:mod:`fabio.benchmark.suite` covers more operations on synthetic data.
+"""
 
 __author__ = "Jérôme Kieffer"
 __date__ = "27/10/2025"
@@ -31,6 +35,7 @@ __copyright__ = "2016-2020 European Synchrotron Radiation Facility, Grenoble, Fr
 import sys
 import timeit
 import os
+import subprocess
 from ..test import utilstest
 
 # To use use the locally build version of PyFAI, use ../bootstrap.py
@@ -90,4 +95,28 @@ def run_benchmark(number=10, repeat=3):
         )
 
 
+def run_import_benchmark(repeat=5):
+    """Measure the time needed to `import fabio` in a fresh interpreter
+
+    :param repeat: number of measurement, takes the best of them
+    :return: best import time in seconds
+    """
+    script = (
+        "import time; t0 = time.perf_counter(); import fabio; "
+        "print(time.perf_counter() - t0)"
+    )
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(float(output.split()[-1]))
+    best = min(timings)
+    print(f"import fabio: {1000 * best:.1f} ms (best of {repeat})")
+    return best
+
+
 run = run_benchmark
@@ -0,0 +1,496 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""Benchmark suite of FabIO on synthetic data
+
+It measures, for several image sizes:
+
+* the write, read and header-only read of the main codecs,
+* the access to each frame of multi-frame files,
+* the compression and decompression kernels,
+* the iteration over a file series.
+
+Results can be saved as JSON and compared to a baseline:
+
+.. code-block:: shell
+
+    python -m fabio.benchmark.suite --size 512 2048 -o current.json --baseline reference.json
+"""
+
+__author__ = "Jérôme Kieffer"
+__date__ = "17/10/2026"
+__license__ = "MIT"
+__copyright__ = "2016-2026 European Synchrotron Radiation Facility, Grenoble, France"
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+import numpy
+import fabio
+from .. import fabioformats
+from ..compression import compression, agi_bitfield
+from ..file_series import FileSeries
+
+logger = logging.getLogger(__name__)
+
+CODECS = [
+    # codec name, file extension, dtype
+    ("edfimage", "edf", "uint16"),
+    ("cbfimage", "cbf", "int32"),
+    ("tifimage", "tif", "uint16"),
+    ("marccdimage", "mccd", "uint16"),
+    ("bruker100image", "sfrm", "uint16"),
+    ("oxdimage", "img", "int32"),
+    ("dtrekimage", "img", "uint16"),
+    ("esperantoimage", "esper", "int32"),
+    ("numpyimage", "npy", "uint16"),
+    ("eigerimage", "h5", "uint16"),
+    ("limaimage", "h5", "uint16"),
+    ("pnmimage", "pnm", "uint16"),
+]
+"""Codecs benchmarked for read and write"""
+
+DEFAULT_SIZES = (512, 2048)
+"""Default sizes of the square images"""
+
+
+def generate_data(shape, dtype="int32", seed=0):
+    """Generate a synthetic diffraction-like image.
+
+    It is made of a Poisson background with a few bright pixels, which
+    exercises the exception paths of the compression algorithms.
+
+    :param shape: shape of the image
+    :param dtype: numpy dtype of the result
+    :rtype: numpy.ndarray
+    """
+    rng = numpy.random.default_rng(seed)
+    ny, nx = shape[-2:]
+    y, x = numpy.ogrid[:ny, :nx]
+    r = numpy.sqrt((y - ny / 2) ** 2 + (x - nx / 2) ** 2)
+    background = 20 + 200 * numpy.exp(-r / (0.2 * max(nx, ny)))
+    data = rng.poisson(numpy.broadcast_to(background, shape))
+    peaks = rng.integers(0, data.size, size=max(1, data.size // 2000))
+    limit = numpy.iinfo(dtype).max if numpy.dtype(dtype).kind in "iu" else 2**20
+    data.flat[peaks] = rng.integers(1000, min(limit, 2**20), size=peaks.size)
+    return data.astype(dtype)
+
+
+def _timeit(func, number=1, repeat=3):
+    """Time a function
+
+    :return: dict with the best and mean time of one call, in seconds
+    """
+    timings = [t / number for t in timeit.Timer(func).repeat(repeat, number)]
+    return {"best": min(timings), "mean": sum(timings) / len(timings)}
+
+
+class BenchmarkSuite(object):
+    """Collection of benchmarks run on synthetic data stored in a
+    temporary directory.
+
+    :param sizes: list of sizes of the square images
+    :param int number: number of calls per measurement
+    :param int repeat: number of measurements, the best is kept
+    :param int nframes: number of frames of multi-frame files and series
+    :param str select: if set, only run benchmarks whose name contains it
+    """
+
+    def __init__(self, sizes=DEFAULT_SIZES, number=1, repeat=3, nframes=10, select=None):
+        self.sizes = [int(i) for i in sizes]
+        self.number = number
+        self.repeat = repeat
+        self.nframes = nframes
+        self.select = select
+        self.results = []
+        self.tempdir = None
+
+    def _is_selected(self, *names):
+        """True if any of the benchmarks is selected"""
+        if self.select is None:
+            return True
+        return any(self.select in name for name in names)
+
+    def _measure(self, name, size, func, **extra):
+        """Time a function and store the result
+
+        Failures are stored with their error message instead of the timing.
+        """
+        if not self._is_selected(name):
+            return
+        result = {"name": name, "size": size}
+        result.update(extra)
+        try:
+            result.update(_timeit(func, self.number, self.repeat))
+        except Exception as err:
+            logger.debug("Backtrace", exc_info=True)
+            result["error"] = "%s: %s" % (type(err).__name__, err)
+        self.results.append(result)
+        if "error" in result:
+            logger.info("%-40s %6i  failed (%s)", name, size, result["error"])
+        else:
+            logger.info("%-40s %6i  %10.3f ms", name, size, 1000 * result["best"])
+
+    def _setup(self, name, size, func, **extra):
+        """Time a function which prepares the input of other benchmarks, or
+        only run it once if it is not selected itself"""
+        if self._is_selected(name):
+            self._measure(name, size, func, **extra)
+            return
+        try:
+            func()
+        except Exception:
+            logger.debug("Backtrace", exc_info=True)
+
+    def bench_codecs(self, size):
+        """Write, read and header-only read of each codec"""
+        for codec_name, extension, dtype in CODECS:
+            write_name = "write/%s" % codec_name
+            read_names = "read/%s" % codec_name, "header/%s" % codec_name
+            if not self._is_selected(write_name, *read_names):
+                continue
+            data = generate_data((size, size), dtype)
+            codec_class = fabioformats.get_class_by_name(codec_name)
+            filename = os.path.join(
+                self.tempdir, "%s_%i.%s" % (codec_name, size, extension)
+            )
+
+            def write():
+                codec_class(data=data).write(filename)
+
+            self._setup(write_name, size, write, dtype=dtype)
+            if not os.path.exists(filename) or not self._is_selected(*read_names):
+                continue
+            nbytes = os.path.getsize(filename)
+            self._measure(
+                "read/%s" % codec_name,
+                size,
+                lambda: fabio.open(filename).data,
+                file_size=nbytes,
+            )
+            self._measure(
+                "header/%s" % codec_name, size, lambda: fabio.openheader(filename).header
+            )
+
+    def bench_frames(self, size):
+        """Access to all the frames of multi-frame files"""
+        eiger_names = "frames/eigerimage/write", "frames/eigerimage"
+        if not self._is_selected("frames/edfimage", *eiger_names):
+            return
+        data = generate_data((self.nframes, size, size), "uint16")
+        if self._is_selected("frames/edfimage"):
+            filename = os.path.join(self.tempdir, "multiframe_%i.edf" % size)
+            edf = fabio.edfimage.EdfImage(data=data[0])
+            for frame in data[1:]:
+                edf.append_frame(data=frame)
+            edf.write(filename)
+
+            def read_frames():
+                with fabio.open(filename) as image:
+                    for i in range(image.nframes):
+                        image.get_frame(i).data
+
+            self._measure("frames/edfimage", size, read_frames, nframes=self.nframes)
+
+        if not self._is_selected(*eiger_names):
+            return
+        filename = os.path.join(self.tempdir, "multiframe_%i.h5" % size)
+
+        def write_eiger():
+            fabio.eigerimage.EigerImage(data=data).write(filename)
+
+        self._setup("frames/eigerimage/write", size, write_eiger, nframes=self.nframes)
+        if os.path.exists(filename):
+
+            def read_eiger_frames():
+                with fabio.open(filename) as image:
+                    for i in range(image.nframes):
+                        image.get_frame(i).data
+
+            self._measure(
+                "frames/eigerimage", size, read_eiger_frames, nframes=self.nframes
+            )
+
+    def bench_kernels(self, size):
+        """Compression and decompression kernels"""
+        kernels = {
+            "byte_offset": ("compress", "decompress", "decompress_numpy"),
+            "ty1": ("compress", "decompress"),
+            "pck": ("compress", "decompress"),
+            "agi_bitfield": ("compress", "decompress", "decompress_python"),
+        }
+        selected = set(
+            kernel
+            for kernel, names in kernels.items()
+            if self._is_selected(*("kernel/%s/%s" % (kernel, name) for name in names))
+        )
+        if not selected:
+            return
+        data = generate_data((size, size), "int32")
+        flat = data.ravel()
+
+        if "byte_offset" in selected:
+            stream = compression.compByteOffset(flat)
+            self._measure(
+                "kernel/byte_offset/compress", size, lambda: compression.compByteOffset(flat)
+            )
+            self._measure(
+                "kernel/byte_offset/decompress",
+                size,
+                lambda: compression.decByteOffset(stream, size=flat.size, dtype="int32"),
+            )
+            self._measure(
+                "kernel/byte_offset/decompress_numpy",
+                size,
+                lambda: compression.decByteOffset_numpy(stream, size=flat.size),
+            )
+
+        if "ty1" in selected:
+            ty1 = compression.compTY1(data)
+            self._measure("kernel/ty1/compress", size, lambda: compression.compTY1(data))
+            self._measure("kernel/ty1/decompress", size, lambda: compression.decTY1(*ty1))
+
+        if "pck" in selected:
+            pck = None
+            try:
+                pck = compression.compPCK(data)
+            except Exception:
+                logger.debug("Backtrace", exc_info=True)
+            self._measure("kernel/pck/compress", size, lambda: compression.compPCK(data))
+            if pck is not None:
+                self._measure(
+                    "kernel/pck/decompress",
+                    size,
+                    lambda: compression.decPCK(pck, size, size, 0, version=2),
+                )
+
+        if "agi_bitfield" in selected:
+            agi = agi_bitfield.compress(data)
+            self._measure(
+                "kernel/agi_bitfield/compress", size, lambda: agi_bitfield.compress(data)
+            )
+            # the native kernel, when it is compiled
+            decompress = agi_bitfield.decompress_native or agi_bitfield.decompress
+            self._measure(
+                "kernel/agi_bitfield/decompress",
+                size,
+                lambda: decompress(agi, data.shape),
+            )
+            self._measure(
+                "kernel/agi_bitfield/decompress_python",
+                size,
+                lambda: agi_bitfield.decompress(agi, data.shape),
+            )
+
+    def bench_series(self, size):
+        """Iteration over a series of single-frame files"""
+        prefetches = [
+            prefetch
+            for prefetch in (0, 4)
+            if self._is_selected("series/edfimage/prefetch=%i" % prefetch)
+        ]
+        if not prefetches:
+            return
+        directory = os.path.join(self.tempdir, "series_%i" % size)
+        os.makedirs(directory, exist_ok=True)
+        filenames = []
+        for i in range(self.nframes):
+            filename = os.path.join(directory, "frame_%04i.edf" % i)
+            fabio.edfimage.EdfImage(data=generate_data((size, size), "uint16", i)).write(
+                filename
+            )
+            filenames.append(filename)
+
+        for prefetch in prefetches:
+
+            def iterate():
+                with FileSeries(filenames, single_frame=True, prefetch=prefetch) as serie:
+                    for frame in serie.frames():
+                        frame.data
+
+            self._measure(
+                "series/edfimage/prefetch=%i" % prefetch,
+                size,
+                iterate,
+                nframes=self.nframes,
+            )
+
+    def run(self):
+        """Run all the benchmarks
+
+        :return: the results, see :meth:`to_dict`
+        """
+        self.results = []
+        self.tempdir = tempfile.mkdtemp(prefix="fabio_benchmark_")
+        try:
+            for size in self.sizes:
+                self.bench_codecs(size)
+                self.bench_frames(size)
+                self.bench_kernels(size)
+                self.bench_series(size)
+        finally:
+            shutil.rmtree(self.tempdir, ignore_errors=True)
+            self.tempdir = None
+        return self.to_dict()
+
+    def to_dict(self):
+        """Returns the results with a description of the environment
+
+        :rtype: dict
+        """
+        return {
+            "fabio": fabio.version,
+            "python": sys.version.split()[0],
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "number": self.number,
+            "repeat": self.repeat,
+            "results": self.results,
+        }
+
+
+def run_suite(sizes=DEFAULT_SIZES, number=1, repeat=3, nframes=10, select=None):
+    """Run the benchmark suite
+
+    :param sizes: list of sizes of the square images
+    :param int number: number of calls per measurement
+    :param int repeat: number of measurements, the best is kept
+    :param int nframes: number of frames of multi-frame files and series
+    :param str select: if set, only run benchmarks whose name contains it
+    :rtype: dict
+    """
+    suite = BenchmarkSuite(sizes, number, repeat, nframes, select)
+    return suite.run()
+
+
+def save_results(results, filename):
+    """Save benchmark results as JSON"""
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(filename):
+    """Load benchmark results saved as JSON"""
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Compare benchmark results to a baseline
+
+    :param dict results: current results
+    :param dict baseline: reference results
+    :param float tolerance: relative slowdown accepted
+    :return: list of (name, size, baseline time, current time) for the
+        benchmarks slower than the baseline by more than the tolerance
+    """
+    reference = {
+        (r["name"], r["size"]): r["best"] for r in baseline["results"] if "best" in r
+    }
+    regressions = []
+    for result in results["results"]:
+        key = result["name"], result["size"]
+        if "best" not in result or key not in reference:
+            continue
+        if result["best"] > reference[key] * (1.0 + tolerance):
+            regressions.append(key + (reference[key], result["best"]))
+    return regressions
+
+
+def format_results(results):
+    """Returns the results as a human readable table
+
+    :rtype: str
+    """
+    lines = ["%-40s %6s %12s" % ("benchmark", "size", "time (ms)")]
+    for result in results["results"]:
+        if "best" in result:
+            timing = "%12.3f" % (1000 * result["best"])
+        else:
+            timing = "  failed: %s" % result["error"]
+        lines.append("%-40s %6i %s" % (result["name"], result["size"], timing))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="fabio-benchmark", description="Benchmark FabIO on synthetic data"
+    )
+    parser.add_argument(
+        "-s",
+        "--size",
+        nargs="+",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help="Sizes of the square images",
+    )
+    parser.add_argument("-n", "--number", type=int, default=1, help="Calls per measurement")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of measurements")
+    parser.add_argument(
+        "-f", "--frames", type=int, default=10, help="Number of frames of multi-frame files"
+    )
+    parser.add_argument("-k", "--select", help="Only run benchmarks containing this string")
+    parser.add_argument("-o", "--output", help="Save the results as JSON")
+    parser.add_argument("-b", "--baseline", help="JSON results to compare with")
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown accepted compared to the baseline",
+    )
+    options = parser.parse_args(argv)
+
+    results = run_suite(
+        options.size, options.number, options.repeat, options.frames, options.select
+    )
+    print(format_results(results))
+    if options.output:
+        save_results(results, options.output)
+
+    if options.baseline:
+        regressions = compare(results, load_results(options.baseline), options.tolerance)
+        for name, size, reference, current in regressions:
+            print(
+                "Regression %s (%i): %.3f ms -> %.3f ms"
+                % (name, size, 1000 * reference, 1000 * current)
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -45,7 +45,8 @@ __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
 __date__ = "13/03/2026"
 
 import io
-from .fabioimage import FabioImage
+import os
+from .fabioimage import FabioImage, RawLayout, _read_raw_roi
 import numpy
 import logging
 
@@ -84,6 +85,12 @@ class BinaryImage(FabioImage):
         ):
             return True
 
+    def _readheader(self, infile):
+        """
+        Raw binary files have no header, the structure is provided by the caller
+        """
+        self.header = self.check_header()
+
     def read(self, fname, dim1, dim2, offset=0, bytecode="int32", endian="<"):
         """
         Read a binary image
@@ -128,6 +135,35 @@ class BinaryImage(FabioImage):
         self._shape = None
         return self
 
+    def readROI(
+        self, fname, dim1, dim2, coords, offset=0, bytecode="int32", endian="<"
+    ):
+        """
+        Read a region of interest of a binary image, reading only the rows
+        (and the part of them) it covers.
+
+        :param str fname: file name
+        :param int dim1: image dimensions (Fast index)
+        :param int dim2: image dimensions (Slow index)
+        :param coords: 2-tuple of slices (rows, columns)
+        :param int offset: starting position of the data-block. If negative, starts at the end.
+        :param bytecode: can be "int8","int16","int32","int64","uint8","uint16","uint32","uint64","float32","float64",...
+        :param endian:  among little or big endian ("<" or ">")
+        :return: the ROI as a numpy array
+        """
+        assert endian in ("<", ">", "=")
+        bytecode = numpy.dtype(bytecode)
+        if not bytecode.str.startswith(endian):
+            bytecode = numpy.dtype(endian + bytecode.str[1:])
+        self.filename = fname
+        if offset < 0:
+            size = dim1 * dim2 * bytecode.itemsize
+            offset = max(0, os.path.getsize(fname) - size + offset + 1)
+        layout = RawLayout(offset, (dim2, dim1), bytecode, bytecode)
+        self.slice = tuple(coords)
+        self.roi = _read_raw_roi(fname, layout, self.slice)
+        return self.roi
+
     def estimate_offset_value(self, fname, dim1, dim2, bytecode="int32"):
         "Estimates the size of a file"
         with open(fname, "rb") as f:
@@ -60,6 +60,7 @@ import time
 import numpy
 from .brukerimage import BrukerImage
 from .fabioutils import pad, StringTypes
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -143,20 +144,26 @@ def _merge_data(data, baseline=0, underflow=None, overflow1=None, overflow2=None
     """
     in_dtype = data.dtype
     data = data.astype(numpy.int32)
+    flat = data.reshape(-1)
+    index1 = None
     if (in_dtype.itemsize == 1) and (overflow1 is not None):
         # Use Overflow1
-        mask = numpy.where(data == 255)
-        data[mask] = overflow1
+        index1 = numpy.flatnonzero(flat == 255)
+        flat[index1] = overflow1
     if (in_dtype.itemsize < 4) and (overflow2 is not None):
         # Use Overflow2
-        mask = numpy.where(data == 65535)
-        data[mask] = overflow2
+        if index1 is None:
+            index2 = numpy.flatnonzero(flat == 65535)
+        else:
+            # only pixels taken from overflow1 can be saturated again
+            index2 = index1[flat[index1] == 65535]
+        flat[index2] = overflow2
     if underflow is None or underflow.size == 0:
         data += baseline
     else:
-        mask = data == 0
-        data[numpy.where(mask)] = underflow
-        data[numpy.logical_not(mask)] += baseline
+        index0 = numpy.flatnonzero(flat == 0)
+        data += baseline
+        flat[index0] = underflow
     return data
 
 
@@ -218,6 +225,10 @@ class Bruker100Image(BrukerImage):
         self._shape = shape
         self.version = int(self.header.get("FORMAT", "100"))
 
+    def _get_raw_layout(self, infile, frame=None):
+        """Pixels are rebuilt from the baseline and the overflow tables"""
+        return None
+
     def read(self, fname, frame=None):
         """Read the data.
 
@@ -230,8 +241,10 @@ class Bruker100Image(BrukerImage):
 
         The blocks are zero padded to a multiple of 16 bytes.
         """
+        codec = self.codec_name()
         with self._open(fname, "rb") as infile:
-            self._readheader(infile)
+            with instrumentation.stage("header", codec, fname):
+                self._readheader(infile)
             rows, cols = self.shape
             npixelb = int(self.header["NPIXELB"].split()[0])
             # you had to read the Bruker docs to know this!
@@ -243,7 +256,9 @@ class Bruker100Image(BrukerImage):
             data_size = rows * cols * npixelb
             #             data_size_padded = mround(data_size, 512)
             data_size_padded = data_size
-            raw_data = infile.read(data_size_padded)
+            with instrumentation.stage("io", codec, fname) as st:
+                raw_data = infile.read(data_size_padded)
+                st.nbytes = len(raw_data)
             stype = self.get_stype(self.bpp_to_numpy[npixelb], "little")
             data = numpy.frombuffer(raw_data[:data_size], dtype=stype).reshape((rows, cols))
             # now process the overflows
@@ -255,37 +270,40 @@ class Bruker100Image(BrukerImage):
                 "overflow2": None,
                 "baseline": None,
             }
-            for k, nov in enumerate(noverfl_values):
+            # all tables are read at once, each one padded to 16 bytes
+            tables = []
+            for k, nov in enumerate(noverfl_values[:3]):
                 if nov <= 0:
                     continue
                 if k == 0:
                     bpp = int(self.header["NPIXELB"].split()[1])
                     datatype = numpy.dtype(f"int{bpp * 8}")
-                elif k > 2:
-                    break
                 else:
                     bpp = 2 * k
-                    datatype = self.bpp_to_numpy[bpp]
-                to_read = nov * bpp
-                # pad nov*bpp to a multiple of 16 bytes
-                nbytes = mround(to_read, 16)
-
-                # Multiple of 16 just above
-                data_str = infile.read(nbytes)
-                # ar without zeros
-                ar = numpy.frombuffer(data_str[:to_read], dtype=datatype)
+                    datatype = numpy.dtype(self.bpp_to_numpy[bpp])
+                tables.append((k, nov, datatype))
+            with instrumentation.stage("io", codec, fname) as st:
+                blob = infile.read(sum(mround(nov * datatype.itemsize, 16)
+                                       for _, nov, datatype in tables))
+                st.nbytes = len(blob)
+            offset = 0
+            for k, nov, datatype in tables:
+                to_read = nov * datatype.itemsize
+                if offset + to_read > len(blob):
+                    raise IOError("Overflow table %d truncated" % k)
+                ar = numpy.frombuffer(blob, dtype=datatype, count=nov, offset=offset)
                 if k == 0:
                     # read the set of "underflow pixels" - these will be completely disregarded for now
                     to_merge["underflow"] = ar
                 elif k == 1:
                     to_merge["overflow1"] = ar
-                elif k == 2:
-                    to_merge["overflow2"] = ar
                 else:
-                    break
+                    to_merge["overflow2"] = ar
+                nbytes = mround(to_read, 16)
                 logger.debug(
-                    "%s bytes read + %d bytes padding" % (nov * bpp, nbytes - nov * bpp)
+                    "%s bytes read + %d bytes padding" % (to_read, nbytes - to_read)
                 )
+                offset += nbytes
 
         # Read baseline
         if noverfl_values[0] == -1:
@@ -294,7 +312,9 @@ class Bruker100Image(BrukerImage):
         else:
             to_merge["baseline"] = int(self.header["NEXP"].split()[2])
 
-        self.data = _merge_data(**to_merge)
+        with instrumentation.stage("convert", codec, fname) as st:
+            self.data = _merge_data(**to_merge)
+            st.nbytes = self.data.nbytes
         self.resetvals()
         return self
 
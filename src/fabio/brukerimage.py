@@ -43,7 +43,7 @@ Written by Jérôme Kieffer, ESRF, Grenoble, France
 """
 
 __authors__ = ["Henning O. Sorensen", "Erik Knudsen", "Jon Wright", "Jérôme Kieffer"]
-__date__ = "17/06/2026"
+__date__ = "17/10/2026"
 __status__ = "production"
 __copyright__ = "2007-2009 Risoe National Laboratory; 2010-2020 ESRF"
 __licence__ = "MIT"
@@ -55,11 +55,30 @@ import os
 import io
 import getpass
 import time
-from .fabioimage import FabioImage
+from .fabioimage import FabioImage, RawLayout
 from .fabioutils import pad, StringTypes
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
+# one entry of the overflow table: 9 characters of intensity, 7 of position
+_OVERFLOW_RECORD = numpy.dtype([("intensity", "S9"), ("position", "S7")])
+
+
+def _parse_overflows(table):
+    """Parse the table of overflows of Bruker images
+
+    :param table: bytes with 16 characters per entry, 9 for the intensity
+        and 7 for the position
+    :return: intensities and positions as arrays of int64
+    """
+    records = numpy.frombuffer(table, dtype=_OVERFLOW_RECORD)
+    # numpy parses the fixed-width fields like int() does, blanks included
+    return (
+        records["intensity"].astype(numpy.int64),
+        records["position"].astype(numpy.int64),
+    )
+
 
 class BrukerImage(FabioImage):
     """
@@ -226,15 +245,83 @@ class BrukerImage(FabioImage):
         self._shape = shape
         self.version = int(self.header.get("FORMAT", "86"))
 
+    def _apply_linear(self, data):
+        """Handle Float images, stored with a slope and an offset (LINEAR)"""
+        if "LINEAR" in self.header:
+            try:
+                slope, offset = self.header["LINEAR"].split(None, 1)
+                slope = float(slope)
+                offset = float(offset)
+            except Exception:
+                logger.warning(
+                    "Error in converting to float data with linear parameter: %s"
+                    % self.header["LINEAR"]
+                )
+                slope = 1
+                offset = 0
+            if (slope != 1) or (offset != 0):
+                # TODO: check that the formula is OK, not reverted.
+                logger.warning(
+                    "performing correction with slope=%s, offset=%s (LINEAR=%s)"
+                    % (slope, offset, self.header["LINEAR"])
+                )
+                data = (data * slope + offset).astype(numpy.float32)
+        return data
+
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels, the overflow table is applied to the ROI"""
+        try:
+            self._readheader(infile)
+        except Exception as err:
+            raise RuntimeError("Unable to parse Bruker headers: %s" % err)
+        rows, cols = self._shape
+        try:
+            npixelb = int(self.header["NPIXELB"])
+        except Exception:
+            return None
+        dtype = numpy.dtype(self.bpp_to_numpy[npixelb])
+        offset = infile.tell()
+        nov = int(self.header["NOVERFL"])
+        if nov > 0:
+            infile.seek(offset + rows * cols * npixelb)
+            table = infile.read(16 * nov)
+            if len(table) < 16 * nov:
+                raise IOError(
+                    "Overflow table truncated: %s/%s entries" % (len(table) // 16, nov)
+                )
+            intensity, position = _parse_overflows(table)
+            overflow_rows, overflow_cols = numpy.divmod(position, cols)
+
+        def convert(data, roi_rows, roi_cols):
+            if nov > 0:
+                data = data.astype(numpy.uint32)
+                # index of each row/column of the frame in the ROI, or -1
+                row_index = numpy.full(rows, -1)
+                row_index[roi_rows] = numpy.arange(len(roi_rows))
+                col_index = numpy.full(cols, -1)
+                col_index[roi_cols] = numpy.arange(len(roi_cols))
+                dest_rows = row_index[overflow_rows]
+                dest_cols = col_index[overflow_cols]
+                inside = (dest_rows >= 0) & (dest_cols >= 0)
+                data[dest_rows[inside], dest_cols[inside]] = intensity[inside]
+            else:
+                data = data.astype(dtype)
+            return self._apply_linear(data)
+
+        stype = self.get_stype(dtype, "little")
+        return RawLayout(offset, (rows, cols), stype, dtype, convert)
+
     def read(self, fname, frame=None):
         """
         Read in and unpack the pixels (including overflow table
         """
+        codec = self.codec_name()
         with self._open(fname, "rb") as infile:
-            try:
-                self._readheader(infile)
-            except Exception as err:
-                raise RuntimeError("Unable to parse Bruker headers: %s" % err)
+            with instrumentation.stage("header", codec, fname):
+                try:
+                    self._readheader(infile)
+                except Exception as err:
+                    raise RuntimeError("Unable to parse Bruker headers: %s" % err)
 
             rows, cols = self._shape
 
@@ -248,47 +335,37 @@ class BrukerImage(FabioImage):
                 logger.warning(errmsg)
                 raise RuntimeError(errmsg)
 
+            nov = int(self.header["NOVERFL"])
+            with instrumentation.stage("io", codec, fname) as st:
+                raw = infile.read(rows * cols * npixelb)
+                st.nbytes = len(raw)
+                if nov > 0:
+                    # 16 character overflows:
+                    #      9 characters of intensity
+                    #      7 character position
+                    table = infile.read(16 * nov)
+                    st.nbytes += len(table)
+        # infile.close()
+
+        with instrumentation.stage("convert", codec, fname) as st:
             stype = self.get_stype(self.bpp_to_numpy[npixelb], "little")
-            data = numpy.frombuffer(infile.read(rows * cols * npixelb),
-                                    dtype=stype
-            ).astype(self.bpp_to_numpy[npixelb])
+            data = numpy.frombuffer(raw, dtype=stype)
+            data = data.astype(self.bpp_to_numpy[npixelb])
 
             # handle overflows
-            nov = int(self.header["NOVERFL"])
             if nov > 0:  # Read in the overflows
                 # need at least int32 sized data I guess - can reach 2^21
                 data = data.astype(numpy.uint32)
-                # 16 character overflows:
-                #      9 characters of intensity
-                #      7 character position
-                for _ in range(nov):
-                    ovfl = infile.read(16)
-                    intensity = int(ovfl[0:9])
-                    position = int(ovfl[9:16])
-                    data[position] = intensity
-        # infile.close()
+                if len(table) < 16 * nov:
+                    raise IOError(
+                        "Overflow table truncated: %s/%s entries"
+                        % (len(table) // 16, nov)
+                    )
+                intensity, position = _parse_overflows(table)
+                data[position] = intensity
 
-        # Handle Float images ...
-        if "LINEAR" in self.header:
-            try:
-                slope, offset = self.header["LINEAR"].split(None, 1)
-                slope = float(slope)
-                offset = float(offset)
-            except Exception:
-                logger.warning(
-                    "Error in converting to float data with linear parameter: %s"
-                    % self.header["LINEAR"]
-                )
-                slope = 1
-                offset = 0
-            if (slope != 1) or (offset != 0):
-                # TODO: check that the formula is OK, not reverted.
-                logger.warning(
-                    "performing correction with slope=%s, offset=%s (LINEAR=%s)"
-                    % (slope, offset, self.header["LINEAR"])
-                )
-                data = (data * slope + offset).astype(numpy.float32)
-        self.data = data.reshape(self._shape)
+            self.data = self._apply_linear(data).reshape(self._shape)
+            st.nbytes = self.data.nbytes
 
         self.resetvals()
         return self
@@ -429,10 +506,11 @@ class BrukerImage(FabioImage):
             self.header["FILENAM"] = "%s" % fname
         if "CREATED" not in self.header:
             self.header["CREATED"] = time.ctime()
-        if "NOVERFL" not in self.header:
-            self.header["NOVERFL"] = "0"
         #        if not "NPIXELB" in self.header:
         self.header["NPIXELB"] = self.calc_bpp()
+        # must match the table written by gen_overflow
+        limit = 2 ** (8 * self.header["NPIXELB"]) - 1
+        self.header["NOVERFL"] = str(int((self.data >= limit).sum()))
         # if not "NROWS" in self.header:
         self.header["NROWS"] = self.data.shape[0]
         # if not "NCOLS" in self.header:
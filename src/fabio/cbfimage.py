@@ -48,9 +48,11 @@ from collections import OrderedDict
 from typing import NamedTuple
 
 from .fabioimage import FabioImage
-from .compression import compByteOffset, decByteOffset, md5sum
+from . import fabioutils
+from .compression import compByteOffset_md5, decByteOffset, md5sum
 from .ext._cif import split_tokens
 from . import version, date
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 __version__ = [
@@ -103,9 +105,22 @@ class CbfImage(FabioImage):
         self.pilatus_headers = None
         self.cbs = None
         self.start_binary = None
+        # parts of the binary section of the last written file
+        self._cbf_section = None
         if fname is not None:  # load the file)
             self.read(fname)
 
+    @property
+    def cbf(self):
+        """Binary section of the last written file, from its MIME header to
+        its closing boundary.
+
+        It is only joined into a single bytes object on access.
+        """
+        if self._cbf_section is None:
+            raise AttributeError("'CbfImage' object has no attribute 'cbf'")
+        return b"".join(self._cbf_section)
+
     @staticmethod
     def checkData(data=None):
         if data is None:
@@ -133,9 +148,14 @@ class CbfImage(FabioImage):
         blocks = []
         last = ""
         header_data = None
-        for i in range(16):
-            # up to 512*16 = 8k headers
+        i = 0
+        while True:
+            # stop reading as soon as the binary section starts
             ablock = inStream.read(self.PADDING)
+            if not ablock:
+                # no binary section: this is a plain CIF file
+                header_data = b"".join(blocks)
+                break
             blocks.append(ablock)
             if last:
                 extra = len(self.BINARAY_SECTION)
@@ -151,8 +171,7 @@ class CbfImage(FabioImage):
                 self.cbs = all_blocks[start_cbs:]
                 break
             last = ablock
-        else:
-            header_data = b"".join(blocks) + inStream.read()
+            i += 1
         self.cif._parseCIF(header_data)
 
         # backport contents of the CIF data to the headers
@@ -175,7 +194,13 @@ class CbfImage(FabioImage):
         """
         self.start_binary = self.cbs.find(self.STARTER)
         while self.start_binary < 0:
-            self.cbs += inStream.read(self.PADDING)
+            ablock = inStream.read(self.PADDING)
+            if not ablock:
+                raise IOError(
+                    "CBF file %s is corrupt, no binary data in it"
+                    % getattr(inStream, "name", inStream)
+                )
+            self.cbs += ablock
             self.start_binary = self.cbs.find(self.STARTER)
         bin_headers = self.cbs[: self.start_binary]
         lines = bin_headers.split(b"\n")
@@ -247,10 +272,12 @@ class CbfImage(FabioImage):
                 self.cbs = self.cif[self.CIF_BINARY_BLOCK_KEY]
         return self.cbs[self.start_binary + len(self.STARTER) :]
 
-    def read(self, fname, frame=None, check_MD5=True, only_raw=False):
+    def read(self, fname, frame=None, check_MD5=True, only_raw=False, nthreads=None):
         """Read in header into self.header and the data   into self.data
 
         :param str fname: name of the file
+        :param int nthreads: number of threads used to decompress the data,
+            None or 1 for the serial decoder, 0 to use all cores.
         :return: fabioimage instance
         """
         self.filename = fname
@@ -258,30 +285,25 @@ class CbfImage(FabioImage):
         self.resetvals()
 
         infile = self._open(fname, "rb")
-        self._readheader(infile)
+        with instrumentation.stage("header", "cbfimage", fname):
+            self._readheader(infile)
 
         logger.debug("CBS type %s len %s" % (type(self.cbs), len(self.cbs)))
 
-        binary_data = self.read_raw_data(infile)
+        with instrumentation.stage("io", "cbfimage", fname) as st:
+            binary_data = self.read_raw_data(infile)
+            st.nbytes = len(binary_data)
         if only_raw:
             return binary_data
 
-        if ("Content-MD5" in self.header) and check_MD5:
-            ref = numpy.bytes_(self.header["Content-MD5"])
-            obt = md5sum(binary_data)
-            if ref != obt:
-                logger.error(
-                    "Checksum of binary data mismatch: expected %s, got %s" % (ref, obt)
-                )
+        if check_MD5:
+            self._check_md5(binary_data)
 
         if self.header["conversions"] == "x-CBF_BYTE_OFFSET":
-            data = numpy.ascontiguousarray(
-                self._readbinary_byte_offset(
-                    binary_data,
-                ),
-                self._dtype,
-            )
-            data = data.reshape(self._shape)
+            data = self._readbinary_byte_offset(binary_data, nthreads)
+            with instrumentation.stage("convert", "cbfimage", fname, data.nbytes):
+                data = numpy.ascontiguousarray(data, self._dtype)
+                data = data.reshape(self._shape)
             self.data = data
             self._shape = None
             self._dtype = None
@@ -294,16 +316,84 @@ class CbfImage(FabioImage):
         self.resetvals()
         return self
 
-    def _readbinary_byte_offset(self, raw_bytes):
+    def read_into(self, fname, out, frame=None, check_MD5=True, nthreads=None):
+        """Read the data of the image directly into a preallocated array
+
+        When `out` is a C-contiguous array of the integer type stored in the
+        file, the data are decompressed in place without intermediate buffer.
+
+        :param str fname: name of the file
+        :param numpy.ndarray out: array with the shape of the image
+        :param int nthreads: number of threads used to decompress the data
+        :return: the `out` array
+        """
+        binary_data = self.read(fname, check_MD5=False, only_raw=True)
+        self.close()
+        if check_MD5:
+            self._check_md5(binary_data)
+        if self.header["conversions"] != "x-CBF_BYTE_OFFSET":
+            raise IOError(
+                "Compression scheme not yet supported, please contact the author"
+            )
+        if out.shape != self._shape:
+            raise ValueError(
+                "Shape mismatch: image is %s, output is %s" % (self._shape, out.shape)
+            )
+        if (
+            out.dtype == self._dtype
+            and out.dtype in (numpy.int32, numpy.int64)
+            and out.flags.c_contiguous
+        ):
+            flat = out.reshape(-1)
+            with instrumentation.stage(
+                "decompress", "cbfimage", fname, len(binary_data)
+            ):
+                data = decByteOffset(
+                    binary_data, dtype=self._dtype, nthreads=nthreads, out=flat
+                )
+            if len(data) != flat.size:
+                raise IOError("CBF file %s is truncated" % fname)
+        else:
+            out[...] = self._readbinary_byte_offset(binary_data, nthreads).reshape(
+                self._shape
+            )
+        self.data = out
+        self._shape = None
+        self._dtype = None
+        self.resetvals()
+        return out
+
+    def _check_md5(self, binary_data):
+        """Compare the checksum of the binary data to the one from the header
+
+        :param bytes binary_data: the compressed stream
+        """
+        if "Content-MD5" not in self.header:
+            return
+        ref = numpy.bytes_(self.header["Content-MD5"])
+        with instrumentation.stage("md5", "cbfimage", self.filename, len(binary_data)):
+            obt = md5sum(binary_data)
+        if ref != obt:
+            logger.error(
+                "Checksum of binary data mismatch: expected %s, got %s" % (ref, obt)
+            )
+
+    def _readbinary_byte_offset(self, raw_bytes, nthreads=None):
         """
         Read in a binary part of an x-CBF_BYTE_OFFSET compressed image
 
         :param str inStream: the binary image (without any CIF decorators)
+        :param int nthreads: number of threads used for the decompression
         :return: a linear numpy array without shape and dtype set
         :rtype: numpy array
         """
         dim2, dim1 = self._shape
-        data = decByteOffset(raw_bytes, size=dim1 * dim2, dtype=self._dtype)
+        with instrumentation.stage(
+            "decompress", "cbfimage", self.filename, len(raw_bytes)
+        ):
+            data = decByteOffset(
+                raw_bytes, size=dim1 * dim2, dtype=self._dtype, nthreads=nthreads
+            )
         assert len(data) == dim1 * dim2
         return data
 
@@ -317,7 +407,7 @@ class CbfImage(FabioImage):
         # The shape is provided by self.data
         self._shape = None
         dim2, dim1 = self.shape
-        binary_blob = compByteOffset(self.data)
+        binary_blob, md5 = compByteOffset_md5(self.data)
         dtype = "Unknown"
         for key, value in DATA_TYPES.items():
             if value == self.data.dtype:
@@ -331,15 +421,13 @@ class CbfImage(FabioImage):
             b"X-Binary-ID: 1",
             numpy.bytes_('X-Binary-Element-Type: "%s"' % (dtype)),
             b"X-Binary-Element-Byte-Order: LITTLE_ENDIAN",
-            b"Content-MD5: " + md5sum(binary_blob),
+            b"Content-MD5: " + md5,
             numpy.bytes_("X-Binary-Number-of-Elements: %d" % (dim1 * dim2)),
             numpy.bytes_("X-Binary-Size-Fastest-Dimension: %d" % dim1),
             numpy.bytes_("X-Binary-Size-Second-Dimension: %d" % dim2),
             b"X-Binary-Size-Padding: 1",
             b"",
-            self.STARTER + binary_blob,
-            b"",
-            b"--CIF-BINARY-FORMAT-SECTION----",
+            self.STARTER,
         ]
 
         if "_array_data.header_contents" not in self.header:
@@ -375,14 +463,18 @@ class CbfImage(FabioImage):
                 ["# %s" % i for i in nonCifHeaders]
             )
 
-        self.cbf = b"\r\n".join(binary_block)
-        block = b"\r\n".join(
-            [b"", self.CIF_BINARY_BLOCK_KEY.encode("ASCII"), b";", self.cbf, b";"]
+        # The compressed data are written as they are, between the headers
+        mime_header = b"\r\n".join(binary_block)
+        boundary = b"\r\n".join([b"", b"", b"--CIF-BINARY-FORMAT-SECTION----"])
+        self._cbf_section = (mime_header, binary_blob, boundary)
+        head = b"\r\n".join(
+            [b"", self.CIF_BINARY_BLOCK_KEY.encode("ASCII"), b";", mime_header]
         )
+        tail = boundary + b"\r\n;"
         self.cif.pop(self.CIF_BINARY_BLOCK_KEY, None)
-        with open(fname, "wb") as out_file:
-            out_file.write(self.cif.tostring(fname, "\r\n").encode("ASCII"))
-            out_file.write(block)
+        cif = self.cif.tostring(fname, "\r\n").encode("ASCII")
+        with fabioutils.File(fname, "wb") as out_file:
+            fabioutils.write_buffers(out_file, [cif + head, binary_blob, tail])
 
 
 ################################################################################
@@ -48,16 +48,20 @@ from io import BytesIO
 from struct import pack, unpack as unpack_
 import numpy
 
+# decompress_native is the compiled counterpart of decompress, with an
+# optional number of threads; it is None when the extension is not built
 try:
     from ..ext._agi_bitfield import (
         get_fieldsize as _get_fieldsize,
         compress_row as _compress_row,
         compress as _compress,
+        decompress as decompress_native,
     )
 except ImportError:
     _get_fieldsize = None
     _compress_row = None
     _compress = None
+    decompress_native = None
 
 logger = logging.getLogger(__name__)
 
@@ -38,15 +38,18 @@ Authors: Jérôme Kieffer, ESRF
 __author__ = "Jérôme Kieffer"
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
-__date__ = "18/06/2026"
+__date__ = "17/10/2026"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
 
+import os
 import sys
 import base64
 import hashlib
 import io
+import re
 import logging
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import numpy
 
 logger = logging.getLogger(__name__)
@@ -114,7 +117,17 @@ def endianness():
 class ExternalCompressors(object):
     """Class to handle lazy discovery of external compression programs"""
 
-    COMMANDS = ((".bz2", ["bzip2-dcf"]), (".gz", ["gzip", "-dcf"]))
+    COMMANDS = (
+        (".bz2", ["lbzip2", "-dc"]),
+        (".bz2", ["pbzip2", "-dc"]),
+        (".bz2", ["bzip2", "-dcf"]),
+        (".gz", ["pigz", "-dc"]),
+        (".gz", ["gzip", "-dcf"]),
+    )
+    """Decompression commands writing to stdout, by order of preference"""
+
+    PARALLEL = ("lbzip2", "pbzip2", "pigz")
+    """Programs using several threads to decompress"""
 
     def __init__(self):
         """Empty constructor"""
@@ -123,6 +136,7 @@ class ExternalCompressors(object):
     def __getitem__(self, key):
         """Implement the dict-like behavior"""
         if key not in self.compressors:
+            found = None
             for candidate, commandline in self.COMMANDS:
                 if key != candidate:
                     continue
@@ -131,14 +145,23 @@ class ExternalCompressors(object):
                     lines = subprocess.check_output(
                         testline, stderr=subprocess.STDOUT, universal_newlines=True
                     )
-                    if "usage" not in lines.lower():
-                        commandline = None
                 except (subprocess.CalledProcessError, WindowsError) as err:
                     logger.debug(f"No `{commandline[0]}` utility found: {err}")
-                    commandline = None
-            self.compressors[key] = commandline
+                    continue
+                if "usage" in lines.lower():
+                    found = commandline
+                    break
+            self.compressors[key] = found
         return self.compressors[key]
 
+    def is_parallel(self, key):
+        """True if the command found for this extension uses several threads
+
+        :param str key: extension of the compressed file, like ".gz"
+        """
+        commandline = self[key]
+        return commandline is not None and commandline[0] in self.PARALLEL
+
 
 COMPRESSORS = ExternalCompressors()
 
@@ -198,6 +221,179 @@ def decGzip(stream):
     return uncompessed
 
 
+_GZIP_MEMBER = re.compile(b"\x1f\x8b\x08[\x00-\x1f]")
+"""Possible start of a gzip member"""
+
+_BZIP2_STREAM = re.compile(b"BZh[1-9]1AY&SY")
+"""Start of a bzip2 stream, followed by its first block"""
+
+
+def _bgzf_members(raw):
+    """Offsets of the blocks of a BGZF file (gzip with block sizes in the
+    extra field of each member, as written by bgzip)
+
+    :param bytes raw: compressed data
+    :return: list of offsets, None if not a BGZF file
+    """
+    offsets = []
+    pos = 0
+    while pos < len(raw):
+        header = raw[pos : pos + 18]
+        if (
+            len(header) < 18
+            or not header.startswith(b"\x1f\x8b\x08\x04")
+            or header[12:14] != b"BC"
+        ):
+            return None
+        offsets.append(pos)
+        pos += int.from_bytes(header[16:18], "little") + 1
+    return offsets
+
+
+def _decompress_member(raw, new_decompressor):
+    """Decompress a complete member of a compressed file
+
+    :return: uncompressed data, None if the data is not a single complete
+        member (more data or a corrupted one)
+    """
+    decompressor = new_decompressor()
+    try:
+        data = decompressor.decompress(raw)
+    except (OSError, ValueError, EOFError) + ((zlib.error,) if zlib else ()):
+        return None
+    if not decompressor.eof or decompressor.unused_data.strip(b"\x00"):
+        return None
+    return data
+
+
+def _decompress_serial(raw, new_decompressor):
+    """Decompress all the members of a compressed stream one after the other"""
+    chunks = []
+    while raw:
+        decompressor = new_decompressor()
+        chunks.append(decompressor.decompress(raw))
+        if not decompressor.eof:
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached"
+            )
+        raw = decompressor.unused_data
+        if not raw.strip(b"\x00"):
+            # padding at the end of the file
+            break
+    return b"".join(chunks)
+
+
+def _decompress_parallel(raw, offsets, new_decompressor, workers=None):
+    """Decompress the members starting at the given offsets in threads.
+
+    The offsets may come from a search of the magic numbers and contain
+    false positives: the data are decompressed serially from the first
+    member which does not end exactly where the next one starts.
+    """
+    if len(offsets) < 2:
+        return _decompress_serial(raw, new_decompressor)
+    view = memoryview(raw)
+    bounds = list(zip(offsets, offsets[1:] + [len(raw)]))
+    # zlib and bz2 release the GIL while decompressing
+    with ThreadPoolExecutor(workers) as pool:
+        members = list(
+            pool.map(
+                lambda bound: _decompress_member(
+                    view[bound[0] : bound[1]], new_decompressor
+                ),
+                bounds,
+            )
+        )
+    chunks = []
+    for (start, _), member in zip(bounds, members):
+        if member is None:
+            chunks.append(_decompress_serial(raw[start:], new_decompressor))
+            break
+        chunks.append(member)
+    return b"".join(chunks)
+
+
+def decompress_gzip(raw, workers=None):
+    """Decompress gzip data, using threads for multi-member files
+
+    The members of BGZF files are located from their headers, those of other
+    multi-member files by searching their magic number.
+
+    :param bytes raw: compressed data
+    :param int workers: number of threads, None for the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`
+    :return: uncompressed data
+    """
+    if zlib is None:
+        raise ImportError("zlib module is not available")
+
+    def new_decompressor():
+        return zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+    offsets = _bgzf_members(raw)
+    if offsets is None:
+        offsets = [m.start() for m in _GZIP_MEMBER.finditer(raw)]
+    if not offsets or offsets[0] != 0:
+        offsets = [0]
+    return _decompress_parallel(raw, offsets, new_decompressor, workers)
+
+
+def decompress_bzip2(raw, workers=None):
+    """Decompress bzip2 data, using threads for multi-stream files, like
+    the ones written by pbzip2 or lbzip2
+
+    :param bytes raw: compressed data
+    :param int workers: number of threads, None for the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`
+    :return: uncompressed data
+    """
+    if bz2 is None:
+        raise ImportError("bz2 module is not available")
+    offsets = [m.start() for m in _BZIP2_STREAM.finditer(raw)]
+    if not offsets or offsets[0] != 0:
+        offsets = [0]
+    return _decompress_parallel(raw, offsets, bz2.BZ2Decompressor, workers)
+
+
+def decompress_file(filename, workers=None):
+    """Decompress a whole gzip or bzip2 file into memory.
+
+    A multi-threaded external program (pigz, lbzip2, pbzip2) is used when
+    available, otherwise the independent members of the file are decompressed
+    in threads.
+
+    :param str filename: name of a ".gz" or ".bz2" file
+    :param int workers: number of threads, None for the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`
+    :return: uncompressed data
+    """
+    extension = os.path.splitext(filename)[-1]
+    if extension == ".gz":
+        decompress = decompress_gzip
+    elif extension == ".bz2":
+        decompress = decompress_bzip2
+    else:
+        raise ValueError("Unsupported compression for %s" % filename)
+    if COMPRESSORS.is_parallel(extension):
+        try:
+            return subprocess.run(
+                COMPRESSORS[extension] + [filename],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+            ).stdout
+        except (subprocess.CalledProcessError, OSError) as error:
+            logger.warning(
+                "Unable to decompress %s with %s: %s",
+                filename,
+                COMPRESSORS[extension][0],
+                error,
+            )
+    with open(filename, "rb") as f:
+        raw = f.read()
+    return decompress(raw, workers)
+
+
 def decBzip2(stream):
     """
     Decompress a chunk of data using the bzip2 algorithm from Python
@@ -221,6 +417,9 @@ def decByteOffset_numpy(stream, size=None, dtype="int64"):
     Analyze a stream of char with any length of exception:
                 2, 4, or 8 bytes integers
 
+    The decoding is vectorized: escape markers are located with masks and
+    the exceptions are gathered in bulk before a single cumulative sum.
+
     :param stream: string representing the compressed data
     :param size: the size of the output array (of longInts)
     :return: 1D-ndarray
@@ -228,44 +427,75 @@ def decByteOffset_numpy(stream, size=None, dtype="int64"):
     Nota: data are always stored as little endian.
     """
     logger.debug("CBF decompression using Numpy")
-    listnpa = []
-    key16 = b"\x80"
-    key32 = b"\x00\x80"
-    key64 = b"\x00\x00\x00\x80"
-    shift = 1
-    while True:
-        idx = stream.find(key16)
-        if idx == -1:
-            listnpa.append(numpy.frombuffer(stream, dtype=numpy.int8))
-            break
-        listnpa.append(numpy.frombuffer(stream[:idx], dtype=numpy.int8))
-
-        if stream[idx + 1 : idx + 3] == key32:
-            if stream[idx + 3 : idx + 7] == key64:
-                # 64 bits int
-                res = numpy.frombuffer(stream[idx + 7 : idx + 15], dtype="<q")
-                listnpa.append(res)
-                shift = 15
-            else:
-                # 32 bits int
-                res = numpy.frombuffer(stream[idx + 3 : idx + 7], dtype="<i")
-                listnpa.append(res)
-                shift = 7
-        else:  # int16
-            res = numpy.frombuffer(stream[idx + 1 : idx + 3], dtype="<h")
-            listnpa.append(res)
-            shift = 3
-        stream = stream[idx + shift :]
-    return numpy.ascontiguousarray(numpy.hstack(listnpa), dtype).cumsum()
-
-
-def decByteOffset_cython(stream, size=None, dtype="int64"):
+    raw = numpy.frombuffer(stream, dtype=numpy.uint8)
+    nbytes = raw.size
+    # Padding allows to read the payload of truncated exceptions
+    padded = numpy.zeros(nbytes + 16, dtype=numpy.uint8)
+    padded[:nbytes] = raw
+
+    # Every 0x80 byte is a candidate escape marker. Its token length depends
+    # on the following bytes: 0x80 + int16, 0x80 0x0080 + int32 or
+    # 0x80 0x0080 0x00000080 + int64
+    candidates = numpy.nonzero(raw == 0x80)[0]
+    is32 = (padded[candidates + 1] == 0x00) & (padded[candidates + 2] == 0x80)
+    is64 = (
+        is32
+        & (padded[candidates + 3] == 0x00)
+        & (padded[candidates + 4] == 0x00)
+        & (padded[candidates + 5] == 0x00)
+        & (padded[candidates + 6] == 0x80)
+    )
+    length = numpy.where(is64, 15, numpy.where(is32, 7, 3))
+
+    # Candidates inside the payload of an exception are not markers. After a
+    # marker, the next marker is the first candidate after its payload: the
+    # markers are the path from the first candidate following these links,
+    # which is resolved by pointer doubling.
+    ncand = candidates.size
+    following = numpy.searchsorted(candidates, candidates + length)
+    following = numpy.append(following, ncand)  # sentinel points to itself
+    reached = numpy.zeros(ncand + 1, dtype=bool)
+    reached[0] = True
+    jump = following
+    step = 1
+    while step <= ncand:
+        reached[jump[reached]] = True
+        jump = jump[jump]
+        step *= 2
+    markers = reached[:ncand]
+    positions = candidates[markers]
+    length = length[markers]
+
+    # Bytes of the payloads are consumed, the marker holds the exception
+    consumed = numpy.zeros(nbytes + 16, dtype=numpy.int8)
+    consumed[positions] += 1
+    consumed[positions + length] -= 1
+    keep = numpy.cumsum(consumed[:nbytes]) == 0
+    keep[positions] = True
+
+    values = raw.view(numpy.int8).astype(numpy.int64)
+    if positions.size:
+        # Gather 8 bytes of payload and sign-extend them to the exception size
+        width = (length + 1) // 2
+        offset = positions + length - width
+        gathered = padded[offset[:, None] + numpy.arange(8)]
+        exceptions = numpy.ascontiguousarray(gathered).view("<i8").ravel()
+        shift = (64 - 8 * width).astype(numpy.int64)
+        values[positions] = (exceptions << shift) >> shift
+    return numpy.ascontiguousarray(values[keep], dtype).cumsum()
+
+
+def decByteOffset_cython(stream, size=None, dtype="int64", nthreads=None, out=None):
     """
     Analyze a stream of char with any length of exception:
                 2, 4, or 8 bytes integers
 
     :param stream: string representing the compressed data
     :param size: the size of the output array (of longInts)
+    :param nthreads: number of threads used for the decompression.
+        None or 1 for the serial decoder, 0 to use all cores.
+    :param out: 1D contiguous int32 or int64 array to decode into. It
+        supersedes `size` and `dtype`.
     :return: 1D-ndarray
 
     """
@@ -276,12 +506,20 @@ def decByteOffset_cython(stream, size=None, dtype="int64"):
         logger.error(
             f"Failed to import byte_offset cython module, falling back on numpy method: {error}"
         )
-        return decByteOffset_numpy(stream, size, dtype=dtype)
+        if out is None:
+            return decByteOffset_numpy(stream, size, dtype=dtype)
+        data = decByteOffset_numpy(stream, out.size, dtype=out.dtype)
+        out[: data.size] = data[: out.size]
+        return out[: data.size]
     else:
+        if out is not None:
+            dtype = out.dtype
+        if nthreads is not None and nthreads != 1:
+            return byte_offset.dec_cbf_parallel(stream, size, dtype, nthreads, out)
         if dtype == "int32":
-            return byte_offset.dec_cbf32(stream, size)
+            return byte_offset.dec_cbf32(stream, size, out)
         else:
-            return byte_offset.dec_cbf(stream, size)
+            return byte_offset.dec_cbf(stream, size, out)
 
 
 decByteOffset = decByteOffset_cython
@@ -353,6 +591,55 @@ def compByteOffset_cython(data):
 compByteOffset = compByteOffset_cython
 
 
+def compByteOffset_md5(data, nthreads=None):
+    """
+    Compress a dataset using the byte_offset algorithm with several threads,
+    and compute the MD5 of the compressed data.
+
+    The size of the compressed chunks of the dataset is computed first, so that
+    every chunk is compressed in place in the output. The MD5 is updated with
+    the chunks in order, as soon as they are compressed, while the next ones
+    are still being compressed.
+
+    :param data: ndarray
+    :param int nthreads: number of threads, None to use all cores
+    :return: (compressed data as an array of uint8, base64 encoded MD5)
+    """
+    try:
+        from ..ext import byte_offset
+    except ImportError as error:
+        logger.error(f"Failed to import byte_offset cython module: {error}")
+        blob = compByteOffset_numpy(data)
+        return blob, md5sum(blob)
+    if "int32" in str(data.dtype):
+        ary = numpy.ascontiguousarray(data.ravel(), dtype=numpy.int32)
+    else:
+        ary = numpy.ascontiguousarray(data.ravel(), dtype=numpy.int64)
+    if not nthreads or nthreads < 0:
+        nthreads = os.cpu_count() or 1
+    if nthreads == 1:
+        # No need for the pass computing the size of the chunks
+        blob = compByteOffset_cython(ary)
+        return numpy.frombuffer(blob, dtype=numpy.uint8), md5sum(blob)
+    size = ary.size
+    # More chunks than threads, for the MD5 to overlap the compression
+    chunk = max(1 << 16, -(-size // (4 * nthreads)))
+    sizes = byte_offset.comp_cbf_sizes(ary, chunk, nthreads)
+    ends = numpy.cumsum(sizes)
+    output = numpy.empty(int(ends[-1]) if len(ends) else 0, dtype=numpy.int8)
+    chunks = [
+        (k * chunk, min(size, (k + 1) * chunk), output[end - nbytes : end])
+        for k, (nbytes, end) in enumerate(zip(sizes, ends))
+    ]
+    digest = hashlib.md5()
+    with ThreadPoolExecutor(nthreads) as pool:
+        futures = [pool.submit(byte_offset.comp_cbf_chunk, ary, *c) for c in chunks]
+        for future, (_, _, compressed) in zip(futures, chunks):
+            future.result()
+            digest.update(compressed)
+    return output.view(numpy.uint8), base64.b64encode(digest.digest())
+
+
 def decTY1(raw_8, raw_16=None, raw_32=None):
     """
     Modified byte offset decompressor used in Oxford Diffraction images
@@ -417,6 +704,123 @@ def compTY1(data):
     return data_8.tobytes(), data_16.tobytes(), data_32.tobytes()
 
 
+def decTY5_python(stream, size=None, width=0):
+    """
+    TY5 decompressor used in Oxford Diffraction (CrysAlis) images, in pure python
+
+    :param stream: bytes with the compressed data
+    :param size: number of pixels to decode
+    :param width: number of pixels per row, 0 for a single row
+    :return: 1D int32 ndarray
+    """
+    raw = memoryview(stream).cast("B")
+    stream_size = len(raw)
+    if size is None:
+        size = stream_size
+    if width <= 0:
+        width = size
+    data = numpy.empty(size, dtype=numpy.int32)
+    pos_inp = pos_out = last = 0
+    while pos_inp < stream_size and pos_out < size:
+        if pos_out % width == 0:
+            last = 0
+        value = raw[pos_inp]
+        if value < 254:
+            # this is the normal case: 1 byte encodes one pixel
+            delta = value - 127
+            pos_inp += 1
+        elif value == 254:
+            # the marker 254 is followed by 2 bytes encoding one pixel
+            if pos_inp + 3 > stream_size:
+                break
+            delta = int.from_bytes(raw[pos_inp + 1 : pos_inp + 3], "little", signed=True)
+            pos_inp += 3
+        else:
+            # the marker 255 is followed by 4 bytes encoding one pixel
+            if pos_inp + 5 > stream_size:
+                break
+            delta = int.from_bytes(raw[pos_inp + 1 : pos_inp + 5], "little", signed=True)
+            pos_inp += 5
+        last = (last + delta + 2**31) % 2**32 - 2**31
+        data[pos_out] = last
+        pos_out += 1
+    return data[:pos_out]
+
+
+def decTY5(stream, size=None, width=0, out=None):
+    """
+    TY5 decompressor used in Oxford Diffraction (CrysAlis) images
+
+    Each pixel is stored as the difference with its left neighbour, as one
+    byte with an offset of 127, or as the marker 254 followed by an int16 or
+    the marker 255 followed by an int32 (little endian).
+
+    :param stream: bytes with the compressed data
+    :param size: number of pixels to decode
+    :param width: number of pixels per row, 0 for a single row
+    :param out: 1D contiguous int32 array to decode into
+    :return: 1D int32 ndarray
+    """
+    try:
+        from ..ext import byte_offset
+    except ImportError as error:
+        logger.warning(
+            f"Failed to import byte_offset cython module, falling back on python method: {error}"
+        )
+        if out is None:
+            return decTY5_python(stream, size, width)
+        data = decTY5_python(stream, out.size, width)
+        out[: data.size] = data
+        return out[: data.size]
+    return byte_offset.dec_TY5(stream, size, width, out)
+
+
+def compTY5_numpy(data):
+    """
+    TY5 compressor used in Oxford Diffraction (CrysAlis) images, with numpy
+
+    :param data: 2D ndarray of integers (cast to int32)
+    :return: compressed bytes, number of 16 bits and of 32 bits exceptions
+    """
+    data = numpy.atleast_2d(numpy.asarray(data, dtype=numpy.int32))
+    delta = numpy.diff(data.astype(numpy.int64), axis=-1, prepend=0).ravel()
+    # wraps modulo 2**32 like the decoder
+    delta = delta.astype(numpy.uint32).view(numpy.int32)
+    small = (delta >= -127) & (delta <= 126)
+    medium = ~small & (delta >= -32768) & (delta <= 32767)
+    large = ~(small | medium)
+    lengths = numpy.where(small, 1, numpy.where(medium, 3, 5))
+    start = numpy.cumsum(lengths) - lengths
+    output = numpy.zeros(int(lengths.sum()), dtype=numpy.uint8)
+    output[start[small]] = delta[small] + 127
+    output[start[medium]] = 254
+    output[start[large]] = 255
+    as_bytes = delta.astype(LE_int32).view(numpy.uint8).reshape(-1, 4)
+    for i in range(2):
+        output[start[medium] + 1 + i] = as_bytes[medium, i]
+    for i in range(4):
+        output[start[large] + 1 + i] = as_bytes[large, i]
+    return output.tobytes(), int(medium.sum()), int(large.sum())
+
+
+def compTY5(data):
+    """
+    TY5 compressor used in Oxford Diffraction (CrysAlis) images
+
+    :param data: 2D ndarray of integers (cast to int32), compressed row by row
+    :return: compressed bytes, number of 16 bits and of 32 bits exceptions
+    """
+    try:
+        from ..ext import byte_offset
+    except ImportError as error:
+        logger.warning(
+            f"Failed to import byte_offset cython module, falling back on numpy method: {error}"
+        )
+        return compTY5_numpy(data)
+    stream, n16, n32 = byte_offset.comp_TY5(numpy.atleast_2d(data))
+    return stream.tobytes(), n16, n32
+
+
 def decPCK(
     stream: bytes,
     dim1:int|None=None,
@@ -468,3 +872,57 @@ def compPCK(data):
             "Unable to import mar345_IO to write compressed dataset: {error}"
         )
     return compress_pck(data)
+
+
+def decPackBits_python(stream, size=None):
+    """
+    Decompress a PackBits stream (TIFF compression 32773) in pure python
+
+    :param stream: bytes with the compressed data
+    :param size: expected size of the decompressed data, in bytes
+    :return: 1D uint8 ndarray
+    """
+    stream = memoryview(stream).cast("B")
+    csize = len(stream)
+    output = bytearray()
+    i = 0
+    while i < csize:
+        n = stream[i]
+        i += 1
+        if n < 128:
+            output += stream[i : i + n + 1]
+            i += n + 1
+        elif n > 128:
+            output += bytes(stream[i : i + 1]) * (257 - n)
+            i += 1
+        # 128 (-128 as signed) is a no-op
+        if size is not None and len(output) > size:
+            raise IOError("PackBits data expand beyond %s bytes" % size)
+    return numpy.frombuffer(output, dtype=numpy.uint8)
+
+
+def decPackBits(stream, size=None, out=None):
+    """
+    Decompress a PackBits stream (TIFF compression 32773)
+
+    :param stream: bytes with the compressed data
+    :param size: expected size of the decompressed data, in bytes.
+        Mandatory for the compiled decoder, which otherwise guesses an upper
+        bound.
+    :param out: contiguous buffer to decode into
+    :return: 1D uint8 ndarray, possibly a view on `out`
+    """
+    try:
+        from ..ext import packbits
+    except ImportError as error:
+        logger.debug("Failed to import packbits cython module: %s", error)
+        data = decPackBits_python(stream, size)
+        if out is None:
+            return data
+        out = out.reshape(-1).view(numpy.uint8)
+        out[: data.size] = data
+        return out[: data.size]
+    if size is None:
+        # a single control byte expands to at most 128 bytes
+        size = 128 * len(stream)
+    return packbits.decode(stream, size, out)
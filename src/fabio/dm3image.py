@@ -100,7 +100,9 @@ class Dm3Image(FabioImage):
         self.tag_label_length = None
         self.byte_order = None
 
-    def _readheader(self):
+    def _readheader(self, infile=None):
+        if infile is not None:
+            self.infile = infile
         self.infile.seek(0)
         file_format = self.readbytes(4, BE_uint32)[0]  # should be 3
         if file_format != 3:
@@ -50,11 +50,13 @@ __authors__ = ["Jérôme Kieffer", "Jon Wright", "Henning O. Sorensen", "Erik Kn
 __contact__ = "jerome.kieffer@esrf.fr"
 __license__ = "MIT"
 __copyright__ = "ESRF"
-__date__ = "17/06/2026"
+__date__ = "17/10/2026"
 
 import os
 import re
+import json
 import string
+import hashlib
 import logging
 import numpy
 from collections import namedtuple
@@ -63,7 +65,9 @@ from .fabioutils import isAscii, toAscii, nice_int, OrderedDict, ENDIANNESS
 from .compression import decBzip2, decGzip, decZlib
 from . import compression as compression_module
 from . import fabioutils
+from . import framecache
 from .utils import deprecation
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -171,6 +175,8 @@ class EdfFrame(fabioimage.FabioFrame):
         self._data_compression = None
         self._data_byteorder = None
         self._data = data
+        self.header_start = None
+        """Start position of the header block in the file"""
         self.start = None
         """Start position of the raw data blob in the file"""
         self.blobsize = None
@@ -188,6 +194,8 @@ class EdfFrame(fabioimage.FabioFrame):
         self.bfstart = 0
         """Start position of the raw data in the external file."""
         self.bfsize = None  # Number of bytes to read from the file
+        self.use_mmap = False
+        """If set, uncompressed data are mapped from the file instead of read"""
 
         if number is not None:
             deprecation.deprecated_warning(
@@ -555,6 +563,26 @@ class EdfFrame(fabioimage.FabioFrame):
                 assert False
             shape = self.shape
 
+            if self.use_mmap and self._data_compression is None:
+                with instrumentation.stage("mmap", "edfimage", self.file) as st:
+                    data = self._map_data(shape)
+                    if data is not None:
+                        st.nbytes = data.nbytes
+                if data is not None:
+                    self._data = data
+                    self._dtype = None
+                    return data
+
+            cache_key = self._get_cache_key()
+            if cache_key is not None:
+                entry = framecache.default_cache.get(cache_key)
+                if entry is not None:
+                    # the cached array is shared and read-only
+                    data = numpy.array(entry[0])
+                    self._data = data
+                    self._dtype = None
+                    return data
+
             if self.bfname is None:
                 with self.file.lock:
                     if self.file.closed:
@@ -564,16 +592,18 @@ class EdfFrame(fabioimage.FabioFrame):
                         )
                         return
                     else:
-                        self.file.seek(self.start)
-                        try:
-                            fileData = self.file.read(self.blobsize)
-                        except Exception as e:
-                            if isinstance(self.file, fabioutils.GzipFile):
-                                if compression_module.is_incomplete_gz_block_exception(
-                                    e
-                                ):
-                                    return numpy.zeros(shape)
-                            raise e
+                        with instrumentation.stage("io", "edfimage", self.file) as st:
+                            self.file.seek(self.start)
+                            try:
+                                fileData = self.file.read(self.blobsize)
+                            except Exception as e:
+                                if isinstance(self.file, fabioutils.GzipFile):
+                                    if compression_module.is_incomplete_gz_block_exception(
+                                        e
+                                    ):
+                                        return numpy.zeros(shape)
+                                raise e
+                            st.nbytes = len(fileData)
 
             else:
                 # Read binary data from an external file
@@ -596,38 +626,41 @@ class EdfFrame(fabioimage.FabioFrame):
                     )
 
             if self._data_compression is not None:
-                compression = self._data_compression
-                uncompressed_size = self._dtype.itemsize
-                for i in shape:
-                    uncompressed_size *= i
-                if "OFFSET" in compression:
-                    try:
-                        import byte_offset  # IGNORE:F0401
-                    except ImportError as error:
-                        logger.error(
-                            "Unimplemented compression scheme:  %s (%s)"
-                            % (compression, error)
-                        )
-                    else:
-                        myData = byte_offset.analyseCython(
-                            fileData, size=uncompressed_size
-                        )
-                        rawData = myData.astype(self._dtype).tobytes()
+                with instrumentation.stage(
+                    "decompress", "edfimage", self.file, len(fileData)
+                ):
+                    compression = self._data_compression
+                    uncompressed_size = self._dtype.itemsize
+                    for i in shape:
+                        uncompressed_size *= i
+                    if "OFFSET" in compression:
+                        try:
+                            import byte_offset  # IGNORE:F0401
+                        except ImportError as error:
+                            logger.error(
+                                "Unimplemented compression scheme:  %s (%s)"
+                                % (compression, error)
+                            )
+                        else:
+                            myData = byte_offset.analyseCython(
+                                fileData, size=uncompressed_size
+                            )
+                            rawData = myData.astype(self._dtype).tobytes()
+                            self.size = uncompressed_size
+                    elif compression == "NONE":
+                        rawData = fileData
+                    elif "GZIP" in compression:
+                        rawData = decGzip(fileData)
                         self.size = uncompressed_size
-                elif compression == "NONE":
-                    rawData = fileData
-                elif "GZIP" in compression:
-                    rawData = decGzip(fileData)
-                    self.size = uncompressed_size
-                elif "BZ" in compression:
-                    rawData = decBzip2(fileData)
-                    self.size = uncompressed_size
-                elif "Z" in compression:
-                    rawData = decZlib(fileData)
-                    self.size = uncompressed_size
-                else:
-                    logger.warning("Unknown compression scheme %s" % compression)
-                    rawData = fileData
+                    elif "BZ" in compression:
+                        rawData = decBzip2(fileData)
+                        self.size = uncompressed_size
+                    elif "Z" in compression:
+                        rawData = decZlib(fileData)
+                        self.size = uncompressed_size
+                    else:
+                        logger.warning("Unknown compression scheme %s" % compression)
+                        rawData = fileData
             else:
                 rawData = fileData
 
@@ -648,9 +681,68 @@ class EdfFrame(fabioimage.FabioFrame):
             # PB38k20190607: explicit way: count = get_data_counts(shape)
             count = self.size // self._dtype.itemsize
             stype = self.get_stype(self._dtype, self._data_byteorder)
-            data = numpy.frombuffer(rawData, stype, count).astype(self._dtype).reshape(shape)
+            with instrumentation.stage("convert", "edfimage", self.file, self.size):
+                data = numpy.frombuffer(rawData, stype, count).astype(self._dtype).reshape(shape)
             self._data = data
             self._dtype = None
+            if cache_key is not None:
+                framecache.default_cache.put(cache_key, data, self._header)
+        return data
+
+    def _get_cache_key(self):
+        """Returns the key of this frame in the frame cache, or None if
+        it is not cached.
+
+        Frames look up the cache when they decode their data, so every way
+        to reach them (`get_frame`, `getframe`, `fabio.open(..., frame=n)`)
+        is covered.
+        """
+        cache = framecache.default_cache
+        if not cache.enabled or self.bfname is not None or self._file_index is None:
+            return None
+        filename = getattr(self.file, "name", None)
+        return cache.make_key(filename, "EdfImage", self._file_index)
+
+    def _map_data(self, shape):
+        """
+        Map the uncompressed binary data of this frame into memory, without
+        copy. If self.bfname is set, the external file is mapped.
+
+        Data stored with a non-native byte order are converted once from the
+        map.
+
+        :param tuple shape: shape of the dataset
+        :return: numpy.memmap (copy-on-write) or None if the data can not be
+            mapped (not a plain file, truncated blob, ...)
+        """
+        counts = self.get_data_counts(shape)
+        if counts == 0:
+            return None
+        calcsize = counts * self._dtype.itemsize
+        if self.bfname is None:
+            if not isinstance(self.file, fabioutils.File) or self.file.closed:
+                # compressed file or stream
+                return None
+            if self.blobsize is None or self.blobsize < calcsize:
+                return None
+            filename = self.file.name
+            offset = self.start
+        else:
+            if not os.path.exists(self.bfname) or self.bfsize < calcsize:
+                return None
+            filename = self.bfname
+            offset = self.bfstart
+
+        stype = self.get_stype(self._dtype, self._data_byteorder)
+        try:
+            data = numpy.memmap(
+                filename, dtype=stype, mode="c", offset=offset, shape=shape
+            )
+        except (ValueError, OSError) as error:
+            logger.debug("Unable to map %s at %s: %s", filename, offset, error)
+            return None
+        if not data.dtype.isnative:
+            data = data.astype(self._dtype)
         return data
 
     @property
@@ -693,6 +785,21 @@ class EdfFrame(fabioimage.FabioFrame):
         :return: ascii header block + binary data block
         :rtype: python bytes with the concatenation of the ascii header and the binary data block
         """
+        header_block, data_block = self.get_edf_buffers(force_type, fit2dMode)
+        return header_block + data_block.tobytes()
+
+    def get_edf_buffers(self, force_type=None, fit2dMode=False):
+        """
+        Same as :meth:`get_edf_block` without concatenating the header and
+        the data, which are meant to be written with
+        :func:`fabio.fabioutils.write_buffers`.
+
+        :param force_type: type of the dataset to be enforced like "float64" or "uint16"
+        :type force_type: string or numpy.dtype
+        :param boolean fit2dMode: enforce compatibility with fit2d and starts counting number of images at 1
+        :return: ascii header block, binary data block as a view on the data
+        :rtype: Tuple[bytes,numpy.ndarray]
+        """
         if force_type is not None:
             data = self.data.astype(force_type)
         else:
@@ -804,7 +911,9 @@ class EdfFrame(fabioimage.FabioFrame):
         else:
             headerSize = approxHeaderSize
         listHeader.append(" " * (headerSize - preciseSize) + "}\n")
-        return ("".join(listHeader)).encode("ASCII") + data.tobytes()
+        # Bytes of the data, only copied if not contiguous
+        data_block = numpy.ascontiguousarray(data).reshape(-1).view(numpy.uint8)
+        return ("".join(listHeader)).encode("ASCII"), data_block
 
     @deprecation.deprecated(
         reason="Prefer using 'getEdfBlock'", deprecated_since="0.10.0beta"
@@ -840,6 +949,114 @@ class EdfFrame(fabioimage.FabioFrame):
         """
         return self._data_byteorder
 
+
+class EdfFrameIndex(object):
+    """
+    Persistent index of the frames of EDF files.
+
+    For each frame, the position of the header block, the position and the
+    size of the binary blob and the parsed header are stored, so that a
+    multi-frame file can be re-opened without scanning all its headers.
+
+    The index is stored as JSON, either next to the EDF file or in a cache
+    directory. It is discarded as soon as the size or the modification time
+    of the EDF file changes.
+
+    Usage:
+
+    >>> from fabio.edfimage import EdfImage, EdfFrameIndex
+    >>> EdfImage.frame_index = EdfFrameIndex(cache_dir="/tmp/edf_index")
+    """
+
+    VERSION = 1
+    EXTENSION = ".fidx"
+
+    def __init__(self, cache_dir=None, min_frames=2):
+        """
+        :param str cache_dir: directory where indexes are stored. If None,
+            the index is written next to the EDF file.
+        :param int min_frames: files with less frames are not indexed
+        """
+        self.cache_dir = cache_dir
+        self.min_frames = min_frames
+
+    def get_index_path(self, filename):
+        """
+        :param str filename: name of the EDF file
+        :return: the name of the index file
+        """
+        filename = os.path.abspath(filename)
+        if self.cache_dir is None:
+            return filename + self.EXTENSION
+        key = hashlib.sha1(os.fsencode(filename)).hexdigest()
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+
+    @staticmethod
+    def _stat(filename):
+        stat = os.stat(filename)
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    def load(self, filename):
+        """Read the index of an EDF file
+
+        :param str filename: name of the EDF file
+        :return: the index as a dict or None if missing or outdated
+        """
+        path = self.get_index_path(filename)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as error:
+            logger.warning("Unable to read EDF frame index %s: %s", path, error)
+            return None
+        if index.get("version") != self.VERSION or index.get("stat") != self._stat(
+            filename
+        ):
+            logger.debug("Outdated EDF frame index %s", path)
+            return None
+        return index
+
+    def save(self, filename, frames, generalframe=None, incomplete_file=False):
+        """Write the index of an EDF file
+
+        :param str filename: name of the EDF file
+        :param list frames: list of EdfFrame read from this file
+        :param EdfFrame generalframe: the general block of the file, if any
+        :param bool incomplete_file: True if the file is truncated
+        """
+        if len(frames) < self.min_frames:
+            return
+
+        def describe(frame):
+            return {
+                "header_start": frame.header_start,
+                "start": frame.start,
+                "blobsize": frame.blobsize,
+                "incomplete": frame.incomplete_data,
+                "header": list(frame.header.items()),
+            }
+
+        index = {
+            "version": self.VERSION,
+            "stat": self._stat(filename),
+            "incomplete": incomplete_file,
+            "general": None if generalframe is None else describe(generalframe),
+            "frames": [describe(frame) for frame in frames],
+        }
+        path = self.get_index_path(filename)
+        tmp = "%s.%s.tmp" % (path, os.getpid())
+        try:
+            if self.cache_dir is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp, path)
+        except OSError as error:
+            logger.warning("Unable to write EDF frame index %s: %s", path, error)
+
+
 class EdfImage(fabioimage.FabioImage):
     """Read and try to write the ESRF edf data format"""
 
@@ -858,6 +1075,10 @@ class EdfImage(fabioimage.FabioImage):
         "SIZE",
     ]
 
+    frame_index = None
+    """Instance of :class:`EdfFrameIndex` used to store and retrieve the
+    position of the frames of the files read. None to disable it."""
+
     def __init__(self, data=None, header=None, frames=None, generalframe=None):
         self.currentframe = 0
         self.filesize = None
@@ -903,6 +1124,10 @@ class EdfImage(fabioimage.FabioImage):
         # generalframe
         self.generalframe = generalframe
 
+    def get_frame(self, num):
+        # The frames look up the frame cache when they decode their data
+        return self._get_frame(num)
+
     def _get_frame(self, num):
         if self._frames is None:
             return IndexError("No frames available")
@@ -1188,7 +1413,13 @@ class EdfImage(fabioimage.FabioImage):
         self._frames = []
         self.generalframe = None
 
+        index_filename = self._get_index_filename(infile)
+        if index_filename is not None:
+            if self._read_frame_index(infile, index_filename):
+                return
+
         while True:
+            header_start = infile.tell()
             try:
                 value = self._read_header_block(infile, len(self._frames))
             except MalformedHeaderError:
@@ -1212,9 +1443,12 @@ class EdfImage(fabioimage.FabioImage):
             frame = EdfFrame()
             # The file descriptor is used in _extract_header_metadata and must be defined before using it
             frame.file = infile
+            frame.use_mmap = self.use_mmap
 
             # PB38k20190607: any need for frame._set_container(self,len(self._frames))?
             frame._index = len(self._frames)
+            frame._file_index = frame._index
+            frame.header_start = header_start
 
             defaultheader = None
             if not is_general_header:
@@ -1288,6 +1522,58 @@ class EdfImage(fabioimage.FabioImage):
         # done for each frame in the above loop
         self.currentframe = 0
 
+        if index_filename is not None:
+            self.frame_index.save(
+                index_filename, self._frames, self.generalframe, self._incomplete_file
+            )
+
+    def _get_index_filename(self, infile):
+        """Returns the name of the file to be indexed, None if not applicable
+
+        :param infile: file object open in read mode
+        """
+        if self.frame_index is None:
+            return None
+        filename = getattr(infile, "name", None)
+        if not isinstance(filename, str) or not os.path.isfile(filename):
+            return None
+        return filename
+
+    def _read_frame_index(self, infile, filename):
+        """Populate the frames from the persistent index of the file
+
+        :param infile: file object open in read mode
+        :param str filename: name of the EDF file
+        :return: True if the index was valid and used
+        """
+        index = self.frame_index.load(filename)
+        if index is None:
+            return False
+
+        def create_frame(entry, num, is_general_header=False):
+            frame = EdfFrame()
+            frame.file = infile
+            frame.use_mmap = self.use_mmap
+            frame._index = num
+            frame._file_index = num
+            capsHeader = frame._create_header(OrderedDict(entry["header"]))
+            frame.header_start = entry["header_start"]
+            frame.start = entry["start"]
+            frame.blobsize = entry["blobsize"]
+            frame.incomplete_data = entry["incomplete"]
+            if not is_general_header:
+                frame._extract_header_metadata(capsHeader)
+            return frame
+
+        if index["general"] is not None:
+            self.generalframe = create_frame(index["general"], 0, True)
+        self._frames = [
+            create_frame(entry, num) for num, entry in enumerate(index["frames"])
+        ]
+        self._incomplete_file = index["incomplete"]
+        self.currentframe = 0
+        return True
+
     def read(self, fname, frame=None):
         """
         Read in header into self.header and
@@ -1298,7 +1584,8 @@ class EdfImage(fabioimage.FabioImage):
 
         self._file = self._open(fname, "rb")
         try:
-            self._readheader(self._file)
+            with instrumentation.stage("header", "edfimage", fname):
+                self._readheader(self._file)
             if frame is None:
                 pass
             elif frame < self.nframes:
@@ -1316,6 +1603,32 @@ class EdfImage(fabioimage.FabioImage):
             raise e
         return self
 
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels of an uncompressed frame stored in this file"""
+        # infile is closed after the ROI is read: the frames get their own
+        # file to read their data on demand
+        if self._file is not None:
+            self._file.close()
+        self._file = self._open(infile.name, "rb")
+        self._readheader(self._file)
+        if frame is None:
+            frame = 0
+        if not 0 <= frame < self.nframes:
+            raise IndexError("Requested frame %s out of %s" % (frame, self.nframes))
+        self.currentframe = frame
+        edf_frame = self._frames[frame]
+        if edf_frame._data_compression is not None or edf_frame.bfname is not None:
+            return None
+        shape = edf_frame.shape
+        dtype = edf_frame._dtype
+        if len(shape) != 2 or dtype is None:
+            return None
+        calcsize = edf_frame.get_data_counts(shape) * dtype.itemsize
+        if edf_frame.blobsize is None or edf_frame.blobsize < calcsize:
+            return None
+        stype = self.get_stype(dtype, edf_frame._data_byteorder)
+        return fabioimage.RawLayout(edf_frame.start, shape, stype, dtype)
+
     @deprecation.deprecated
     def swap_needed(self):
         """
@@ -1393,11 +1706,16 @@ class EdfImage(fabioimage.FabioImage):
         if fname == self.filename:
             [(frame.header, frame.data) for frame in self._frames]
             # this is thrown away
+            for frame in self._frames:
+                if isinstance(frame._data, numpy.memmap):
+                    # mapped data would vanish with the truncation of the file
+                    frame._data = numpy.array(frame._data)
         with self._open(fname, mode="wb") as outfile:
             for i, frame in enumerate(self._frames):
                 frame._set_container(self, i)
-                outfile.write(
-                    frame.get_edf_block(force_type=force_type, fit2dMode=fit2dMode)
+                fabioutils.write_buffers(
+                    outfile,
+                    frame.get_edf_buffers(force_type=force_type, fit2dMode=fit2dMode),
                 )
 
     def append_frame(self, frame=None, data=None, header=None):
@@ -1840,6 +2158,10 @@ class EdfImage(fabioimage.FabioImage):
                 try:
                     # read data
                     frame._unpack()
+                    blobend = frame.start + frame.blobsize
+                    if infile.tell() != blobend:
+                        # the data was served by the frame cache
+                        infile.seek(blobend)
                 except Exception as error:
                     if isinstance(infile, fabioutils.GzipFile):
                         if compression_module.is_incomplete_gz_block_exception(error):
@@ -1872,6 +2194,104 @@ class EdfImage(fabioimage.FabioImage):
         infile.close()
 
 
+class EdfWriter(object):
+    """Write an EDF multi-frame file one frame at a time.
+
+    Each frame is written to the file as soon as it is appended, so that the
+    memory used does not depend on the number of frames, unlike
+    :meth:`EdfImage.write` which needs all the frames in memory.
+
+    Usage:
+
+    >>> from fabio.edfimage import EdfWriter
+
+    >>> with EdfWriter("scan.edf", fsync_every=100) as writer:
+    ...     for data, header in acquisition():
+    ...         writer.append_frame(data, header)
+
+    Only uncompressed files are supported.
+    """
+
+    def __init__(
+        self, filename, mode="w", force_type=None, fit2dMode=False, fsync_every=0
+    ):
+        """
+        :param str filename: name of the EDF file
+        :param str mode: "w" to create or truncate the file, "a" to append
+            frames after the ones of an existing file
+        :param force_type: type of the dataset to be enforced like "float64"
+            or "uint16"
+        :param bool fit2dMode: start counting the images at 1
+        :param int fsync_every: flush the file to the disk every this number
+            of frames and when closing. 0 to leave it to the operating system
+        """
+        if mode not in ("w", "a"):
+            raise ValueError("Unsupported mode %s, expected 'w' or 'a'" % mode)
+        if isinstance(filename, fabioutils.PathTypes):
+            if not isinstance(filename, fabioutils.StringTypes):
+                filename = str(filename)
+        if os.path.splitext(filename)[-1] in (".gz", ".bz2"):
+            raise ValueError("Compressed EDF files can not be streamed: %s" % filename)
+        self.filename = filename
+        self.force_type = force_type
+        self.fit2dMode = fit2dMode
+        self.fsync_every = fsync_every
+        self.nframes = 0
+        """Number of frames in the file"""
+        self._unsynced = 0
+
+        if mode == "a" and os.path.exists(filename) and os.path.getsize(filename):
+            # Uses the frame index of EdfImage, when enabled
+            existing = EdfImage()
+            existing.readheader(filename)
+            if existing.incomplete_file:
+                raise IOError("Unable to append to the truncated file %s" % filename)
+            self.nframes = existing.nframes
+        self._file = fabioutils.File(filename, mode + "b")
+
+    def append_frame(self, data, header=None):
+        """Write a frame at the end of the file
+
+        :param numpy.ndarray data: 2D image
+        :param dict header: header of the frame
+        """
+        if self._file is None:
+            raise ValueError("I/O operation on a closed EDF writer")
+        frame = EdfFrame(data, header)
+        frame._index = self.nframes
+        fabioutils.write_buffers(
+            self._file,
+            frame.get_edf_buffers(force_type=self.force_type, fit2dMode=self.fit2dMode),
+        )
+        self.nframes += 1
+        self._unsynced += 1
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Flush the frames written to the disk"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        """Close the file, flushing it to the disk if requested"""
+        if self._file is None:
+            return
+        try:
+            if self.fsync_every and self._unsynced:
+                self.sync()
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, tb):
+        self.close()
+
+
 Frame = EdfFrame
 """Compatibility code with fabio <= 0.8"""
 
@@ -36,6 +36,7 @@ import logging
 import numpy
 from .fabioimage import FabioImage
 from .compression import agi_bitfield
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -236,23 +237,37 @@ class EsperantoImage(FabioImage):
         """
 
         self.resetvals()
+        codec = self.codec_name()
         with self._open(fname) as infile:
-            self._readheader(infile)
+            with instrumentation.stage("header", codec, fname):
+                self._readheader(infile)
 
             if self.format == "4BYTE_LONG":
                 try:
                     pixelsize = 4
                     pixelcount = self.shape[0] * self.shape[1]
-                    data = numpy.frombuffer(
-                        infile.read(pixelsize * pixelcount), dtype=self._dtype
-                    )
-                    self.data = numpy.reshape(data, self.shape)
+                    with instrumentation.stage("io", codec, fname) as st:
+                        raw_data = infile.read(pixelsize * pixelcount)
+                        st.nbytes = len(raw_data)
+                    with instrumentation.stage("convert", codec, fname, len(raw_data)):
+                        data = numpy.frombuffer(raw_data, dtype=self._dtype)
+                        self.data = numpy.reshape(data, self.shape)
                 except Exception as err:
                     raise RuntimeError("Exception while reading pixel data %s." % err)
             elif self.format == "AGI_BITFIELD":
-                raw_data = infile.read()
+                with instrumentation.stage("io", codec, fname) as st:
+                    raw_data = infile.read()
+                    st.nbytes = len(raw_data)
                 try:
-                    self.data = agi_bitfield.decompress(raw_data, self.shape)
+                    with instrumentation.stage(
+                        "decompress", codec, fname, len(raw_data)
+                    ):
+                        if agi_bitfield.decompress_native is not None:
+                            self.data = agi_bitfield.decompress_native(
+                                raw_data, self.shape
+                            )
+                        else:
+                            self.data = agi_bitfield.decompress(raw_data, self.shape)
                 except Exception as err:
                     raise RuntimeError(
                         "Exception while decompressing pixel data %s." % err
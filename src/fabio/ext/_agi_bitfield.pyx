@@ -35,9 +35,11 @@ __date__ = "17/06/2026"
 __contact__ = "Jerome.kieffer@esrf.fr"
 __license__ = "MIT"
 
+import os
 from io import BytesIO
 from struct import pack
 import numpy
+from cython.parallel import prange
 from libc.stdint cimport int32_t, int64_t, uint64_t, uint32_t, uint8_t, uint16_t, int16_t
 ctypedef fused any_int:
     int32_t
@@ -364,7 +366,7 @@ def compress(int32_t [:,::1] frame) -> bytes:
     shape = frame.shape[0]
     assert frame.shape[1] == shape, "Input shape is expected to be square !"
 
-    buffer = numpy.empty(8*shape*shape, numpy.uint8) #Should be able to accomodate 4096² data
+    buffer = numpy.empty(8*shape*shape + 8, numpy.uint8) #Should be able to accomodate 4096² data
     cumsum = numpy.empty(shape, numpy.uint32)
     delta = numpy.empty(shape-1, numpy.int32)
 
@@ -382,3 +384,197 @@ def compress(int32_t [:,::1] frame) -> bytes:
     stype = numpy.dtype("uint32").newbyteorder("<")
     return (numpy.asarray(buffer[:current+4]).tobytes()+
             numpy.asarray(cumsum).astype(stype).tobytes())
+
+
+cdef inline int32_t _read_int16(const uint8_t[::1] block, Py_ssize_t pos) noexcept nogil:
+    return <int16_t> (block[pos] | (block[pos + 1] << 8))
+
+
+cdef inline int32_t _read_int32(const uint8_t[::1] block, Py_ssize_t pos) noexcept nogil:
+    return <int32_t> (<uint32_t> block[pos]
+                      | (<uint32_t> block[pos + 1] << 8)
+                      | (<uint32_t> block[pos + 2] << 16)
+                      | (<uint32_t> block[pos + 3] << 24))
+
+
+cdef Py_ssize_t _read_escaped(const uint8_t[::1] block, Py_ssize_t pos, Py_ssize_t end,
+                              int32_t *value) noexcept nogil:
+    """Read a value which may be escaped
+
+    :return: the position after the value, -1 if the block is truncated
+    """
+    cdef uint8_t byte
+    if pos >= end:
+        return -1
+    byte = block[pos]
+    if byte == 0xFE:
+        if pos + 3 > end:
+            return -1
+        value[0] = _read_int16(block, pos + 1)
+        return pos + 3
+    elif byte == 0xFF:
+        if pos + 5 > end:
+            return -1
+        value[0] = _read_int32(block, pos + 1)
+        return pos + 5
+    value[0] = <int32_t> byte - 127
+    return pos + 1
+
+
+cdef Py_ssize_t _decode_field(const uint8_t[::1] block, Py_ssize_t pos,
+                              Py_ssize_t overflow, Py_ssize_t end, int fieldsize,
+                              int32_t *values) noexcept nogil:
+    """Decode a field of 8 pixel differences stored on `fieldsize` bytes at
+    `pos`, with its escaped values read from `overflow`.
+
+    :return: the position after the overflows read, -1 if truncated
+    """
+    cdef:
+        uint64_t field = 0, val, mask
+        int32_t conv
+        int i
+    if fieldsize < 1 or fieldsize > 8 or pos + fieldsize > end:
+        return -1
+    for i in range(fieldsize):
+        field |= (<uint64_t> block[pos + i]) << (8 * i)
+    if fieldsize == 8:
+        for i in range(8):
+            val = (field >> (8 * i)) & 255
+            if val == 0xFE:
+                if overflow + 2 > end:
+                    return -1
+                values[i] = _read_int16(block, overflow)
+                overflow += 2
+            elif val == 0xFF:
+                if overflow + 4 > end:
+                    return -1
+                values[i] = _read_int32(block, overflow)
+                overflow += 4
+            else:
+                values[i] = <int32_t> val - 127
+    else:
+        mask = ((<uint64_t> 1) << fieldsize) - 1
+        conv = (1 << (fieldsize - 1)) - 1
+        for i in range(8):
+            values[i] = <int32_t> ((field >> (fieldsize * i)) & mask) - conv
+    return overflow
+
+
+cdef Py_ssize_t _decompress_row(const uint8_t[::1] block, Py_ssize_t pos, Py_ssize_t end,
+                                int32_t[::1] output) noexcept nogil:
+    """Decompress a single row starting at `pos` into `output`, pixel
+    differences being accumulated on the fly.
+
+    :return: the position after the row, -1 if the block is truncated
+    """
+    cdef:
+        Py_ssize_t row_length = output.shape[0]
+        Py_ssize_t n_fields, n_restpx, field, i, j, overflow
+        int32_t value, last
+        int32_t values[16]
+        int len_a, len_b
+        uint8_t len_byte
+    if row_length == 0:
+        return pos
+    pos = _read_escaped(block, pos, end, &value)
+    if pos < 0:
+        return -1
+    last = value
+    output[0] = last
+    j = 1
+    n_fields = (row_length - 1) // 16
+    n_restpx = (row_length - 1) % 16
+    for field in range(n_fields):
+        if pos >= end:
+            return -1
+        len_byte = block[pos]
+        len_a = len_byte & 0xF
+        len_b = len_byte >> 4
+        pos += 1
+        overflow = _decode_field(block, pos, pos + len_a + len_b, end, len_a, values)
+        if overflow < 0:
+            return -1
+        overflow = _decode_field(block, pos + len_a, overflow, end, len_b, values + 8)
+        if overflow < 0:
+            return -1
+        pos = overflow
+        for i in range(16):
+            last = last + values[i]
+            output[j] = last
+            j = j + 1
+    for i in range(n_restpx):
+        pos = _read_escaped(block, pos, end, &value)
+        if pos < 0:
+            return -1
+        last = last + value
+        output[j] = last
+        j = j + 1
+    return pos
+
+
+def decompress(comp_frame not None, dimensions, int nthreads=0):
+    """decompresses a frame that was compressed using the agi_bitfield algorithm
+
+    Gil-free implementation of the decompression algorithm. When the table of
+    row offsets stored after the data block is valid, rows are decoded in
+    parallel, else sequentially.
+
+    :param comp_frame: bytes
+    :param dimensions: tuple (rows, columns)
+    :param nthreads: number of threads, 0 to use all cores
+    :return: numpy.ndarray of int32
+    """
+    cdef:
+        const uint8_t[::1] stream = numpy.frombuffer(comp_frame, dtype=numpy.uint8)
+        const uint8_t[::1] block
+        int32_t[:, ::1] output
+        uint32_t[::1] row_start
+        Py_ssize_t row_count, col_count, data_size, row, pos, end
+        Py_ssize_t failed = 0
+        bint use_table = False
+
+    row_count, col_count = dimensions
+    output = numpy.zeros((row_count, col_count), dtype=numpy.int32)
+    if row_count == 0 or col_count == 0:
+        return numpy.asarray(output)
+    if stream.shape[0] < 4:
+        raise IOError("Truncated data")
+    data_size = <uint32_t> _read_int32(stream, 0)
+    if stream.shape[0] < 4 + data_size:
+        raise IOError("Truncated data")
+    block = stream[4:4 + data_size]
+
+    if stream.shape[0] >= 4 + data_size + 4 * row_count:
+        row_start = numpy.frombuffer(
+            comp_frame, dtype="<u4", count=row_count, offset=4 + data_size
+        ).astype(numpy.uint32)
+        use_table = (
+            row_start[0] == 0
+            and row_start[row_count - 1] < data_size
+            and bool(numpy.all(numpy.diff(row_start) > 0))
+        )
+
+    if nthreads <= 0:
+        nthreads = os.cpu_count() or 1
+
+    if use_table:
+        for row in prange(row_count, num_threads=nthreads, schedule="dynamic", nogil=True):
+            if row + 1 < row_count:
+                end = row_start[row + 1]
+            else:
+                end = data_size
+            if _decompress_row(block, row_start[row], end, output[row]) != end:
+                failed += 1
+        if failed == 0:
+            return numpy.asarray(output)
+        # Inconsistent table: fall back on the sequential decoding
+
+    with nogil:
+        pos = 0
+        for row in range(row_count):
+            pos = _decompress_row(block, pos, data_size, output[row])
+            if pos < 0:
+                break
+    if pos < 0:
+        raise IOError("Truncated data")
+    return numpy.asarray(output)
@@ -0,0 +1,328 @@
+# coding: utf-8
+#
+#    Project: X-ray image reader
+#             https://github.com/silx-kit/fabio
+#
+#    Copyright (C) 2026 European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Decompression of the chunks written by the HDF5 filters used by Dectris
+detectors: bitshuffle (filter 32008), optionally with LZ4, and LZ4 (filter
+32004). The chunks are decoded without the GIL, which allows to decode
+several chunks in parallel from threads.
+
+The formats are described in https://github.com/kiyo-masui/bitshuffle and
+https://github.com/nexusformat/HDF5-External-Filter-Plugins/tree/master/LZ4
+"""
+
+__author__ = "Jérôme Kieffer"
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2026, European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "17/10/2026"
+
+import numpy
+import cython
+
+from libc.stdint cimport uint8_t, uint32_t, uint64_t
+from libc.string cimport memcpy, memset
+from libc.stdlib cimport malloc, free
+
+# Default block size of bitshuffle, in bytes
+DEF TARGET_BLOCK_SIZE_B = 8192
+DEF MIN_RECOMMEND_BLOCK = 128
+DEF BLOCKED_MULT = 8
+
+
+cdef inline uint64_t _read_be(const uint8_t *src, int nbytes) noexcept nogil:
+    """Read a big-endian unsigned integer"""
+    cdef:
+        uint64_t value = 0
+        int i
+    for i in range(nbytes):
+        value = (value << 8) | src[i]
+    return value
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _lz4_block(const uint8_t *src, Py_ssize_t csize,
+                           uint8_t *dst, Py_ssize_t size) noexcept nogil:
+    """Decode a raw LZ4 block
+
+    :return: the number of bytes written or -1 on corrupted data
+    """
+    cdef:
+        Py_ssize_t i = 0, j = 0, length, offset, k, count
+        uint8_t token, extra
+    while i < csize:
+        token = src[i]
+        i += 1
+        # literals
+        length = token >> 4
+        if length == 15:
+            while True:
+                if i >= csize:
+                    return -1
+                extra = src[i]
+                i += 1
+                length += extra
+                if extra != 255:
+                    break
+        if length > csize - i or length > size - j:
+            return -1
+        memcpy(dst + j, src + i, length)
+        i += length
+        j += length
+        if i >= csize:
+            # the last sequence has no match
+            break
+        # match
+        if i + 2 > csize:
+            return -1
+        offset = src[i] | (src[i + 1] << 8)
+        i += 2
+        if offset == 0 or offset > j:
+            return -1
+        length = token & 15
+        if length == 15:
+            while True:
+                if i >= csize:
+                    return -1
+                extra = src[i]
+                i += 1
+                length += extra
+                if extra != 255:
+                    break
+        length += 4
+        if length > size - j:
+            return -1
+        if offset >= length:
+            memcpy(dst + j, dst + j - offset, length)
+        elif offset == 1:
+            memset(dst + j, dst[j - 1], length)
+        else:
+            # overlapping copy: the pattern of `offset` bytes is repeated,
+            # doubling the size of the copied blocks
+            k = 0
+            while k < length:
+                count = min(offset + k, length - k)
+                memcpy(dst + j + k, dst + j - offset, count)
+                k += count
+        j += length
+    return j
+
+
+cdef inline uint64_t _transpose8(uint64_t x) noexcept nogil:
+    """Transpose a 8x8 bit matrix stored in the 8 bytes of an integer"""
+    cdef uint64_t t
+    t = (x ^ (x >> 7)) & 0x00AA00AA00AA00AAULL
+    x = x ^ t ^ (t << 7)
+    t = (x ^ (x >> 14)) & 0x0000CCCC0000CCCCULL
+    x = x ^ t ^ (t << 14)
+    t = (x ^ (x >> 28)) & 0x00000000F0F0F0F0ULL
+    x = x ^ t ^ (t << 28)
+    return x
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _bitunshuffle(const uint8_t *src, uint8_t *dst,
+                        Py_ssize_t nelem, Py_ssize_t elem_size) noexcept nogil:
+    """Undo the bit-transposition of a block of `nelem` elements
+
+    `nelem` is a multiple of 8. The input holds 8*elem_size rows of nelem/8
+    bytes: row 8*j+b contains the bit b of the byte j of all the elements.
+    """
+    cdef:
+        Py_ssize_t row_size = nelem // 8
+        Py_ssize_t j, k, b, t
+        uint64_t x
+        const uint8_t *rows
+    for j in range(elem_size):
+        rows = src + 8 * j * row_size
+        for k in range(row_size):
+            x = 0
+            for b in range(8):
+                x |= (<uint64_t> rows[b * row_size + k]) << (8 * b)
+            x = _transpose8(x)
+            for t in range(8):
+                dst[(8 * k + t) * elem_size + j] = <uint8_t> (x >> (8 * t))
+
+
+cdef Py_ssize_t _default_block_size(Py_ssize_t elem_size) noexcept nogil:
+    cdef Py_ssize_t block_size = TARGET_BLOCK_SIZE_B // elem_size
+    block_size = (block_size // BLOCKED_MULT) * BLOCKED_MULT
+    return max(block_size, MIN_RECOMMEND_BLOCK)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _bitshuffle(const uint8_t *src, Py_ssize_t csize, uint8_t *dst,
+                     Py_ssize_t nelem, Py_ssize_t elem_size,
+                     Py_ssize_t block_size, bint lz4) noexcept nogil:
+    """Decode a bitshuffle stream of nelem elements, block per block
+
+    :return: 0 on success, -1 on corrupted data, -2 on memory error
+    """
+    cdef:
+        Py_ssize_t done = 0, block, nbytes, pos = 0, last
+        uint64_t compressed
+        uint8_t *tmp = NULL
+    if lz4:
+        tmp = <uint8_t *> malloc(block_size * elem_size)
+        if tmp == NULL:
+            return -2
+    try:
+        while done < nelem:
+            block = min(block_size, nelem - done)
+            block -= block % BLOCKED_MULT
+            if block == 0:
+                break
+            nbytes = block * elem_size
+            if lz4:
+                if pos + 4 > csize:
+                    return -1
+                compressed = _read_be(src + pos, 4)
+                pos += 4
+                if <Py_ssize_t> compressed > csize - pos:
+                    return -1
+                if _lz4_block(src + pos, compressed, tmp, nbytes) != nbytes:
+                    return -1
+                pos += compressed
+                _bitunshuffle(tmp, dst + done * elem_size, block, elem_size)
+            else:
+                if pos + nbytes > csize:
+                    return -1
+                _bitunshuffle(src + pos, dst + done * elem_size, block, elem_size)
+                pos += nbytes
+            done += block
+        # the remaining elements are stored as they are
+        last = (nelem - done) * elem_size
+        if pos + last > csize:
+            return -1
+        memcpy(dst + done * elem_size, src + pos, last)
+    finally:
+        free(tmp)
+    return 0
+
+
+def _as_output(out, Py_ssize_t size):
+    """Byte view of the output buffer, allocated if needed"""
+    if out is None:
+        return numpy.empty(size, dtype=numpy.uint8)
+    out = out.reshape(-1).view(numpy.uint8)
+    if out.size < size:
+        raise ValueError("Output buffer of %s bytes is too small, %s needed" % (out.size, size))
+    return out[:size]
+
+
+def bitshuffle_decompress(chunk not None, Py_ssize_t elem_size, Py_ssize_t size=-1,
+                          Py_ssize_t block_size=0, bint lz4=True, out=None):
+    """Decompress a chunk written by the bitshuffle HDF5 filter
+
+    :param chunk: bytes of the chunk as stored in the file
+    :param elem_size: size of an element in bytes
+    :param size: size of the decompressed chunk in bytes. Only needed when
+        the chunk is not compressed with LZ4, it is read from the header else.
+    :param block_size: number of elements per block, 0 for the default. Only
+        used when the chunk is not compressed with LZ4.
+    :param lz4: True if the chunk is compressed with LZ4
+    :param out: contiguous buffer to decode into
+    :return: 1D uint8 array with the decompressed bytes
+    """
+    cdef:
+        const uint8_t[::1] cstream = numpy.frombuffer(chunk, dtype=numpy.uint8)
+        uint8_t[::1] output
+        Py_ssize_t csize = cstream.shape[0], offset = 0
+        int error
+    if elem_size <= 0:
+        raise ValueError("Invalid element size %s" % elem_size)
+    if lz4:
+        if csize < 12:
+            raise IOError("Bitshuffle chunk is too short")
+        size = _read_be(&cstream[0], 8)
+        block_size = _read_be(&cstream[8], 4) // elem_size
+        offset = 12
+    elif size < 0:
+        raise ValueError("The decompressed size is needed for uncompressed bitshuffle")
+    if block_size <= 0:
+        block_size = _default_block_size(elem_size)
+    if block_size % BLOCKED_MULT:
+        raise IOError("Bitshuffle block size %s is not a multiple of 8" % block_size)
+    result = _as_output(out, size)
+    output = result
+    if size == 0:
+        return result
+    with nogil:
+        error = _bitshuffle(&cstream[0] + offset, csize - offset, &output[0],
+                            size // elem_size, elem_size, block_size, lz4)
+    if error == -2:
+        raise MemoryError("Unable to allocate the bitshuffle buffer")
+    elif error:
+        raise IOError("Corrupted bitshuffle chunk")
+    return result
+
+
+def lz4_decompress(chunk not None, out=None):
+    """Decompress a chunk written by the LZ4 HDF5 filter (32004)
+
+    :param chunk: bytes of the chunk as stored in the file
+    :param out: contiguous buffer to decode into
+    :return: 1D uint8 array with the decompressed bytes
+    """
+    cdef:
+        const uint8_t[::1] cstream = numpy.frombuffer(chunk, dtype=numpy.uint8)
+        uint8_t[::1] output
+        Py_ssize_t csize = cstream.shape[0], size, block_size, pos = 12, done = 0
+        Py_ssize_t block, compressed
+        bint corrupted = False
+    if csize < 12:
+        raise IOError("LZ4 chunk is too short")
+    size = _read_be(&cstream[0], 8)
+    block_size = _read_be(&cstream[8], 4)
+    if block_size <= 0:
+        raise IOError("Invalid LZ4 block size %s" % block_size)
+    result = _as_output(out, size)
+    output = result
+    with nogil:
+        while done < size:
+            block = min(block_size, size - done)
+            if pos + 4 > csize:
+                corrupted = True
+                break
+            compressed = _read_be(&cstream[pos], 4)
+            pos += 4
+            if compressed > csize - pos:
+                corrupted = True
+                break
+            if compressed == block:
+                # stored without compression
+                memcpy(&output[done], &cstream[pos], block)
+            elif _lz4_block(&cstream[pos], compressed, &output[done], block) != block:
+                corrupted = True
+                break
+            pos += compressed
+            done += block
+    if corrupted:
+        raise IOError("Corrupted LZ4 chunk")
+    return result
@@ -35,17 +35,23 @@ __author__ = "Jérôme Kieffer"
 __contact__ = "jerome.kieffer@esrf.eu"
 __license__ = "MIT"
 __copyright__ = "2010-2016, European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "27/10/2025"
+__date__ = "17/10/2026"
 
 
+import os
 import numpy
 import cython
+from cython.parallel import prange
 
 from libc.stdint cimport int8_t, uint8_t, \
                          uint16_t, int16_t,\
                          int32_t, uint32_t,\
                          int64_t, uint64_t
 
+ctypedef fused any_int:
+    int32_t
+    int64_t
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -144,11 +150,147 @@ def comp_cbf(data not None):
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def dec_cbf(bytes stream not None, size=None):
+cdef Py_ssize_t _comp_size(any_int[::1] ary,
+                           Py_ssize_t start,
+                           Py_ssize_t stop) noexcept nogil:
+    """Size in bytes of ary[start:stop] once compressed, the value preceding
+    ary[start] being the reference"""
+    cdef:
+        Py_ssize_t i, size = 0
+        any_int last, delta
+        int64_t absdelta
+    last = ary[start - 1] if start > 0 else 0
+    for i in range(start, stop):
+        delta = ary[i] - last
+        # same overflow as the type of the data, like comp_cbf32
+        absdelta = <any_int> (delta if delta > 0 else -delta)
+        if absdelta >= (<int64_t> 1) << 31:
+            size += 15
+        elif absdelta >= 1 << 15:
+            size += 7
+        elif absdelta >= 1 << 7:
+            size += 3
+        else:
+            size += 1
+        last = ary[i]
+    return size
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _comp_chunk(any_int[::1] ary,
+                            Py_ssize_t start,
+                            Py_ssize_t stop,
+                            int8_t[::1] output) noexcept nogil:
+    """Compress ary[start:stop] into output, which has the size given by
+    _comp_size. Same encoding as comp_cbf32 and comp_cbf
+
+    :return: the number of bytes written, -1 if output is too small
+    """
+    cdef:
+        Py_ssize_t i, j = 0, length = output.shape[0]
+        any_int last, delta
+        int64_t absdelta
+    last = ary[start - 1] if start > 0 else 0
+    for i in range(start, stop):
+        if j + 15 > length and j + _comp_size(ary, i, i + 1) > length:
+            return -1
+        delta = ary[i] - last
+        absdelta = <any_int> (delta if delta > 0 else -delta)
+        if absdelta >= (<int64_t> 1) << 31:
+            output[j] = -128
+            output[j + 1] = 0
+            output[j + 2] = -128
+            output[j + 3] = 0
+            output[j + 4] = 0
+            output[j + 5] = 0
+            output[j + 6] = -128
+            output[j + 7] = (delta & 255)
+            output[j + 8] = (delta >> 8) & 255
+            output[j + 9] = (delta >> 16) & 255
+            output[j + 10] = (delta >> 24) & 255
+            output[j + 11] = (<int64_t> delta >> 32) & 255
+            output[j + 12] = (<int64_t> delta >> 40) & 255
+            output[j + 13] = (<int64_t> delta >> 48) & 255
+            output[j + 14] = (<int64_t> delta >> 56) & 255
+            j += 15
+        elif absdelta >= 1 << 15:
+            output[j] = -128
+            output[j + 1] = 0
+            output[j + 2] = -128
+            output[j + 3] = (delta & 255)
+            output[j + 4] = (delta >> 8) & 255
+            output[j + 5] = (delta >> 16) & 255
+            output[j + 6] = (delta >> 24)
+            j += 7
+        elif absdelta >= 1 << 7:
+            output[j] = -128
+            output[j + 1] = delta & 255
+            output[j + 2] = (delta >> 8) & 255
+            j += 3
+        else:
+            output[j] = delta
+            j += 1
+        last = ary[i]
+    return j
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def comp_cbf_sizes(any_int[::1] ary not None, Py_ssize_t chunk, int nthreads=0):
+    """Size of the compressed chunks of a dataset, computed with several
+    threads. This is the first pass of a parallel compression, the chunks
+    are then compressed by :func:`comp_cbf_chunk` at their offset.
+
+    :param ary: contiguous array of int32 (encoded like comp_cbf32) or int64
+        (encoded like comp_cbf)
+    :param chunk: number of pixels per chunk
+    :param nthreads: number of threads, 0 to use all cores
+    :return: numpy array of int64 with the size in bytes of every chunk
+    """
+    cdef:
+        Py_ssize_t size = ary.shape[0]
+        Py_ssize_t nchunks = (size + chunk - 1) // chunk
+        Py_ssize_t k
+        int64_t[::1] sizes = numpy.zeros(nchunks, dtype=numpy.int64)
+    if nthreads <= 0:
+        nthreads = os.cpu_count() or 1
+    with nogil:
+        for k in prange(nchunks, num_threads=nthreads, schedule="static"):
+            sizes[k] = _comp_size(ary, k * chunk, min((k + 1) * chunk, size))
+    return numpy.asarray(sizes)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def comp_cbf_chunk(any_int[::1] ary not None,
+                   Py_ssize_t start,
+                   Py_ssize_t stop,
+                   int8_t[::1] output not None):
+    """Compress ary[start:stop] into output, without the GIL
+
+    :param ary: contiguous array of int32 or int64
+    :param start: index of the first pixel of the chunk
+    :param stop: index after the last pixel of the chunk
+    :param output: array of int8 with the size given by :func:`comp_cbf_sizes`
+    """
+    cdef Py_ssize_t written
+    if not 0 <= start <= stop <= ary.shape[0]:
+        raise IndexError("Chunk %s:%s out of the dataset" % (start, stop))
+    with nogil:
+        written = _comp_chunk(ary, start, stop, output)
+    if written != output.shape[0]:
+        raise ValueError("Output does not have the size of the compressed chunk")
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def dec_cbf(bytes stream not None, size=None, out=None):
     """
     Analyze a stream of char with any length of exception (2,4, or 8 bytes integers)
     :param stream: bytes (string) representing the compressed data
     :param size: the size of the output array (of longInts)
+    :param out: 1D contiguous int64 array to decode into (sets the size)
     :return: int64 ndArrays
     """
     cdef:
@@ -175,12 +317,15 @@ def dec_cbf(bytes stream not None, size=None):
         uint8_t[::1] cstream = bytearray(stream)
         int64_t[::1] data_out
 
-    if size is None:
-        csize = lenStream
+    if out is not None:
+        data_out = out
+        csize = data_out.shape[0]
     else:
-        csize = < int > size
-
-    data_out = numpy.empty(csize, dtype=numpy.int64)
+        if size is None:
+            csize = lenStream
+        else:
+            csize = < int > size
+        data_out = numpy.empty(csize, dtype=numpy.int64)
 
     with nogil:
         while (i < lenStream) and (j < csize):
@@ -221,17 +366,20 @@ def dec_cbf(bytes stream not None, size=None):
             data_out[j] = last
             j += 1
 
+    if out is not None:
+        return out[:j]
     return data_out[:j]
 
 
 @cython.boundscheck(False)
-def dec_cbf32(bytes stream not None, size=None):
+def dec_cbf32(bytes stream not None, size=None, out=None):
     """
     Analyze a stream of char with any length of exception (2 or 4 bytes integers)
     Optimized for int32 decompression
 
     :param stream: bytes (string) representing the compressed data
     :param size: the size of the output array (of longInts)
+    :param out: 1D contiguous int32 array to decode into (sets the size)
     :return: int64 ndArrays
     """
     cdef:
@@ -253,11 +401,15 @@ def dec_cbf32(bytes stream not None, size=None):
         int lenStream = < int > len(stream)
         uint8_t[:] cstream = bytearray(stream)
         int32_t[::1] data_out
-    if size is None:
-        csize = lenStream
+    if out is not None:
+        data_out = out
+        csize = data_out.shape[0]
     else:
-        csize = < int > size
-    data_out = numpy.empty(csize, dtype=numpy.int32)
+        if size is None:
+            csize = lenStream
+        else:
+            csize = < int > size
+        data_out = numpy.empty(csize, dtype=numpy.int32)
     with nogil:
         while (i < lenStream) and (j < csize):
             if (cstream[i] == key8):
@@ -283,52 +435,304 @@ def dec_cbf32(bytes stream not None, size=None):
             data_out[j] = last
             j += 1
 
+    if out is not None:
+        return out[:j]
     return numpy.asarray(data_out[:j])
 
 
 @cython.boundscheck(False)
-def dec_TY5(bytes stream not None, size=None):
+@cython.wraparound(False)
+cdef Py_ssize_t _dec_TY5(const uint8_t[::1] cstream,
+                         int32_t[::1] data_out,
+                         Py_ssize_t width) noexcept nogil:
+    """Decode a TY5 stream, the accumulator being reset at every row
+
+    :return: the number of decoded pixels
+    """
+    cdef:
+        Py_ssize_t i = 0, j = 0, col = 0
+        Py_ssize_t lenStream = cstream.shape[0]
+        Py_ssize_t csize = data_out.shape[0]
+        uint8_t key
+        int64_t last = 0, delta
+    while (i < lenStream) and (j < csize):
+        if col == width:
+            col = 0
+            last = 0
+        key = cstream[i]
+        if key < 254:
+            delta = <int64_t> key - 127
+            i += 1
+        elif key == 254:
+            if i + 2 >= lenStream:
+                break
+            delta = <int16_t> (cstream[i + 1] | (cstream[i + 2] << 8))
+            i += 3
+        else:
+            if i + 4 >= lenStream:
+                break
+            delta = <int32_t> (<uint32_t> cstream[i + 1] |
+                               (<uint32_t> cstream[i + 2] << 8) |
+                               (<uint32_t> cstream[i + 3] << 16) |
+                               (<uint32_t> cstream[i + 4] << 24))
+            i += 5
+        # wraps like the 32 bits accumulator of the encoder
+        last = <int32_t> (last + delta)
+        data_out[j] = <int32_t> last
+        j += 1
+        col += 1
+    return j
+
+
+def dec_TY5(stream not None, size=None, Py_ssize_t width=0, out=None):
     """
     Analyze a stream of char with a TY5 compression scheme and exception (2 or 4 bytes integers)
 
-    TODO: known broken, FIXME
+    Each pixel is stored as the difference with its left neighbour:
+    one byte with an offset of 127, or the marker 254 followed by a
+    little-endian int16, or the marker 255 followed by a little-endian int32.
 
     :param stream: bytes (string) representing the compressed data
-    :param size: the size of the output array (of longInts)
+    :param size: the size of the output array
+    :param width: number of pixels per row, the first pixel of a row being
+        relative to 0. 0 means a single row.
+    :param out: 1D contiguous int32 array to decode into. It supersedes `size`.
     :return: int32 ndArrays
     """
+    cdef:
+        const uint8_t[::1] cstream = numpy.frombuffer(stream, dtype=numpy.uint8)
+        int32_t[::1] data_out
+        Py_ssize_t j
+
+    if out is None:
+        if size is None:
+            size = cstream.shape[0]
+        out = numpy.empty(size, dtype=numpy.int32)
+    data_out = out
+    if width <= 0:
+        width = data_out.shape[0]
+    with nogil:
+        j = _dec_TY5(cstream, data_out, width)
+    return out[:j]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def comp_TY5(data not None):
+    """Compress a 2D dataset using the TY5 scheme, row by row
 
+    :param data: 2D array of integers (cast to int32)
+    :return: numpy array of uint8, number of 16 bits and of 32 bits exceptions
+    """
     cdef:
-        int               i = 0
-        int               j = 0
-        int32_t    last = 0
-        int32_t    current = 0
-        uint8_t    key8 = 0xfe  # 127+127
-        int32_t    tmp32a = 0
-        int32_t    tmp32b = 0
+        int32_t[:, ::1] ary = numpy.ascontiguousarray(data, dtype=numpy.int32)
+        Py_ssize_t height = ary.shape[0], width = ary.shape[1]
+        Py_ssize_t r, c, j = 0, n16 = 0, n32 = 0
+        uint8_t[::1] output = numpy.empty(max(height * width * 5, 1), dtype=numpy.uint8)
+        int32_t last, delta
+        uint32_t udelta
+    with nogil:
+        for r in range(height):
+            last = 0
+            for c in range(width):
+                # modulo 2**32 difference
+                udelta = <uint32_t> ary[r, c] - <uint32_t> last
+                delta = <int32_t> udelta
+                last = ary[r, c]
+                if -127 <= delta <= 126:
+                    output[j] = <uint8_t> (delta + 127)
+                    j += 1
+                elif -32768 <= delta <= 32767:
+                    output[j] = 254
+                    output[j + 1] = udelta & 255
+                    output[j + 2] = (udelta >> 8) & 255
+                    j += 3
+                    n16 += 1
+                else:
+                    output[j] = 255
+                    output[j + 1] = udelta & 255
+                    output[j + 2] = (udelta >> 8) & 255
+                    output[j + 3] = (udelta >> 16) & 255
+                    output[j + 4] = (udelta >> 24) & 255
+                    j += 5
+                    n32 += 1
+    return numpy.asarray(output)[:j], n16, n32
 
-        int csize
-        int lenStream = len(stream)
-        uint8_t[::1] cstream = bytearray(stream)
-        int32_t[::1] data_out
 
-    if size is None:
-        csize = lenStream
-    else:
-        csize = < int > size
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline Py_ssize_t _token_size(const uint8_t[::1] cstream,
+                                   Py_ssize_t pos,
+                                   Py_ssize_t length) noexcept nogil:
+    """Size in bytes of the byte-offset token starting at pos (1, 3, 7 or 15)"""
+    if cstream[pos] != 0x80:
+        return 1
+    if (pos + 2 < length) and (cstream[pos + 1] == 0x00) and (cstream[pos + 2] == 0x80):
+        if (pos + 6 < length) and (cstream[pos + 3] == 0x00) and (cstream[pos + 4] == 0x00) \
+                and (cstream[pos + 5] == 0x00) and (cstream[pos + 6] == 0x80):
+            return 15
+        return 7
+    return 3
 
-    data_out = numpy.zeros(csize, dtype=numpy.int32)
-    if True:
-        while (i < lenStream) and (j < csize):
-            if (cstream[i] == key8):
-                    tmp32a = cstream[i + 1] - 127
-                    tmp32b = <int16_t>( <int8_t> cstream[i + 2] << 8 )
-                    current = (tmp32b) | (tmp32a)
-                    i += 3
-            else:
-                current = <int32_t>(<uint8_t> cstream[i]) - 127
-                i += 1
-            last += current
-            data_out[j] = last
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int64_t _token_value(const uint8_t[::1] cstream,
+                                 Py_ssize_t pos,
+                                 Py_ssize_t size) noexcept nogil:
+    """Delta stored in the token of the given size starting at pos"""
+    cdef:
+        uint64_t tmp64 = 0
+        int k
+    if size == 1:
+        return <int8_t> cstream[pos]
+    elif size == 3:
+        return <int16_t> (<uint16_t> cstream[pos + 1] | (<uint16_t> cstream[pos + 2] << 8))
+    elif size == 7:
+        return <int32_t> (<uint32_t> cstream[pos + 3] | (<uint32_t> cstream[pos + 4] << 8) |
+                          (<uint32_t> cstream[pos + 5] << 16) | (<uint32_t> cstream[pos + 6] << 24))
+    for k in range(8):
+        tmp64 = tmp64 | (<uint64_t> cstream[pos + 7 + k] << (8 * k))
+    return <int64_t> tmp64
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int64_t _sum_chunk(const uint8_t[::1] cstream,
+                        Py_ssize_t pos,
+                        Py_ssize_t count) noexcept nogil:
+    """Sum of the `count` deltas starting at pos"""
+    cdef:
+        int64_t total = 0
+        Py_ssize_t j, size, length = cstream.shape[0]
+    for j in range(count):
+        size = _token_size(cstream, pos, length)
+        total = total + _token_value(cstream, pos, size)
+        pos = pos + size
+    return total
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _decode_chunk(const uint8_t[::1] cstream,
+                        Py_ssize_t pos,
+                        any_int[::1] output,
+                        Py_ssize_t start,
+                        Py_ssize_t stop,
+                        int64_t last) noexcept nogil:
+    """Decode output[start:stop] from the tokens starting at pos, `last`
+    being the value preceding output[start]"""
+    cdef:
+        Py_ssize_t j, size, length = cstream.shape[0]
+    for j in range(start, stop):
+        size = _token_size(cstream, pos, length)
+        last = last + _token_value(cstream, pos, size)
+        output[j] = <any_int> last
+        pos = pos + size
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _dec_cbf_parallel(const uint8_t[::1] cstream,
+                                  any_int[::1] output,
+                                  Py_ssize_t[::1] chunk_pos,
+                                  int64_t[::1] chunk_sum,
+                                  int nthreads) noexcept nogil:
+    """Two-pass parallel byte-offset decoder
+
+    1. the token boundaries of the chunks are located (serial, no decoding)
+    2. the sum of the deltas of every chunk is computed in parallel, then
+       prefix-summed to get the value preceding each chunk
+    3. every chunk is decoded in parallel, starting from its prefix
+
+    :return: the number of decoded values
+    """
+    cdef:
+        Py_ssize_t length = cstream.shape[0]
+        Py_ssize_t npix = output.shape[0]
+        Py_ssize_t nchunks = chunk_pos.shape[0]
+        Py_ssize_t chunk, ndecoded, k, j, stop, pos, size
+        int64_t last, tmp
+    chunk = (npix + nchunks - 1) // nchunks
+    if chunk == 0:
+        return 0
+    pos = 0
+    j = 0
+    for k in range(nchunks):
+        chunk_pos[k] = pos
+        stop = min(j + chunk, npix)
+        while j < stop:
+            size = _token_size(cstream, pos, length)
+            if pos + size > length:
+                break
+            pos += size
             j += 1
-    return numpy.asarray(data_out[:j])
+        if j < stop:
+            # Truncated stream
+            break
+    ndecoded = j
+
+    for k in prange(nchunks, num_threads=nthreads, schedule="static"):
+        if k * chunk < ndecoded:
+            chunk_sum[k] = _sum_chunk(cstream, chunk_pos[k],
+                                      min(chunk, ndecoded - k * chunk))
+
+    last = 0
+    for k in range(nchunks):
+        tmp = chunk_sum[k]
+        chunk_sum[k] = last
+        last += tmp
+
+    for k in prange(nchunks, num_threads=nthreads, schedule="static"):
+        if k * chunk < ndecoded:
+            _decode_chunk(cstream, chunk_pos[k], output, k * chunk,
+                          min((k + 1) * chunk, ndecoded), chunk_sum[k])
+    return ndecoded
+
+
+def dec_cbf_parallel(stream not None, size=None, dtype="int64", int nthreads=0, out=None):
+    """
+    Analyze a stream of char with any length of exception (2, 4, or 8 bytes integers)
+    using several threads.
+
+    The stream is split in as many chunks as threads, which are decoded
+    independently before being stitched together with their prefix sum.
+
+    :param stream: bytes (string) representing the compressed data
+    :param size: the size of the output array (of longInts)
+    :param dtype: "int32" or "int64", type of the output array
+    :param nthreads: number of threads, 0 to use all cores
+    :param out: 1D contiguous int32 or int64 array to decode into (sets the
+        size and the dtype)
+    :return: int32 or int64 ndArrays
+    """
+    cdef:
+        const uint8_t[::1] cstream = numpy.frombuffer(stream, dtype=numpy.uint8)
+        Py_ssize_t csize, ndecoded
+        Py_ssize_t[::1] chunk_pos
+        int64_t[::1] chunk_sum
+        int32_t[::1] data_out32
+        int64_t[::1] data_out64
+
+    if out is not None:
+        csize = out.shape[0]
+        dtype = out.dtype
+    elif size is None:
+        csize = cstream.shape[0]
+    else:
+        csize = <Py_ssize_t> size
+    if nthreads <= 0:
+        nthreads = os.cpu_count() or 1
+    chunk_pos = numpy.zeros(max(1, min(nthreads, csize)), dtype=numpy.intp)
+    chunk_sum = numpy.zeros(chunk_pos.shape[0], dtype=numpy.int64)
+
+    if numpy.dtype(dtype) == numpy.int32:
+        data_out32 = numpy.empty(csize, dtype=numpy.int32) if out is None else out
+        with nogil:
+            ndecoded = _dec_cbf_parallel(cstream, data_out32, chunk_pos, chunk_sum, nthreads)
+        return numpy.asarray(data_out32)[:ndecoded]
+    else:
+        data_out64 = numpy.empty(csize, dtype=numpy.int64) if out is None else out
+        with nogil:
+            ndecoded = _dec_cbf_parallel(cstream, data_out64, chunk_pos, chunk_sum, nthreads)
+        return numpy.asarray(data_out64)[:ndecoded]
@@ -0,0 +1,108 @@
+# coding: utf-8
+#
+#    Project: X-ray image reader
+#             https://github.com/silx-kit/fabio
+#
+#    Copyright (C) 2026 European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+PackBits is the run-length encoding used by TIFF (compression 32773) and
+by some detector formats. This file contains the decompression function
+from a string to an uint8 numpy array.
+"""
+
+__author__ = "Jérôme Kieffer"
+__contact__ = "jerome.kieffer@esrf.eu"
+__license__ = "MIT"
+__copyright__ = "2026, European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "17/10/2026"
+
+import numpy
+import cython
+
+from libc.stdint cimport int8_t, uint8_t
+from libc.string cimport memcpy, memset
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _decode(const uint8_t[::1] cstream,
+                        uint8_t[::1] output) noexcept nogil:
+    """Decode the PackBits stream into the output buffer
+
+    :return: the number of bytes written, or -1 if the output is too small
+    """
+    cdef:
+        Py_ssize_t csize = cstream.shape[0]
+        Py_ssize_t size = output.shape[0]
+        Py_ssize_t i = 0, j = 0, count
+        int8_t n
+    while i < csize:
+        n = <int8_t> cstream[i]
+        i += 1
+        if n >= 0:
+            # literal run of n+1 bytes
+            count = n + 1
+            if count > csize - i:
+                # truncated stream: keep what is there
+                count = csize - i
+            if j + count > size:
+                return -1
+            memcpy(&output[j], &cstream[i], count)
+            i += count
+            j += count
+        elif n != -128:
+            # replicate the next byte 1-n times
+            count = 1 - n
+            if i >= csize:
+                break
+            if j + count > size:
+                return -1
+            memset(&output[j], cstream[i], count)
+            i += 1
+            j += count
+        # -128 is a no-op
+    return j
+
+
+def decode(stream not None, Py_ssize_t size, out=None):
+    """Decompress a PackBits stream
+
+    :param stream: bytes-like object with the compressed data
+    :param size: expected size of the decompressed data, in bytes
+    :param out: contiguous uint8 buffer of at least `size` bytes to decode into
+    :return: 1D uint8 array with the decompressed bytes. It is shorter than
+        `size` if the stream is truncated.
+    """
+    cdef:
+        const uint8_t[::1] cstream = numpy.frombuffer(stream, dtype=numpy.uint8)
+        uint8_t[::1] output
+        Py_ssize_t written
+    if out is None:
+        out = numpy.empty(size, dtype=numpy.uint8)
+    else:
+        out = out.reshape(-1).view(numpy.uint8)[:size]
+    output = out
+    with nogil:
+        written = _decode(cstream, output)
+    if written < 0:
+        raise IOError("PackBits data expand beyond %s bytes" % size)
+    return out[:written]
@@ -102,8 +102,60 @@ _default_codecs = [
 """List of relative module and class names for available formats in fabio.
 Order matter."""
 
+_default_extensions = {
+    "EdfImage": ["edf", "cor"],
+    "DtrekImage": ["img"],
+    "TifImage": ["tif", "tiff"],
+    "MarccdImage": ["mccd"],
+    "Mar345Image": [
+        "mar2300",
+        "mar1200",
+        "mar1600",
+        "mar2000",
+        "mar3450",
+        "mar3000",
+        "mar2400",
+        "mar1800",
+    ],
+    "Fit2dMaskImage": ["msk"],
+    "BrukerImage": [],
+    "Bruker100Image": ["sfrm"],
+    "PnmImage": ["pnm", "pgm", "pbm"],
+    "GeImage": [],
+    "OxdImage": ["img"],
+    "Dm3Image": ["dm3"],
+    "HipicImage": ["img"],
+    "PilatusImage": ["tif", "tiff"],
+    "Fit2dSpreadsheetImage": ["spr"],
+    "KcdImage": ["kcd"],
+    "CbfImage": ["cbf"],
+    "XsdImage": ["xml", "xsd"],
+    "BinaryImage": ["bin"],
+    "PixiImage": [],
+    "RaxisImage": ["img"],
+    "NumpyImage": ["npy"],
+    "EigerImage": ["h5", "hdf5"],
+    "Hdf5Image": ["h5"],
+    "Fit2dImage": ["f2d"],
+    "SpeImage": ["spe"],
+    "JpegImage": ["jpg", "jpeg"],
+    "Jpeg2KImage": ["jp2", "jpx", "j2k", "jpf", "jpg2"],
+    "MpaImage": ["mpa"],
+    "MrcImage": ["mrc", "map", "fei"],
+    "EsperantoImage": ["eseperanto", "esper"],
+    "LimaImage": ["h5", "hdf5"],
+    "LambdaImage": ["h5", "hdf5", "nxs"],
+    "SparseImage": ["h5", "hdf5", "nxs"],
+    "XcaliburImage": [],
+}
+"""DEFAULT_EXTENSIONS of the default codec classes, indexed by class name.
+It allows to resolve extensions without importing the codec modules.
+Classes which are not listed here (aliases) are only registered when
+importing all the formats."""
+
 _registry = OrderedDict()
-"""Contains all registered codec classes indexed by codec name."""
+"""Contains all registered codec classes indexed by codec name. Codecs which
+are not yet imported are stored as their (module name, class name)."""
 
 _extension_cache = None
 """Cache extension mapping"""
@@ -121,29 +173,61 @@ def register(codec_class):
     _extension_cache = None
 
 
-def register_default_formats():
+def _import_codec(module_name, class_name):
+    """Import a codec class from its relative module and class names
+
+    :rtype: class
+    """
+    module = importer("fabio." + module_name)
+    codec_class = getattr(module, class_name, None)
+    if codec_class is None:
+        raise RuntimeError(
+            "Class name '%s' from module '%s' not found" % (class_name, module_name)
+        )
+    return codec_class
+
+
+def register_default_formats(lazy=True):
     """Register all available default image classes provided by fabio.
 
     If a format is already registered, it will be overwritten
+
+    :param bool lazy: If True, the codec modules are only imported when one
+        of their classes is requested for the first time
     """
-    # we use __init__ rather than __new__ here because we want
-    # to modify attributes of the class *after* they have been
-    # created
+    global _extension_cache
     for module_name, class_name in _default_codecs:
-        module = importer("fabio." + module_name)
-        codec_class = getattr(module, class_name)
-        if codec_class is None:
-            raise RuntimeError(
-                "Class name '%s' from module '%s' not found" % (class_name, module_name)
-            )
-        register(codec_class)
+        if lazy:
+            if class_name not in _default_extensions:
+                # Alias of another codec
+                continue
+            _registry[class_name.lower()] = module_name, class_name
+            _extension_cache = None
+        else:
+            register(_import_codec(module_name, class_name))
+
+
+def _get_class(codec_name):
+    """Returns a registered codec class, importing it if needed.
+
+    :param str codec_name: name of the codec, for example, "edfimage"
+    :rtype: Union[class,None]
+    """
+    codec_class = _registry.get(codec_name)
+    if isinstance(codec_class, tuple):
+        codec_class = _import_codec(*codec_class)
+        # Keep the registration order
+        _registry[codec_name] = codec_class
+    return codec_class
 
 
 def get_all_classes():
     """Returns the list of supported codec identified by their fabio classes.
 
+    This imports all the registered codecs.
+
     :rtype: list"""
-    return _registry.values()
+    return [_get_class(name) for name in list(_registry.keys())]
 
 
 def get_classes(reader=None, writer=None):
@@ -183,28 +267,33 @@ def get_class_by_name(format_name):
     :return: instance of the new class
     """
     if format_name in _registry:
-        return _registry[format_name]
+        return _get_class(format_name)
     else:
         return None
 
 
 def _get_extension_mapping():
-    """Returns a dictionary mapping file extension to the list of supported
-    formats. The result is cached, do not edit it
+    """Returns a dictionary mapping file extension to the list of names of the
+    supported formats. The result is cached, do not edit it
+
+    Extensions of codecs which are not yet imported are taken from
+    `_default_extensions`.
 
     :rtype: dict
     """
     global _extension_cache
     if _extension_cache is None:
         _extension_cache = {}
-        for codec in get_all_classes():
-            if not hasattr(codec, "DEFAULT_EXTENSIONS"):
-                continue
-            for ext in codec.DEFAULT_EXTENSIONS:
+        for name, codec in list(_registry.items()):
+            if isinstance(codec, tuple):
+                extensions = _default_extensions[codec[1]]
+            else:
+                extensions = getattr(codec, "DEFAULT_EXTENSIONS", [])
+            for ext in extensions:
                 ext = ext.strip(".")
                 if ext not in _extension_cache:
                     _extension_cache[ext] = []
-                _extension_cache[ext].append(codec)
+                _extension_cache[ext].append(name)
     return _extension_cache
 
 
@@ -218,8 +307,7 @@ def get_classes_from_extension(extension):
     extension = extension.lower().strip(".")
     mapping = _get_extension_mapping()
     if extension in mapping:
-        # clone the list
-        return list(mapping[extension])
+        return [_get_class(name) for name in mapping[extension]]
     else:
         return []
 
@@ -231,7 +319,7 @@ def is_extension_supported(extension):
     :param str format_name: Format name, for example, "edfimage"
     :return: instance of the new class
     """
-    return bool(get_classes_from_extension(extension))
+    return extension.lower().strip(".") in _get_extension_mapping()
 
 
 def factory(name):
@@ -244,7 +332,7 @@ def factory(name):
     name = name.lower()
     obj = None
     if name in _registry:
-        obj = _registry[name]()
+        obj = _get_class(name)()
     else:
         msg = (
             "FileType %s is unknown !, "
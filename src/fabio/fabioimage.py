@@ -42,22 +42,94 @@ __authors__ = ["Henning O. Sorensen", "Erik Knudsen", "Jon Wright", "Jérôme Ki
 __contact__ = "jerome.kieffer@esrf.fr"
 __license__ = "MIT"
 __copyright__ = "ESRF"
-__date__ = "17/06/2026"
+__date__ = "17/10/2026"
 
 import os
+import collections
 import logging
 import sys
-import tempfile
 import weakref
 import numpy
-from . import fabioutils, converters
+from . import fabioutils, converters, framecache
 from .fabioutils import OrderedDict, ENDIANNESS
-from .compression import COMPRESSORS
-from .utils import pilutils
+from .compression import COMPRESSORS, decompress_file
 from .utils import deprecation
 
 logger = logging.getLogger(__name__)
 
+RawLayout = collections.namedtuple(
+    "RawLayout", ["offset", "shape", "stype", "dtype", "convert"]
+)
+RawLayout.__doc__ = """Position of the uncompressed pixels of a frame in a file.
+
+The pixels are stored C-ordered, starting at `offset`, with the on-disk
+dtype `stype`. `shape` ends with the rows and the columns of the image;
+leading dimensions (e.g. several readouts) are always read entirely.
+`convert(data, rows, cols)`, if not None, builds the final ROI from the raw
+one, given the indexes of the rows and columns it contains. Otherwise the
+ROI is cast to `dtype`.
+"""
+RawLayout.__new__.__defaults__ = (None,)
+
+_ROI_MAX_GAP = 4096
+"""Largest number of bytes skipped between two rows of a ROI which are still
+read with a single call"""
+
+
+def _read_raw_roi(filename, layout, slices):
+    """Read a region of interest of an uncompressed frame, row by row
+
+    :param str filename: name of a plain file
+    :param RawLayout layout: position of the frame in the file
+    :param slices: 2-tuple of slices (rows, columns)
+    :return: ROI as a numpy array
+    """
+    lead = tuple(layout.shape[:-2])
+    nrows, ncols = layout.shape[-2:]
+    stype = numpy.dtype(layout.stype)
+    rows = numpy.arange(*slices[0].indices(nrows))
+    cols = numpy.arange(*slices[1].indices(ncols))
+    if cols.size:
+        first_col = int(cols.min())
+        width = int(cols.max()) + 1 - first_col
+    else:
+        first_col = width = 0
+    row_bytes = ncols * stype.itemsize
+    box = numpy.zeros(lead + (rows.size, width), dtype=stype)
+    if box.size:
+        boxes = box.reshape((-1, rows.size, width))
+        contiguous = (rows.size > 1) and bool(numpy.all(numpy.diff(rows) == 1))
+        dense = contiguous and (row_bytes - width * stype.itemsize <= _ROI_MAX_GAP)
+        with open(filename, "rb", buffering=0) as f:
+            for index, target in enumerate(boxes):
+                start = (
+                    layout.offset
+                    + index * nrows * row_bytes
+                    + first_col * stype.itemsize
+                )
+                if dense:
+                    # one read for all rows, the gaps are dropped afterwards
+                    f.seek(start + int(rows[0]) * row_bytes)
+                    size = (rows.size - 1) * row_bytes + width * stype.itemsize
+                    block = numpy.zeros(rows.size * ncols, dtype=stype)
+                    raw = f.read(size)
+                    block.view(numpy.uint8)[: len(raw)] = numpy.frombuffer(
+                        raw, numpy.uint8
+                    )
+                    target[...] = block.reshape(rows.size, ncols)[:, :width]
+                else:
+                    for line, row in zip(target, rows):
+                        f.seek(start + int(row) * row_bytes)
+                        raw = f.read(width * stype.itemsize)
+                        line.view(numpy.uint8)[: len(raw)] = numpy.frombuffer(
+                            raw, numpy.uint8
+                        )
+    if cols.size and (slices[1].indices(ncols)[2] != 1):
+        box = box[..., cols - first_col]
+    if layout.convert is not None:
+        return layout.convert(box, rows, cols)
+    return box.astype(layout.dtype)
+
 
 class _FabioArray(object):
     """ "Abstract class providing array API used by :class:`FabioImage` and
@@ -162,6 +234,8 @@ class _FabioArray(object):
         """
         Convert the image to Python Imaging Library 16-bits greyscale image.
         """
+        from .utils import pilutils
+
         if filename:
             self.read(filename)
         return pilutils.create_pil_16(self.data)
@@ -455,6 +529,11 @@ class FabioImage(_FabioArray):
     _need_a_seek_to_read = False
     _need_a_real_file = False
 
+    use_mmap = False
+    """If True, codecs supporting it map uncompressed data from the file
+    into memory (:class:`numpy.memmap`) instead of reading it. Other codecs
+    ignore this option."""
+
     RESERVED_HEADER_KEYS = []
     # List of header keys which are reserved by the file format
 
@@ -491,6 +570,7 @@ class FabioImage(_FabioArray):
             raise TypeError("Data should be numpy array")
         self._nframes = 1
         self.currentframe = 0
+        self._deferred_read = None
         self.data = self.check_data(data)
         self.header = self.check_header(header)
         # cache for image statistics
@@ -499,6 +579,33 @@ class FabioImage(_FabioArray):
 
         self.resetvals()
 
+    @property
+    def data(self):
+        """Data of the current frame.
+
+        After a :meth:`readROI` which only read the region of interest, the
+        full frame is read on first access.
+
+        :rtype: numpy.ndarray
+        """
+        if self._data is None and self._deferred_read is not None:
+            self._read_deferred()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._deferred_read = None
+        self._data = value
+
+    def _read_deferred(self):
+        """Read the full frame skipped by the last :meth:`readROI`, keeping
+        its region of interest"""
+        args = self._deferred_read
+        self._deferred_read = None
+        roi, roi_slice = self.roi, self.slice
+        self.read(*args)
+        self.roi, self.slice = roi, roi_slice
+
     @property
     def nframes(self):
         """Returns the number of frames contained in this file
@@ -510,11 +617,50 @@ class FabioImage(_FabioArray):
     def get_frame(self, num):
         """Returns a frame from the this fabio image.
 
+        When the process-wide frame cache is enabled (see
+        :mod:`fabio.framecache`), decoded frames are served from it.
+
         :param int num: Number of frames (0 is the first frame)
         :rtype: FabioFrame
         :raises IndexError: If the frame number is out of the available range.
         """
-        return self._get_frame(num)
+        cache = framecache.default_cache
+        if not cache.enabled:
+            return self._get_frame(num)
+        key = cache.make_key(self._get_cache_filename(), self.__class__.__name__, num)
+        if key is None:
+            return self._get_frame(num)
+        entry = cache.get(key)
+        if entry is not None:
+            data, header = entry
+            # the cached array is shared and read-only
+            frame = self._get_cached_frame(num, numpy.array(data), header)
+            frame._set_container(self, num)
+            frame._set_file_container(self, num)
+            return frame
+        frame = self._get_frame(num)
+        cache.put(key, frame.data, frame.header)
+        return frame
+
+    def _get_cached_frame(self, num, data, header):
+        """Returns a frame from data served by the frame cache.
+
+        This method have to be reimplemented by formats providing a custom
+        frame class, in order to return the same class as `_get_frame`.
+
+        :param int num: Number of frames (0 is the first frame)
+        :param numpy.ndarray data: decoded data of the frame
+        :param dict header: header of the frame
+        :rtype: FabioFrame
+        """
+        return FabioFrame(data, self.check_header(header))
+
+    def _get_cache_filename(self):
+        """Name of the file holding the frames, used by the frame cache
+
+        :rtype: Union[str,None]
+        """
+        return self.filename
 
     def _get_frame(self, num):
         """Returns a frame from the this fabio image.
@@ -558,7 +704,7 @@ class FabioImage(_FabioArray):
         :rtype: Iterator[FabioFrame]
         """
         for num in range(self.nframes):
-            frame = self._get_frame(num)
+            frame = self.get_frame(num)
             yield frame
 
     @property
@@ -798,11 +944,34 @@ class FabioImage(_FabioArray):
     def readROI(self, filename, frame=None, coords=None):
         """
         Method reading Region of Interest.
-        This implementation is the trivial one, just doing read and crop
+
+        Codecs storing uncompressed frames read only the bytes of the ROI from
+        plain files (see :meth:`_get_raw_layout`): the header is read, and
+        `self.data` is only read when it is accessed. Other codecs read the
+        full frame and crop it.
+
+        :param filename: name of the file
+        :param frame: index of the frame
+        :param coords: 2-tuple of slices (rows, columns) or 4-tuple (fabian
+            convention, requires the full frame)
+        :return: the ROI as a numpy array
         """
         if isinstance(filename, fabioutils.PathTypes):
             if not isinstance(filename, fabioutils.StringTypes):
                 filename = str(filename)
+        if (
+            len(coords) == 2
+            and isinstance(coords[0], slice)
+            and isinstance(coords[1], slice)
+        ):
+            roi = self._read_raw_roi(filename, frame, tuple(coords))
+            if roi is not None:
+                self.filename = filename
+                self.data = None
+                self._deferred_read = (filename, frame)
+                self.slice = tuple(coords)
+                self.roi = roi
+                return self.roi
         self.read(filename, frame)
         if len(coords) == 4:
             self.slice = self.make_slice(coords)
@@ -819,6 +988,59 @@ class FabioImage(_FabioArray):
         self.roi = self.data[self.slice]
         return self.roi
 
+    def _get_raw_layout(self, infile, frame=None):
+        """
+        Read the header and locate the pixels of a frame stored uncompressed.
+
+        Codecs override it to let :meth:`readROI` read only the bytes of the
+        region of interest.
+
+        :param infile: opened file
+        :param int frame: index of the frame
+        :return: RawLayout, or None if the frame is not stored as a raw block
+        """
+        return None
+
+    def _read_raw_roi(self, filename, frame, slices):
+        """Read a ROI from the bytes it covers, if the codec allows it.
+
+        :return: the ROI, or None if the frame has to be read entirely
+        """
+        if not isinstance(filename, fabioutils.StringTypes):
+            return None
+        if os.path.splitext(filename)[-1] in (".gz", ".bz2"):
+            return None
+        if not os.path.isfile(filename):
+            return None
+        if type(self)._get_raw_layout is FabioImage._get_raw_layout:
+            return None
+        with self._open(filename, "rb") as infile:
+            layout = self._get_raw_layout(infile, frame)
+        if layout is None:
+            return None
+        return _read_raw_roi(filename, layout, slices)
+
+    def read_into(self, filename, out, frame=None):
+        """
+        Read the data of an image directly into a preallocated array.
+
+        This implementation is the trivial one, just doing read and copy.
+        Codecs able to decode in place override it.
+
+        :param str filename: name of the file
+        :param numpy.ndarray out: array with the shape of the image
+        :param int frame: frame to read
+        :return: the `out` array
+        """
+        self.read(filename, frame)
+        if out.shape != self.data.shape:
+            raise ValueError(
+                "Shape mismatch: image is %s, output is %s"
+                % (self.data.shape, out.shape)
+            )
+        out[...] = self.data
+        return out
+
     def _open(self, fname, mode="rb"):
         """
         Try to handle compressed files, streams, shared memory etc
@@ -884,19 +1106,9 @@ class FabioImage(_FabioArray):
         # assert that python modules are always OK based on performance benchmark
         # Try to fix the way we are using them?
         fobj = None
-        if self._need_a_real_file and mode[0] == "r":
-            fo = python_uncompress(fname, mode)
-            # problem when not administrator under certain flavors of windows
-            tmpfd, tmpfn = tempfile.mkstemp()
-            os.close(tmpfd)
-            fobj = fabioutils.File(tmpfn, "w+b", temporary=True)
-            fobj.write(fo.read())
-            fo.close()
-            fobj.seek(0)
-        elif self._need_a_seek_to_read and mode[0] == "r":
-            fo = python_uncompress(fname, mode)
-            print(fname, mode, fo)
-            fobj = fabioutils.BytesIO(fo.read(), fname, mode)
+        if (self._need_a_real_file or self._need_a_seek_to_read) and mode[0] == "r":
+            # Decompressed in memory, with several threads when possible
+            fobj = fabioutils.BytesIO(decompress_file(fname), fname, mode)
         else:
             fobj = python_uncompress(fname, mode)
         return fobj
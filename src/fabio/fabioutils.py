@@ -35,7 +35,7 @@ __author__ = "Jérôme Kieffer"
 __contact__ = "Jerome.Kieffer@ESRF.eu"
 __license__ = "MIT"
 __copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
-__date__ = "17/06/2026"
+__date__ = "17/10/2026"
 __status__ = "stable"
 __docformat__ = "restructuredtext"
 
@@ -50,6 +50,7 @@ from math import ceil
 import threading
 from enum import StrEnum
 from .compression import bz2, gzip
+from . import gzipindex
 
 try:
     import pathlib
@@ -58,7 +59,7 @@ except ImportError:
         import pathlib2 as pathlib
     except ImportError:
         pathlib = None
-from io import FileIO, BytesIO as _BytesIO
+from io import FileIO, BufferedReader, BytesIO as _BytesIO
 
 logger = logging.getLogger(__name__)
 StringTypes = (str, bytes)
@@ -575,12 +576,20 @@ else:
             gzip.GzipFile.__init__(self, filename, mode, compresslevel, fileobj)
             self.lock = threading.Semaphore()
             self.__size = None
+            if self.mode == gzip.READ and self.use_index and self.fileobj.seekable():
+                index = gzipindex.GzipIndex.get(self.name)
+                reader = gzipindex.IndexedGzipReader(self.fileobj, index)
+                self._buffer = BufferedReader(reader)
 
         def __del__(self):
             """Explicit close at deletion"""
             if hasattr(self, "closed") and not self.closed:
                 self.close()
 
+        use_index = True
+        """Seek backwards from the checkpoints of a :class:`GzipIndex`
+        instead of decompressing again from the beginning"""
+
         def __repr__(self):
             return "fabio." + gzip.GzipFile.__repr__(self)
 
@@ -594,7 +603,10 @@ else:
                             pos = self.offset
                         elif "tell" in dir(self):
                             pos = self.tell()
-                        end_pos = len(gzip.GzipFile.read(self)) + pos
+                        if isinstance(self._buffer.raw, gzipindex.IndexedGzipReader):
+                            end_pos = self.seek(0, os.SEEK_END)
+                        else:
+                            end_pos = len(gzip.GzipFile.read(self)) + pos
                         self.seek(pos)
                         logger.debug(
                             "Measuring size of %s: %s @ %s == %s"
@@ -730,6 +742,41 @@ def exists(path):
     return os.path.exists(path.split("::")[0])
 
 
+_IOV_MAX = 1024
+"""Maximum number of buffers written by a single `os.writev` call"""
+
+
+def write_buffers(fileobj, buffers):
+    """Write several buffers one after the other, without concatenating them.
+
+    Unbuffered files, like :class:`File`, are written with `os.writev` when
+    available, so that a header and its data are written by a single system
+    call. Other file objects get one `write` call per buffer.
+
+    :param fileobj: file object open in write mode
+    :param buffers: list of bytes-like objects, in the order of the file
+    :return: the number of bytes written
+    """
+    views = [memoryview(buffer).cast("B") for buffer in buffers]
+    total = sum(len(view) for view in views)
+    if not (hasattr(os, "writev") and isinstance(fileobj, FileIO)):
+        for view in views:
+            fileobj.write(view)
+        return total
+    fd = fileobj.fileno()
+    views = [view for view in views if len(view)]
+    while views:
+        nwritten = os.writev(fd, views[:_IOV_MAX])
+        if nwritten == 0:
+            raise IOError("Unable to write to %s" % getattr(fileobj, "name", fd))
+        # Drop what was written, a write may be partial
+        while views and nwritten >= len(views[0]):
+            nwritten -= len(views.pop(0))
+        if nwritten:
+            views[0] = views[0][nwritten:]
+    return total
+
+
 class OrderedDict(_OrderedDict):
     """Ordered dictionary with pretty print"""
 
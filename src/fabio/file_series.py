@@ -476,6 +476,36 @@ def _filename_series_adapter(series):
         yield filename
 
 
+def _open_decoded(filename):
+    """Open an image and decode the data of all its frames.
+
+    Used by the prefetch threads, as most of the formats only decode the
+    data when it is requested.
+
+    :param str filename: name of the file
+    :return: the image and the list of its decoded frames
+    :rtype: Tuple[FabioImage,List[FabioFrame]]
+    """
+    image = fabio.open(filename)
+    try:
+        frames = []
+        for frame_num in range(image.nframes):
+            frame = image.get_frame(frame_num)
+            frame.data
+            frames.append(frame)
+    except Exception:
+        image.close()
+        raise
+    return image, frames
+
+
+def _close_future_image(future):
+    """Close the image read by an abandoned prefetch task."""
+    if future.exception() is None:
+        image, _frames = future.result()
+        image.close()
+
+
 class FileSeries(FabioImage):
     """Provide a `FabioImage` abstracting a file series.
 
@@ -534,12 +564,30 @@ class FileSeries(FabioImage):
 
         # Each files contains 100 frames (the last one could contain less)
         serie = FileSeries(filenames=filenames, fixed_frame_number=100)
+
+    Sequential iteration can read and decode the next files in background
+    threads while the current frame is processed. The `prefetch` option sets
+    how many files are read in advance, `prefetch_memory` bounds the amount of
+    data held by the files read in advance.
+
+    .. code-block:: python
+
+        # Read up to 4 files in advance, using at most 1 GB
+        serie = FileSeries(filenames=filenames, prefetch=4, prefetch_memory=2**30)
+        for frame in serie.frames():
+            process(frame.data)
     """
 
     DEFAULT_EXTENSIONS = []
 
     def __init__(
-        self, filenames, single_frame=None, fixed_frames=None, fixed_frame_number=None
+        self,
+        filenames,
+        single_frame=None,
+        fixed_frames=None,
+        fixed_frame_number=None,
+        prefetch=0,
+        prefetch_memory=None,
     ):
         """
         Constructor
@@ -555,6 +603,11 @@ class FileSeries(FabioImage):
         :param Union[Integer,None] fixed_frame_number: If set, all files are
             supposed to contain the same amount of frames (specified by this
             argument)
+        :param int prefetch: Number of files read in background threads in
+            advance while iterating :meth:`frames`. 0 disables it.
+        :param Union[int,None] prefetch_memory: Maximum amount of bytes of data
+            held by the files read in advance. None for no limit. At least one
+            file is always read in advance.
         """
         if isinstance(filenames, filename_series):
             filenames = _filename_series_adapter(filenames)
@@ -589,6 +642,10 @@ class FileSeries(FabioImage):
         self.__nframes = None
         self.use_edf_shortcut = True
         """If true a custom file sequential file reader is used for EDF formats"""
+        self.prefetch = int(prefetch)
+        """Number of files read in advance by :meth:`frames`"""
+        self.prefetch_memory = prefetch_memory
+        """Maximum amount of bytes held by the files read in advance"""
 
     def close(self):
         """Close any IO handler opened."""
@@ -608,12 +665,64 @@ class FileSeries(FabioImage):
                 yield filename
             self.__filename_generator = None
 
+    def __iter_prefetched_images(self):
+        """Returns an iterator through the opened images of the file series,
+        with the list of their decoded frames.
+
+        The next `prefetch` files are opened and decoded by a pool of threads
+        while the current one is used. The images are closed once consumed.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        filenames = self.__iter_filenames()
+        pending = collections.deque()
+        # Size of the data of the last image, used to estimate the memory held
+        image_size = 0
+        executor = ThreadPoolExecutor(self.prefetch)
+        try:
+            while True:
+                while len(pending) < self.prefetch:
+                    if (
+                        pending
+                        and self.prefetch_memory is not None
+                        and image_size * (len(pending) + 1) > self.prefetch_memory
+                    ):
+                        break
+                    filename = next(filenames, None)
+                    if filename is None:
+                        break
+                    pending.append(executor.submit(_open_decoded, filename))
+                if not pending:
+                    break
+                image, frames = pending.popleft().result()
+                try:
+                    image_size = sum(
+                        frame.data.nbytes for frame in frames if frame.data is not None
+                    )
+                    yield image, frames
+                finally:
+                    image.close()
+        finally:
+            for future in pending:
+                if not future.cancel():
+                    future.add_done_callback(_close_future_image)
+            executor.shutdown(wait=False)
+
     def frames(self):
         """Returns an iterator through all frames of all filenames of this
         file series."""
         import fabio.edfimage
 
         nframe = 0
+        if self.prefetch > 0:
+            for _image, frames in self.__iter_prefetched_images():
+                for frame in frames:
+                    frame._set_container(self, nframe)
+                    yield frame
+                    nframe += 1
+            self.__nframes = nframe
+            return
+
         for filename in self.__iter_filenames():
             if self.use_edf_shortcut:
                 info = FilenameObject(filename=filename)
@@ -792,7 +901,7 @@ class FileSeries(FabioImage):
             msg = "Index '%d' (local index '%d' from '%s') is out of range"
             raise IndexError(msg % (num, local_frame, description.filename))
         try:
-            frame = fileimage._get_frame(local_frame)
+            frame = fileimage.get_frame(local_frame)
         except IndexError:
             logger.debug("Backtrace", exc_info=True)
             msg = "Index '%d' (local index '%d' from '%s') is out of range"
@@ -800,6 +909,10 @@ class FileSeries(FabioImage):
         frame._set_container(self, num)
         return frame
 
+    def _get_cache_filename(self):
+        # Frames are cached by the images of the files
+        return None
+
     @deprecation.deprecated(
         reason="Replaced by get_frame.", deprecated_since="0.10.0beta"
     )
@@ -0,0 +1,259 @@
+# coding: utf-8
+#
+#    Project: X-ray image reader
+#             https://github.com/silx-kit/fabio
+#
+#
+#    Copyright (C) European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+"""Process-wide cache of decoded frames
+
+Decoding a frame (decompression, dtype conversion...) is often much more
+expensive than keeping it in memory. When the cache is enabled,
+:meth:`FabioImage.get_frame` and :meth:`FabioImage.frames` look up decoded
+frames by (file, modification time, size, codec, frame index) before reading
+them, and store the frames they decode. The least recently used frames are
+evicted once the cache exceeds its budget of bytes.
+
+EDF frames look up the cache when their data are decoded, so
+:meth:`EdfImage.getframe` and `fabio.open(filename, frame=n)` are covered as
+well. For the other formats, the legacy `getframe` API does not use the
+cache.
+
+The cache is disabled by default. It is enabled by setting its budget, or
+with the `FABIO_FRAME_CACHE` environment variable (in bytes):
+
+.. code-block:: python
+
+    from fabio import framecache
+
+    framecache.default_cache.max_bytes = 2 * 1024**3
+    with fabio.open("scan.cbf") as image:
+        image.get_frame(0).data   # decoded
+    with fabio.open("scan.cbf") as image:
+        image.get_frame(0).data   # from the cache
+    print(framecache.default_cache.stats())
+
+Arrays stored in the cache are read-only copies. Frames served by the cache
+receive their own writable copy, of the same frame class as a decoded one.
+"""
+
+__author__ = "Jérôme Kieffer"
+__contact__ = "Jerome.Kieffer@ESRF.eu"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "17/10/2026"
+
+import os
+import mmap
+import logging
+import threading
+import collections
+import numpy
+
+logger = logging.getLogger(__name__)
+
+CacheStats = collections.namedtuple(
+    "CacheStats", ["hits", "misses", "evictions", "entries", "nbytes", "max_bytes"]
+)
+"""Statistics of a :class:`FrameCache`"""
+
+
+def file_key(filename):
+    """Identify the current version of a file
+
+    :param str filename: name of the file
+    :return: (real path, modification time in ns, size) or None if the file
+        can not be found
+    """
+    if not isinstance(filename, str):
+        return None
+    try:
+        stat = os.stat(filename)
+    except (OSError, ValueError):
+        return None
+    return os.path.realpath(filename), stat.st_mtime_ns, stat.st_size
+
+
+def _is_mapped(array):
+    """True if the memory of the array is mapped from a file"""
+    while array is not None:
+        if isinstance(array, (numpy.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+class FrameCache(object):
+    """Least recently used cache of decoded frames, bounded in bytes.
+
+    It is thread-safe.
+    """
+
+    def __init__(self, max_bytes=0):
+        """
+        :param int max_bytes: budget of the cache in bytes, 0 disables it
+        """
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._nbytes = 0
+        self._max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        """True if the cache stores frames"""
+        return self._max_bytes > 0
+
+    @property
+    def max_bytes(self):
+        """Budget of the cache in bytes, 0 when disabled"""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        with self._lock:
+            self._max_bytes = max(0, int(value))
+            self._evict()
+
+    @property
+    def nbytes(self):
+        """Amount of bytes held by the cached frames"""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        """Drop the least recently used frames until the budget is met.
+
+        Called with the lock held.
+        """
+        while self._entries and self._nbytes > self._max_bytes:
+            _, (data, _header) = self._entries.popitem(last=False)
+            self._nbytes -= data.nbytes
+            self.evictions += 1
+
+    def get(self, key):
+        """Look up a frame
+
+        :param key: key built by :meth:`make_key`
+        :return: (data, header) or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, data, header):
+        """Store a decoded frame
+
+        Frames larger than the budget and frames mapped from their file are
+        not stored.
+
+        :param key: key built by :meth:`make_key`
+        :param numpy.ndarray data: decoded frame, copied into the cache
+        :param dict header: header of the frame
+        :return: the cached (read-only) array, or None if it was not stored
+        """
+        if not isinstance(data, numpy.ndarray) or _is_mapped(data):
+            return None
+        if data.nbytes > self._max_bytes:
+            return None
+        data = numpy.array(data)
+        data.setflags(write=False)
+        header = dict(header) if header is not None else {}
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[0].nbytes
+            self._entries[key] = (data, header)
+            self._nbytes += data.nbytes
+            self._evict()
+        return data
+
+    def make_key(self, filename, codec, index):
+        """Build the key of a frame
+
+        :param str filename: name of the file holding the frame
+        :param str codec: name of the codec reading the file
+        :param int index: index of the frame in the file
+        :return: a hashable key, or None if the file can not be identified
+        """
+        key = file_key(filename)
+        if key is None:
+            return None
+        return key + (codec, int(index))
+
+    def invalidate(self, filename=None):
+        """Drop the cached frames of a file, or all of them
+
+        :param Union[str,None] filename: name of the file, None for all files
+        """
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+                self._nbytes = 0
+                return
+            path = os.path.realpath(filename)
+            for key in [k for k in self._entries if k[0] == path]:
+                data, _header = self._entries.pop(key)
+                self._nbytes -= data.nbytes
+
+    def clear(self):
+        """Drop all the frames and reset the statistics"""
+        self.invalidate()
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns the statistics of the cache
+
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(
+                self.hits,
+                self.misses,
+                self.evictions,
+                len(self._entries),
+                self._nbytes,
+                self._max_bytes,
+            )
+
+
+def _default_budget():
+    value = os.environ.get("FABIO_FRAME_CACHE", "0")
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Invalid FABIO_FRAME_CACHE value: %s", value)
+        return 0
+
+
+default_cache = FrameCache(_default_budget())
+"""Cache shared by all the images of the process"""
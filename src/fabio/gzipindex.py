@@ -0,0 +1,266 @@
+# coding: utf-8
+#
+#    Project: X-ray image reader
+#             https://github.com/silx-kit/fabio
+#
+#
+#    Copyright (C) European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+"""Random access into gzip files
+
+Seeking backwards in a :class:`gzip.GzipFile` restarts the decompression
+from the beginning of the file, so reading the frames of a compressed
+multi-frame file in random order is quadratic. Like the `zran` example of
+zlib, :class:`GzipIndex` stores checkpoints of the state of the decompressor
+at regular intervals of the decompressed stream while it is read.
+:class:`IndexedGzipReader` restarts from the closest checkpoint before the
+requested position instead of the beginning of the file.
+
+The index of a file is shared by all the readers of this file in the
+process, as long as the file is not modified. Checkpoints are copies of
+`zlib` decompressor objects, which can not be saved to the disk.
+
+.. code-block:: python
+
+    from fabio import gzipindex
+
+    gzipindex.GzipIndex.spacing = 16 * 1024**2   # fewer checkpoints
+"""
+
+__author__ = "Jérôme Kieffer"
+__contact__ = "Jerome.Kieffer@ESRF.eu"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "17/10/2026"
+
+import io
+import zlib
+import bisect
+import logging
+import threading
+import collections
+from .framecache import file_key
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+CHUNK_SIZE = 16 * 1024
+"""Size of the compressed blocks fed to the decompressor"""
+
+
+class GzipIndex(object):
+    """Checkpoints of the decompression of a gzip file.
+
+    Each checkpoint is a tuple (position in the decompressed stream, position
+    in the compressed file, copy of the decompressor). A checkpoint needs
+    about 45 kB of memory.
+    """
+
+    spacing = 4 * 1024**2
+    """Minimum number of decompressed bytes between two checkpoints"""
+
+    max_files = 32
+    """Number of indexes shared in the process"""
+
+    _shared = collections.OrderedDict()
+    _shared_lock = threading.Lock()
+
+    def __init__(self, spacing=None):
+        """
+        :param int spacing: number of decompressed bytes between checkpoints,
+            by default :attr:`GzipIndex.spacing`
+        """
+        self.spacing = self.spacing if spacing is None else spacing
+        self.size = None
+        """Size of the decompressed stream once its end was reached"""
+        self._positions = [0]
+        self._checkpoints = [(0, 0, zlib.decompressobj(zlib.MAX_WBITS | 16))]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._checkpoints)
+
+    @classmethod
+    def get(cls, filename):
+        """Returns the index shared by the readers of a file
+
+        :param str filename: name of the gzip file
+        :return: the index, a new one if the file was modified or never read
+        """
+        key = file_key(filename)
+        if key is None:
+            return cls()
+        with cls._shared_lock:
+            index = cls._shared.pop(key, None)
+            if index is None:
+                index = cls()
+            cls._shared[key] = index
+            while len(cls._shared) > cls.max_files:
+                cls._shared.popitem(last=False)
+        return index
+
+    @classmethod
+    def clear(cls):
+        """Forget the indexes of all files"""
+        with cls._shared_lock:
+            cls._shared.clear()
+
+    def add(self, out_pos, in_pos, decompressor):
+        """Store a checkpoint if far enough from the last one
+
+        :param int out_pos: position in the decompressed stream
+        :param int in_pos: position of the next byte to feed in the file
+        :param decompressor: decompressor which consumed all its input
+        """
+        if out_pos < self._positions[-1] + self.spacing:
+            return
+        with self._lock:
+            if out_pos >= self._positions[-1] + self.spacing:
+                self._positions.append(out_pos)
+                self._checkpoints.append((out_pos, in_pos, decompressor.copy()))
+
+    def find(self, position):
+        """Returns the last checkpoint before a position
+
+        :param int position: position in the decompressed stream
+        :return: (position in the decompressed stream, position in the
+            compressed file, decompressor to be copied before use)
+        """
+        with self._lock:
+            num = bisect.bisect_right(self._positions, position) - 1
+            return self._checkpoints[num]
+
+
+class IndexedGzipReader(io.RawIOBase):
+    """Raw reader of a gzip file, seeking with the help of a :class:`GzipIndex`
+
+    Meant to be wrapped into a :class:`io.BufferedReader`.
+    """
+
+    def __init__(self, fileobj, index=None):
+        """
+        :param fileobj: compressed file object, open in binary read mode
+        :param GzipIndex index: index of the file, a new one if None
+        """
+        io.RawIOBase.__init__(self)
+        self._fp = fileobj
+        self.index = GzipIndex() if index is None else index
+        self._pos = 0
+        self._decompressor = None
+        self._block = b""
+        self._block_start = 0
+        self._eof = False
+        self._restore(self.index.find(0))
+        # Used by gzip.GzipFile.mtime
+        self._last_mtime = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def _restore(self, checkpoint):
+        out_pos, in_pos, decompressor = checkpoint
+        self._decompressor = decompressor.copy()
+        self._fp.seek(in_pos)
+        self._block = b""
+        self._block_start = out_pos
+        self._eof = False
+
+    def _next_block(self):
+        """Decompress the next block of the file
+
+        :return: False at the end of the decompressed stream
+        """
+        self._block_start += len(self._block)
+        self._block = b""
+        data = b""
+        while not data:
+            if self._decompressor.eof:
+                raw = self._decompressor.unused_data
+                if len(raw) < len(GZIP_MAGIC):
+                    raw += self._fp.read(CHUNK_SIZE)
+                if not raw.startswith(GZIP_MAGIC):
+                    # End of the file, or padding after the last member
+                    self._eof = True
+                    self.index.size = self._block_start
+                    return False
+                self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            else:
+                raw = self._fp.read(CHUNK_SIZE)
+                if not raw:
+                    raise EOFError(
+                        "Compressed file ended before the "
+                        "end-of-stream marker was reached"
+                    )
+            try:
+                data = self._decompressor.decompress(raw)
+            except zlib.error as error:
+                raise IOError("Invalid gzip data: %s" % error) from error
+        self._block = data
+        if not self._decompressor.eof:
+            # All the input was consumed: the state can be restored later
+            self.index.add(
+                self._block_start + len(data), self._fp.tell(), self._decompressor
+            )
+        return True
+
+    def readinto(self, buffer):
+        with memoryview(buffer) as view, view.cast("B") as byte_view:
+            size = len(byte_view)
+            if size == 0:
+                return 0
+            block_end = self._block_start + len(self._block)
+            if self._pos < self._block_start or self._pos >= block_end:
+                checkpoint = self.index.find(self._pos)
+                if self._pos < self._block_start or checkpoint[0] > block_end:
+                    self._restore(checkpoint)
+                while self._pos >= self._block_start + len(self._block):
+                    if self._eof or not self._next_block():
+                        return 0
+            start = self._pos - self._block_start
+            data = self._block[start : start + size]
+            byte_view[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            if self.index.size is None:
+                # Decompress until the end to know the size
+                self._pos = max(self._pos, self._block_start + len(self._block))
+                while self._eof is False and self._next_block():
+                    pass
+            position = self.index.size + offset
+        else:
+            raise ValueError("Invalid value for whence: %s" % whence)
+        # Decompression is delayed until the next read
+        self._pos = max(0, position)
+        return self._pos
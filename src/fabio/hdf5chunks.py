@@ -0,0 +1,328 @@
+# coding: utf-8
+#
+#    Project: X-ray image reader
+#             https://github.com/silx-kit/fabio
+#
+#
+#    Copyright (C) European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+"""Read stacks of frames from HDF5 datasets chunk by chunk.
+
+Detectors like the Eiger store each frame in its own compressed chunk.
+Reading frames through h5py runs the whole HDF5 filter pipeline on a single
+thread. Here the raw chunks are read with `read_direct_chunk` and decoded
+by a pool of threads, with decoders releasing the GIL. Supported filters are
+deflate (gzip), shuffle, bitshuffle (with or without LZ4) and LZ4. Other
+datasets are read through h5py.
+
+.. code-block:: python
+
+    with fabio.open("eiger_master.h5") as image:
+        stack = image.get_frames(0, 100, workers=8)
+"""
+
+__author__ = "Jérôme Kieffer"
+__contact__ = "Jerome.Kieffer@ESRF.eu"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "17/10/2026"
+
+import os
+import zlib
+import logging
+import collections
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+from .ext import bitshuffle
+from .utils import instrumentation
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+logger = logging.getLogger(__name__)
+
+FILTER_DEFLATE = 1
+FILTER_SHUFFLE = 2
+FILTER_LZ4 = 32004
+FILTER_BITSHUFFLE = 32008
+
+# Compression codes of the bitshuffle filter
+BITSHUFFLE_NONE = 0
+BITSHUFFLE_LZ4 = 2
+
+
+class DirectChunkReader(object):
+    """Read frames of a 3D HDF5 dataset by decoding its chunks in threads.
+
+    Only datasets chunked by whole frames, like (1, ny, nx) or (n, ny, nx),
+    with a supported filter pipeline use the direct chunk path, other
+    datasets are read through h5py.
+    """
+
+    def __init__(self, dataset, codec=None):
+        """
+        :param h5py.Dataset dataset: 3D dataset of frames
+        :param str codec: name of the codec reported to the instrumentation
+        """
+        self.dataset = dataset
+        self.codec = codec
+        self.filename = dataset.file.filename
+        self.dtype = dataset.dtype
+        self.shape = dataset.shape
+        self.filters = self._get_filters()
+
+    @property
+    def supported(self):
+        """True if the chunks of the dataset can be decoded directly"""
+        return self.filters is not None
+
+    def _get_filters(self):
+        """Read the filter pipeline of the dataset
+
+        :return: list of (filter code, filter values), or None if the chunks
+            can not be decoded by this reader
+        """
+        dataset = self.dataset
+        chunks = dataset.chunks
+        if dataset.ndim != 3 or chunks is None or chunks[1:] != self.shape[1:]:
+            return None
+        if self.dtype.kind not in "biuf":
+            return None
+        plist = dataset.id.get_create_plist()
+        filters = []
+        for index in range(plist.get_nfilters()):
+            code, _flags, values, _name = plist.get_filter(index)
+            if code == FILTER_BITSHUFFLE:
+                compression = values[4] if len(values) > 4 else BITSHUFFLE_NONE
+                if compression not in (BITSHUFFLE_NONE, BITSHUFFLE_LZ4):
+                    return None
+            elif code not in (FILTER_DEFLATE, FILTER_SHUFFLE, FILTER_LZ4):
+                return None
+            filters.append((code, values))
+        return filters
+
+    def _is_allocated(self, coord):
+        """Returns False if the chunk at `coord` was never written.
+
+        Reading an unallocated chunk directly fails, sometimes with a
+        MemoryError, so it is checked beforehand when HDF5 allows it.
+        """
+        try:
+            info = self.dataset.id.get_chunk_info_by_coord(coord)
+        except (AttributeError, RuntimeError, OSError):
+            # HDF5 < 1.10.5: read_direct_chunk reports missing chunks
+            return True
+        return info.byte_offset is not None
+
+    def decode_chunk(self, raw, filter_mask=0, out=None):
+        """Undo the filters applied to a chunk
+
+        :param bytes raw: chunk as stored in the file
+        :param int filter_mask: filters which were not applied to the chunk
+        :param out: contiguous buffer of the size of a chunk to decode into
+        :return: numpy array of bytes (`out` if it was used)
+        """
+        itemsize = self.dtype.itemsize
+        nbytes = itemsize * numpy.prod(self.dataset.chunks, dtype=numpy.int64)
+        data = raw
+        active = [
+            self.filters[index]
+            for index in range(len(self.filters))
+            if not filter_mask & (1 << index)
+        ]
+        for index in reversed(range(len(active))):
+            code, values = active[index]
+            # only the last decoding stage writes into the output buffer
+            target = out if index == 0 else None
+            if code == FILTER_DEFLATE:
+                data = zlib.decompress(data)
+            elif code == FILTER_SHUFFLE:
+                elem_size = values[0] if values else itemsize
+                data = numpy.frombuffer(data, dtype=numpy.uint8)
+                data = data.reshape(elem_size, -1).T
+                if target is not None:
+                    target.reshape(-1).view(numpy.uint8)[...] = data.reshape(-1)
+                    data = target
+                else:
+                    data = numpy.ascontiguousarray(data)
+            elif code == FILTER_BITSHUFFLE:
+                elem_size = values[2] if len(values) > 2 else itemsize
+                block_size = values[3] if len(values) > 3 else 0
+                lz4 = len(values) > 4 and values[4] == BITSHUFFLE_LZ4
+                data = bitshuffle.bitshuffle_decompress(
+                    data, elem_size, nbytes, block_size, lz4, out=target
+                )
+            elif code == FILTER_LZ4:
+                data = bitshuffle.lz4_decompress(data, out=target)
+        data = numpy.frombuffer(data, dtype=numpy.uint8)
+        if len(data) != nbytes:
+            raise IOError(
+                "Decoded chunk has %s bytes, %s expected" % (len(data), nbytes)
+            )
+        return data
+
+    def read_frames(self, start, stop, out=None, workers=None):
+        """Read consecutive frames
+
+        :param int start: first frame
+        :param int stop: frame after the last one
+        :param out: array of shape (stop - start, ny, nx) to read into
+        :param Union[int,None] workers: number of threads decoding the chunks,
+            None for the number of CPUs
+        :return: the array of frames
+        """
+        shape = (stop - start,) + self.shape[1:]
+        if out is None:
+            out = numpy.empty(shape, dtype=self.dtype.newbyteorder("="))
+        elif out.shape != shape:
+            raise ValueError("Output shape %s differs from %s" % (out.shape, shape))
+        if stop <= start:
+            return out
+        if not (0 <= start and stop <= self.shape[0]):
+            raise IndexError(
+                "Frames [%s, %s[ out of range [0, %s[" % (start, stop, self.shape[0])
+            )
+        if not self.supported:
+            # HDF5 reads and decodes the chunks in a single stage
+            with instrumentation.stage("io", self.codec, self.filename, out.nbytes):
+                if out.flags.c_contiguous and out.dtype == self.dtype:
+                    self.dataset.read_direct(out, numpy.s_[start:stop])
+                else:
+                    out[...] = self.dataset[start:stop]
+            return out
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, int(workers))
+        depth = self.dataset.chunks[0]
+        direct = out.flags.c_contiguous and out.dtype == self.dtype
+
+        def decode(raw, filter_mask, first):
+            low = max(start, first)
+            high = min(stop, first + depth)
+            target = None
+            if direct and low == first and high == first + depth:
+                # The chunk is decoded in place
+                target = out[low - start : high - start]
+            with instrumentation.stage(
+                "decompress", self.codec, self.filename, len(raw)
+            ):
+                data = self.decode_chunk(raw, filter_mask, target)
+            if target is not None and numpy.shares_memory(data, target):
+                return
+            with instrumentation.stage("convert", self.codec, self.filename) as st:
+                chunk = data.view(self.dtype).reshape(self.dataset.chunks)
+                target = out[low - start : high - start]
+                target[...] = chunk[low - first : high - first]
+                st.nbytes = target.nbytes
+
+        executor = ThreadPoolExecutor(workers) if workers > 1 else None
+        pending = collections.deque()
+        try:
+            for first in range(start - start % depth, stop, depth):
+                raw = None
+                if self._is_allocated((first, 0, 0)):
+                    try:
+                        with instrumentation.stage(
+                            "io", self.codec, self.filename
+                        ) as st:
+                            filter_mask, raw = self.dataset.id.read_direct_chunk(
+                                (first, 0, 0)
+                            )
+                            st.nbytes = len(raw)
+                    except (KeyError, ValueError, RuntimeError, OSError) as error:
+                        logger.debug("No chunk at frame %s: %s", first, error)
+                if raw is None:
+                    # chunk not allocated, let HDF5 provide the fill value
+                    low = max(start, first)
+                    high = min(stop, first + depth, self.shape[0])
+                    out[low - start : high - start] = self.dataset[low:high]
+                    continue
+                if executor is None:
+                    decode(raw, filter_mask, first)
+                    continue
+                pending.append(executor.submit(decode, raw, filter_mask, first))
+                while len(pending) > 2 * workers:
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+        finally:
+            if executor is not None:
+                for future in pending:
+                    future.cancel()
+                executor.shutdown()
+        return out
+
+
+def read_frames(datasets, start=0, stop=None, out=None, workers=None, codec=None):
+    """Read consecutive frames from a sequence of datasets.
+
+    :param datasets: h5py dataset, numpy array or list of them. Each element
+        is a stack of frames (3D) or a single frame (2D).
+    :param int start: first frame
+    :param Union[int,None] stop: frame after the last one, None for the end
+    :param out: array of shape (stop - start, ny, nx) to read into
+    :param Union[int,None] workers: number of threads decoding the chunks
+    :param str codec: name of the codec reported to the instrumentation
+    :return: the array of frames
+    :raises IndexError: if the requested frames are out of range
+    """
+    if h5py is not None and isinstance(datasets, h5py.Dataset):
+        datasets = [datasets]
+    elif isinstance(datasets, numpy.ndarray):
+        datasets = [datasets]
+    counts = [0 if ds is None else (1 if ds.ndim == 2 else len(ds)) for ds in datasets]
+    nframes = sum(counts)
+    if stop is None:
+        stop = nframes
+    if not (0 <= start <= stop <= nframes):
+        raise IndexError("Frames [%s, %s[ out of range [0, %s[" % (start, stop, nframes))
+    if out is None:
+        reference = next((ds for ds in datasets if ds is not None), None)
+        if reference is None:
+            raise ValueError("No frame to read")
+        out = numpy.empty(
+            (stop - start,) + reference.shape[-2:],
+            dtype=reference.dtype.newbyteorder("="),
+        )
+    elif out.shape[0] != stop - start:
+        raise ValueError("Output has %s frames, %s requested" % (len(out), stop - start))
+
+    offset = 0
+    for ds, count in zip(datasets, counts):
+        low = max(start, offset)
+        high = min(stop, offset + count)
+        if low < high:
+            target = out[low - start : high - start]
+            if ds.ndim == 2:
+                target[0] = ds
+            elif h5py is not None and isinstance(ds, h5py.Dataset):
+                DirectChunkReader(ds, codec).read_frames(
+                    low - offset, high - offset, target, workers
+                )
+            else:
+                target[...] = ds[low - offset : high - offset]
+        offset += count
+        if offset >= stop:
+            break
+    return out
@@ -47,7 +47,9 @@ import logging
 import os
 import posixpath
 from . import fabioimage
+from . import hdf5chunks
 from .fabioutils import previous_filename, next_filename
+from .utils import instrumentation
 
 try:
     import h5py
@@ -60,10 +62,11 @@ logger = logging.getLogger(__name__)
 class Hdf5Frame(fabioimage.FabioFrame):
     """Identify a slice of dataset from an HDF5 file"""
 
-    def __init__(self, hdf5image, frame_num):
+    def __init__(self, hdf5image, frame_num, data=None):
         if not isinstance(hdf5image, Hdf5Image):
             raise TypeError("Expected class %s", Hdf5Image)
-        data = hdf5image.dataset[frame_num, :, :]
+        if data is None:
+            data = hdf5image.dataset[frame_num, :, :]
         super(Hdf5Frame, self).__init__(data=data, header=hdf5image.header)
         self.hdf5 = hdf5image.hdf5
         self.dataset = hdf5image.dataset
@@ -97,13 +100,11 @@ class Hdf5Image(fabioimage.FabioImage):
         self.hdf5 = None
         self.dataset = None
 
-    def read(self, fname, frame=None):
+    def _open_dataset(self, fname):
         """
-        try to read image
+        Open the HDF5 file and locate the dataset, without reading any data
         :param fname: filename::datasetpath
         """
-
-        self.resetvals()
         if "::" not in fname:
             err = (
                 "the '::' separator is mandatory for HDF5 container, absent in %s"
@@ -130,6 +131,30 @@ class Hdf5Image(fabioimage.FabioImage):
             logger.warning("The actual dataset is ")
             self.dataset = self.dataset["data"]
 
+    def readheader(self, filename):
+        """
+        Locate the dataset and get its shape and type without reading it
+        :param filename: filename::datasetpath
+        """
+        self.header = self.check_header()
+        self.resetvals()
+        self._open_dataset(filename)
+        shape = self.dataset.shape
+        if len(shape) == 3:
+            self._nframes = shape[0]
+        self._shape = shape[-2:]
+        self._dtype = self.dataset.dtype
+
+    def read(self, fname, frame=None):
+        """
+        try to read image
+        :param fname: filename::datasetpath
+        """
+
+        self.resetvals()
+        codec = self.codec_name()
+        with instrumentation.stage("header", codec, fname):
+            self._open_dataset(fname)
         # ndim does not exist for external links ?
         ndim = len(self.dataset.shape)
         if ndim == 3:
@@ -138,9 +163,17 @@ class Hdf5Image(fabioimage.FabioImage):
                 self.currentframe = int(frame)
             else:
                 self.currentframe = 0
-            self.data = self.dataset[self.currentframe, :, :]
+            self.data = hdf5chunks.read_frames(
+                self.dataset,
+                self.currentframe,
+                self.currentframe + 1,
+                workers=1,
+                codec=codec,
+            )[0]
         elif ndim == 2:
-            self.data = self.dataset[:, :]
+            with instrumentation.stage("io", codec, self.filename) as st:
+                self.data = self.dataset[:, :]
+                st.nbytes = self.data.nbytes
         else:
             err = (
                 "Only 2D and 3D datasets are supported by FabIO, here %sD"
@@ -153,6 +186,9 @@ class Hdf5Image(fabioimage.FabioImage):
     def _get_frame(self, num):
         return self.getframe(num)
 
+    def _get_cached_frame(self, num, data, header):
+        return Hdf5Frame(self, num, data)
+
     def getframe(self, num):
         """
         Returns a frame as a new FabioImage object
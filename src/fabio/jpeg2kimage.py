@@ -134,6 +134,18 @@ class Jpeg2KImage(FabioImage):
         else:
             self.data = image.read()
 
+    def _readheader(self, infile):
+        """
+        Read the metadata with PIL, which only decodes pixels when accessed
+        """
+        self.header = OrderedDict()
+        if PIL is None:
+            raise IOError("PIL is needed to read the header of JPEG 2000 images")
+        pilimage = PIL.Image.open(infile)
+        for k, v in pilimage.info.items():
+            self.header[k] = v
+        self._shape = pilimage.size[::-1]
+
     def read(self, filename, frame=None):
         infile = self._open(filename, "rb")
         self.data = None
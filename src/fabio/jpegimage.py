@@ -102,6 +102,18 @@ class JpegImage(FabioImage):
             for k, v in pilimage.info.items():
                 self.header[k] = v
 
+    def _readheader(self, infile):
+        """
+        Read the metadata with PIL, which only decodes pixels when accessed
+        """
+        self.header = self.check_header()
+        if Image is None:
+            raise IOError("PIL is needed to read the header of JPEG images")
+        pilimage = Image.open(infile)
+        for k, v in pilimage.info.items():
+            self.header[k] = v
+        self._shape = pilimage.size[::-1]
+
     def read(self, filename, frame=None):
         infile = self._open(filename, "rb")
         self.data = None
@@ -38,7 +38,7 @@ import numpy
 import logging
 import os
 import string
-from .fabioimage import FabioImage
+from .fabioimage import FabioImage, RawLayout
 import io
 
 
@@ -115,6 +115,43 @@ class KcdImage(FabioImage):
         if len(missing) > 0:
             logger.debug("KCD file misses the keys " + " ".join(missing))
 
+    def _describe_data(self, fname):
+        """Image size, on-disk dtype and number of readouts, from the header"""
+        try:
+            dim1 = int(self.header["X dimension"])
+            dim2 = int(self.header["Y dimension"])
+            self._shape = dim2, dim1
+        except (KeyError, ValueError):
+            raise IOError("KCD file %s is corrupt, cannot read it" % fname)
+        try:
+            bytecode = DATA_TYPES[self.header["Data type"]]
+        except KeyError:
+            bytecode = numpy.uint16
+            logger.warning("Defaulting type to uint16")
+        stype = self.get_stype(bytecode, "little")
+        try:
+            nbReadOut = int(self.header["Number of readouts"])
+        except KeyError:
+            logger.warning("Defaulting number of ReadOut to 1")
+            nbReadOut = 1
+        return dim1, dim2, stype, nbReadOut
+
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the readouts at the end of the file, they are summed"""
+        self.header = self.check_header()
+        self.resetvals()
+        self._readheader(infile)
+        dim1, dim2, stype, nbReadOut = self._describe_data(infile.name)
+        infile.seek(0, SEEK_END)
+        offset = infile.tell() - dim1 * dim2 * stype.itemsize * nbReadOut
+        if offset < 0:
+            return None
+
+        def convert(data, rows, cols):
+            return data.sum(axis=0, dtype=numpy.int32)
+
+        return RawLayout(offset, (nbReadOut, dim2, dim1), stype, numpy.int32, convert)
+
     def read(self, fname, frame=None):
         """
         Read in header into self.header and
@@ -124,24 +161,7 @@ class KcdImage(FabioImage):
         self.resetvals()
         with self._open(fname, "rb") as infile:
             self._readheader(infile)
-            # Compute image size
-            try:
-                dim1 = int(self.header["X dimension"])
-                dim2 = int(self.header["Y dimension"])
-                self._shape = dim2, dim1
-            except (KeyError, ValueError):
-                raise IOError("KCD file %s is corrupt, cannot read it" % fname)
-            try:
-                bytecode = DATA_TYPES[self.header["Data type"]]
-            except KeyError:
-                bytecode = numpy.uint16
-                logger.warning("Defaulting type to uint16")
-            self._dtype = self.get_stype(bytecode, "little")
-            try:
-                nbReadOut = int(self.header["Number of readouts"])
-            except KeyError:
-                logger.warning("Defaulting number of ReadOut to 1")
-                nbReadOut = 1
+            dim1, dim2, self._dtype, nbReadOut = self._describe_data(fname)
             expected_size = dim1 * dim2 * self._dtype.itemsize * nbReadOut
 
             try:
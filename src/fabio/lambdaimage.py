@@ -33,7 +33,7 @@ __authors__ = ["Jérôme Kieffer"]
 __contact__ = "jerome.kieffer@esrf.fr"
 __license__ = "MIT"
 __copyright__ = "ESRF"
-__date__ = "27/10/2025"
+__date__ = "17/10/2026"
 
 import logging
 import posixpath
@@ -42,6 +42,8 @@ import numpy
 from .fabioimage import FabioImage
 from .fabioutils import NotGoodReader
 from . import nexus
+from . import hdf5chunks
+from .utils import instrumentation
 
 try:
     import h5py
@@ -164,12 +166,44 @@ class LambdaImage(FabioImage):
         """
 
         self.resetvals()
-        with self._open(fname) as infile:
+        with instrumentation.stage("header", self.codec_name(), fname):
+            with self._open(fname) as infile:
+                self._readheader(infile)
+            # locate the image data and declare it
+            self._open_dataset(fname)
+
+        if frame is not None:
+            return self.getframe(int(frame))
+        else:
+            self.currentframe = 0
+            self.data = hdf5chunks.read_frames(
+                self.dataset, 0, 1, workers=1, codec=self.codec_name()
+            )[0]
+            self._shape = None
+            return self
+
+    def readheader(self, filename):
+        """
+        Read the header and locate the dataset, without reading any frame
+
+        :param filename: name of the file
+        """
+        self.resetvals()
+        with self._open(filename) as infile:
             self._readheader(infile)
-            # read the image data and declare it
+        self._open_dataset(filename)
+        self.currentframe = 0
+        self._data = None
+        self._shape = self.dataset.shape[-2:]
+        self._dtype = self.dataset.dtype
+
+    def _open_dataset(self, fname):
+        """
+        Open the HDF5 file and locate the dataset, without reading any data
 
+        :param fname: name of the file
+        """
         self.dataset = None
-        # read the image data
         self.h5 = h5py.File(fname, mode="r")
         data_path = posixpath.join(self.DETECTOR_GRP, "data")
         if data_path in self.h5:
@@ -179,14 +213,6 @@ class LambdaImage(FabioImage):
         self.dataset = ds
         self._nframes = ds.shape[0]
 
-        if frame is not None:
-            return self.getframe(int(frame))
-        else:
-            self.currentframe = 0
-            self.data = self.dataset[self.currentframe]
-            self._shape = None
-            return self
-
     def getframe(self, num):
         """returns the frame numbered 'num' in the stack if applicable"""
         if self.nframes > 1:
@@ -204,6 +230,24 @@ class LambdaImage(FabioImage):
             new_img = FabioImage.getframe(self, num)
         return new_img
 
+    def get_frames(self, start=0, stop=None, out=None, workers=None):
+        """Read consecutive frames into a 3D array.
+
+        Compressed chunks are read raw from the file and decoded by a pool of
+        threads, see :mod:`fabio.hdf5chunks`.
+
+        :param int start: first frame
+        :param Union[int,None] stop: frame after the last one, None for the end
+        :param Union[numpy.ndarray,None] out: array of shape
+            (stop - start, ny, nx) to fill in
+        :param Union[int,None] workers: number of threads, None for the number
+            of CPUs
+        :rtype: numpy.ndarray
+        """
+        return hdf5chunks.read_frames(
+            self.dataset, start, stop, out, workers, codec=self.codec_name()
+        )
+
     def previous(self):
         """returns the previous file in the series as a FabioImage"""
         new_image = None
@@ -58,6 +58,7 @@ import logging
 import numpy
 import fabio
 from .fabioutils import ENDIANNESS
+from .utils import instrumentation
 from .fabioimage import FabioImage
 from .compression import compPCK, decPCK
 
@@ -89,14 +90,22 @@ class Mar345Image(FabioImage):
     def read(self, fname, frame=None):
         """Read a mar345 image"""
         self.filename = fname
+        codec = self.codec_name()
         f = self._open(self.filename, "rb")
-        self._readheader(f)
+        with instrumentation.stage("header", codec, fname):
+            self._readheader(f)
         if "compressed" in self.header["Format"]:
             dim2, dim1 = self._shape
-            self.data = decPCK(
-                f, dim1, dim2, self.numhigh,
-                byteorder=self.byteorder
-            )
+            with instrumentation.stage("io", codec, fname) as st:
+                # the decompressor locates the pixels from the start of the file
+                f.seek(0)
+                raw = f.read()
+                st.nbytes = len(raw)
+            with instrumentation.stage("decompress", codec, fname, len(raw)):
+                self.data = decPCK(
+                    raw, dim1, dim2, self.numhigh,
+                    byteorder=self.byteorder
+                )
             self._shape = None
         else:
             logger.error("Cannot handle these formats yet due to lack of documentation")
@@ -40,11 +40,11 @@ __authors__ = ["Jérôme Kieffer"]
 __contact__ = "Jerome.Kieffer@terre-adelie.org"
 __license__ = "MIT"
 __copyright__ = "Jérôme Kieffer"
-__date__ = "27/10/2025"
+__date__ = "17/10/2026"
 
 import logging
 import numpy
-from .fabioimage import FabioImage
+from .fabioimage import FabioImage, RawLayout
 from .fabioutils import previous_filename, next_filename
 
 logger = logging.getLogger(__name__)
@@ -156,6 +156,19 @@ class MrcImage(FabioImage):
             self._readframe(infile, self.currentframe)
         return self
 
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels of a frame of the file"""
+        self.resetvals()
+        self.sequencefilename = infile.name
+        self.currentframe = frame or 0
+        self._readheader(infile)
+        if self.currentframe >= self.nframes or self.currentframe < 0:
+            raise RuntimeError("Requested frame number is out of range")
+        offset = self._calc_offset(self.currentframe)
+        layout = RawLayout(offset, self._shape, self._dtype, self._dtype)
+        self._makeframename()
+        return layout
+
     def _calc_offset(self, frame):
         """
         Calculate the frame position in the file
@@ -165,6 +178,9 @@ class MrcImage(FabioImage):
         assert frame < self.nframes
         return 1024 + self.header["NSYMBT"] + frame * self.imagesize
 
+    def _get_cache_filename(self):
+        return getattr(self, "sequencefilename", None)
+
     def _makeframename(self):
         self.filename = "%s$%04d" % (self.sequencefilename, self.currentframe)
 
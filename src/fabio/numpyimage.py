@@ -34,6 +34,7 @@ __date__ = "15/06/2026"
 
 import logging
 import numpy
+from numpy.lib import format as npy_format
 from . import fabioimage
 
 logger = logging.getLogger(__name__)
@@ -145,6 +146,34 @@ class NumpyImage(fabioimage.FabioImage):
         self.header = self.check_header()
         infile.seek(0)
 
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels of a frame in a C-ordered npy file"""
+        self.resetvals()
+        self._readheader(infile)
+        version = npy_format.read_magic(infile)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(infile)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(infile)
+        else:
+            return None
+        if fortran_order or dtype.hasobject:
+            return None
+        offset = infile.tell()
+        if len(shape) < 2:
+            shape = (1, int(numpy.prod(shape)))
+        if len(shape) > 2:
+            nframes = int(numpy.prod(shape[:-2]))
+            shape = tuple(shape[-2:])
+            self._nframes = nframes
+            if frame is None:
+                frame = 0
+            if not 0 <= frame < nframes:
+                raise IndexError("Frame %s out of range" % frame)
+            offset += frame * shape[0] * shape[1] * dtype.itemsize
+            self.currentframe = frame
+        return fabioimage.RawLayout(offset, shape, dtype, dtype)
+
     def read(self, fname, frame=None):
         """
         Try to read image
@@ -42,11 +42,16 @@ mods for APS GE by JVB
 
 import os.path
 import logging
+import math
 import re
+import collections
+import threading
+import numpy
 from . import fabioutils
 from .compression import ExternalCompressors
-from .fabioutils import FilenameObject, BytesIO
+from .fabioutils import FilenameObject
 from .fabioimage import FabioImage
+from .utils import instrumentation
 
 # Make sure to load all formats
 from . import fabioformats  # noqa
@@ -122,6 +127,98 @@ MAGIC_NUMBERS = [
 ]
 
 
+def _build_magic_table(magic_numbers):
+    """Build a dispatch table of the magic numbers keyed on their first byte.
+
+    The order of the magic numbers sharing the same first byte is preserved.
+
+    :param magic_numbers: list of (magic, format_type)
+    :rtype: dict
+    """
+    table = {}
+    for magic, format_type in magic_numbers:
+        table.setdefault(magic[0], []).append((magic, format_type))
+    return {key: tuple(value) for key, value in table.items()}
+
+
+_MAGIC_TABLE = _build_magic_table(MAGIC_NUMBERS)
+"""Magic numbers indexed by first byte. To be rebuilt if MAGIC_NUMBERS is
+modified."""
+
+MAGIC_SIZE = max(len(magic) for magic, _ in MAGIC_NUMBERS)
+"""Number of bytes needed to identify any of the magic numbers"""
+
+_HDF5_FLAVOUR_CACHE = collections.OrderedDict()
+"""Cache of the HDF5 flavours indexed by path, validated by size and mtime"""
+
+_HDF5_FLAVOUR_CACHE_SIZE = 1024
+
+_HDF5_FLAVOUR_LOCK = threading.Lock()
+
+
+def _read_hdf5_flavour(filename):
+    """Inspect an HDF5 file to find out which codec is able to read it
+
+    :param str filename: name of the HDF5 file
+    :return: one of "lima", "sparse", "lambda" or "eiger"
+    """
+    # check if the creator is LIMA or other
+    lambda_path = "/entry/instrument/detector/description"
+    import h5py
+
+    with h5py.File(filename, "r") as h:
+        creator = h.attrs.get("creator")
+        if str(creator).startswith("LIMA"):
+            default_entry = h.attrs.get("default")
+            if default_entry:
+                entry = h.get(default_entry)
+                if entry:
+                    default_grp = entry.attrs.get("default")
+                    if default_grp and default_grp.startswith("/"):
+                        grp = h.get(default_grp)
+                    elif default_grp:
+                        grp = entry.get(default_grp)
+                    else:
+                        return "lima"
+                    dataformat = grp.attrs.get("dataformat")
+                    if dataformat and "Bragg" in dataformat:
+                        return "sparse"
+            return "lima"
+        elif str(creator).startswith("pyFAI"):
+            return "sparse"
+        elif lambda_path in h and h[lambda_path][()].decode() == "Lambda":
+            return "lambda"
+        else:
+            return "eiger"
+
+
+def _get_hdf5_flavour(filename):
+    """Returns the HDF5 flavour of a file, using a cache keyed on the path
+    and validated by the size and modification time of the file.
+
+    :param str filename: name of the HDF5 file
+    :return: one of "lima", "sparse", "lambda" or "eiger"
+    """
+    try:
+        key = os.path.abspath(filename)
+        stat = os.stat(key)
+    except (OSError, TypeError, ValueError):
+        return _read_hdf5_flavour(filename)
+    signature = stat.st_size, stat.st_mtime_ns
+    with _HDF5_FLAVOUR_LOCK:
+        cached = _HDF5_FLAVOUR_CACHE.get(key)
+        if cached is not None and cached[0] == signature:
+            _HDF5_FLAVOUR_CACHE.move_to_end(key)
+            return cached[1]
+    flavour = _read_hdf5_flavour(filename)
+    with _HDF5_FLAVOUR_LOCK:
+        _HDF5_FLAVOUR_CACHE[key] = signature, flavour
+        _HDF5_FLAVOUR_CACHE.move_to_end(key)
+        while len(_HDF5_FLAVOUR_CACHE) > _HDF5_FLAVOUR_CACHE_SIZE:
+            _HDF5_FLAVOUR_CACHE.popitem(last=False)
+    return flavour
+
+
 def _do_magic(byts:bytes, filename:str="") -> str:
     """Try to interpret the bytes starting the file as a magic number
 
@@ -129,44 +226,15 @@ def _do_magic(byts:bytes, filename:str="") -> str:
     :param filename: name of the file or empty string in the case of a buffer
     :return: format_type as string
     """
-    for magic, format_type in MAGIC_NUMBERS:
+    candidates = _MAGIC_TABLE.get(byts[0], ()) if byts else ()
+    for magic, format_type in candidates:
         if byts.startswith(magic):
             if "/" in format_type:
                 if format_type == "eiger/lima/sparse/hdf5/lambda":
                     if "::" in filename:
                         return "hdf5"
                     else:
-                        # check if the creator is LIMA or other
-                        lambda_path = "/entry/instrument/detector/description"
-                        import h5py
-
-                        with h5py.File(filename, "r") as h:
-                            creator = h.attrs.get("creator")
-                            if str(creator).startswith("LIMA"):
-                                default_entry = h.attrs.get("default")
-                                if default_entry:
-                                    entry = h.get(default_entry)
-                                    if entry:
-                                        default_grp = entry.attrs.get("default")
-                                        if default_grp and default_grp.startswith("/"):
-                                            grp = h.get(default_grp)
-                                        elif default_grp:
-                                            grp = entry.get(default_grp)
-                                        else:
-                                            return "lima"
-                                        dataformat = grp.attrs.get("dataformat")
-                                        if dataformat and "Bragg" in dataformat:
-                                            return "sparse"
-                                return "lima"
-                            elif str(creator).startswith("pyFAI"):
-                                return "sparse"
-                            elif (
-                                lambda_path in h
-                                and h[lambda_path][()].decode() == "Lambda"
-                            ):
-                                return "lambda"
-                            else:
-                                return "eiger"
+                        return _get_hdf5_flavour(filename)
                 elif format_type == "marccd/tif":
                     if "mccd" in filename.split("."):
                         return "marccd"
@@ -188,7 +256,7 @@ def _do_magic(byts:bytes, filename:str="") -> str:
     raise Exception("Could not interpret magic string")
 
 
-def openimage(filename, frame=None):
+def openimage(filename, frame=None, mmap=False):
     """Open an image.
 
     It returns a FabioImage-class instance which can be used as a context
@@ -203,6 +271,10 @@ def openimage(filename, frame=None):
     :param Union[str,FilenameObject] filename: A filename or a filename
         iterator.
     :param Union[int,None] frame: A specific frame inside this file.
+    :param bool mmap: If True, uncompressed data are mapped from the file
+        into memory instead of being read (only for formats supporting it,
+        like EDF). Such data are copy-on-write: modifying them does not alter
+        the file.
     :rtype: FabioImage
     """
     if isinstance(filename, fabioutils.PathTypes):
@@ -214,32 +286,55 @@ def openimage(filename, frame=None):
             actual_filename = filename.tostring()
             logger.debug("Attempting to open %s", actual_filename)
             obj = _openimage(actual_filename)
+            obj.use_mmap = mmap
             logger.debug(
                 "Attempting to read frame %s from %s with reader %s",
                 frame,
                 actual_filename,
                 obj.classname,
             )
-            obj = obj.read(actual_filename, frame)
+            with instrumentation.stage(
+                "read", obj.codec_name(), actual_filename
+            ) as st:
+                obj = obj.read(actual_filename, frame)
+                st.nbytes = _get_nbytes(obj)
         except Exception as ex:
             # multiframe file
             # logger.debug( "DEBUG: multiframe file, start # %d"%(
             #    filename.num)
             logger.debug("Exception %s, trying name %s" % (ex, filename.stem))
             obj = _openimage(filename.stem)
+            obj.use_mmap = mmap
             logger.debug("Reading frame %s from %s" % (filename.num, filename.stem))
-            obj.read(filename.stem, frame=filename.num)
+            with instrumentation.stage("read", obj.codec_name(), filename.stem) as st:
+                obj.read(filename.stem, frame=filename.num)
+                st.nbytes = _get_nbytes(obj)
     else:
         logger.debug("Attempting to open %s" % (filename))
         obj = _openimage(filename)
+        obj.use_mmap = mmap
         logger.debug(
             "Attempting to read frame %s from %s with reader %s"
             % (frame, filename, obj.classname)
         )
-        obj = obj.read(obj.filename, frame)
+        with instrumentation.stage("read", obj.codec_name(), obj.filename) as st:
+            obj = obj.read(obj.filename, frame)
+            st.nbytes = _get_nbytes(obj)
     return obj
 
 
+def _get_nbytes(image):
+    """Returns the size in bytes of the frame read into an image, or None.
+
+    The size is computed from the shape and the type of the frame, so that
+    codecs decoding their data lazily are not forced to decode it.
+    """
+    try:
+        return math.prod(image.shape) * numpy.dtype(image.dtype).itemsize
+    except (AttributeError, TypeError):
+        return None
+
+
 def openheader(filename):
     """return only the header"""
     if isinstance(filename, fabioutils.PathTypes):
@@ -247,10 +342,123 @@ def openheader(filename):
             filename = str(filename)
 
     obj = _openimage(filename)
-    obj.readheader(obj.filename)
+    with instrumentation.stage("header", obj.codec_name(), obj.filename):
+        obj.readheader(obj.filename)
     return obj
 
 
+def openheaders(filenames, workers=None):
+    """Read the headers of many files, without their data.
+
+    Headers are read concurrently by a pool of threads, which overlaps the
+    latency of the file system when scanning large collections.
+
+    A file which can not be read does not stop the others: the exception it
+    raised takes its place in the result.
+
+    .. code-block:: python
+
+        for image in fabio.openheaders(sorted(glob.glob("*.cbf")), workers=16):
+            if isinstance(image, Exception):
+                continue
+            print(image.filename, image.header.get("Start_angle"))
+
+    :param List[str] filenames: Ordered list of filenames
+    :param Union[int,None] workers: Number of threads, None for the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`
+    :return: Images with only their header read, or the exception raised while
+        reading it, in the order of the filenames
+    :rtype: List[Union[fabio.fabioimage.FabioImage,Exception]]
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(_try_openheader, filenames))
+
+
+def _try_openheader(filename):
+    """Returns the header-only image of a file, or the exception raised"""
+    try:
+        return openheader(filename)
+    except Exception as error:
+        logger.debug("Unable to read the header of %s", filename, exc_info=True)
+        return error
+
+
+def read_stack(filenames, out=None, workers=None):
+    """Read a series of single-frame images into a 3D array.
+
+    Files are decoded concurrently by a pool of threads. Each image is written
+    directly into its slice of the output array, which avoids the temporary
+    copies of a `numpy.stack` over the images. This is efficient for formats
+    whose decompression releases the GIL, like CBF.
+
+    .. code-block:: python
+
+        stack = fabio.read_stack(sorted(glob.glob("*.cbf")), workers=8)
+
+    :param List[str] filenames: Ordered list of filenames
+    :param Union[numpy.ndarray,None] out: Array of shape (n, ny, nx) to fill
+        in. If None, it is allocated from the shape and dtype of the first
+        image.
+    :param Union[int,None] workers: Number of threads, None for the default of
+        :class:`concurrent.futures.ThreadPoolExecutor`
+    :rtype: numpy.ndarray
+    """
+    import numpy
+    from concurrent.futures import ThreadPoolExecutor
+
+    filenames = [
+        str(i) if isinstance(i, fabioutils.PathTypes) else i for i in filenames
+    ]
+    start = 0
+    if out is None:
+        if not filenames:
+            raise ValueError("No filename provided")
+        with openimage(filenames[0]) as first:
+            out = numpy.empty((len(filenames),) + first.shape, dtype=first.dtype)
+            out[0] = first.data
+        start = 1
+    elif len(out) != len(filenames):
+        raise ValueError(
+            "Output array has %s frames for %s files" % (len(out), len(filenames))
+        )
+
+    def read_one(index):
+        filename = filenames[index]
+        obj = _openimage(filename)
+        try:
+            obj.read_into(obj.filename, out[index])
+        finally:
+            obj.close()
+
+    with ThreadPoolExecutor(workers) as pool:
+        # Consume the results to raise the first exception
+        for _ in pool.map(read_one, range(start, len(filenames))):
+            pass
+    return out
+
+
+def _peek_stream(stream, size):
+    """Returns the first bytes of a stream without consuming it.
+
+    :param stream: file-like object, rewound to its start if seekable
+    :param int size: number of bytes requested
+    :rtype: bytes
+    """
+    try:
+        stream.seek(0)
+    except OSError:
+        # Not seekable (socket, pipe): use the buffer of the stream if any
+        if hasattr(stream, "peek"):
+            return stream.peek(size)[:size]
+        raise
+    data = stream.read(size)
+    # Back to the location before the read
+    stream.seek(0)
+    return data
+
+
 def _openimage(filename):
     """
     determine which format for a filename
@@ -260,16 +468,24 @@ def _openimage(filename):
 
     hdf5:///example.h5?entry/instrument/detector/data/data#slice=[:,:,5]
 
+    """
+    with instrumentation.stage("detect", filename=filename) as st:
+        obj = _detect_codec(filename)
+        st.codec = obj.codec_name()
+    return obj
+
+
+def _detect_codec(filename):
+    """Returns an instance of the codec able to read a file, from its magic
+    number or its name.
+
+    :param filename: name of the file or stream
     """
     stream_input = False
     if hasattr(filename, "seek") and hasattr(filename, "read"):
-        # Data stream without filename
-        filename.seek(0)
-        data = filename.read()
-        actual_filename = BytesIO(data)
-        # Back to the location before the read
-        filename.seek(0)
+        # Data stream without filename: only peek the magic number
         stream_input = True
+        magic_bytes = _peek_stream(filename, MAGIC_SIZE)
     else:
         if os.path.exists(filename):
             # Already a valid filename
@@ -279,15 +495,15 @@ def _openimage(filename):
         else:
             actual_filename = filename
 
-    try:
-        imo = FabioImage()
-        with imo._open(actual_filename) as f:
-            magic_bytes = f.read(18)
-    except IOError:
-        logger.debug("Backtrace", exc_info=True)
-        raise
-    else:
-        imo = None
+        try:
+            imo = FabioImage()
+            with imo._open(actual_filename) as f:
+                magic_bytes = f.read(MAGIC_SIZE)
+        except IOError:
+            logger.debug("Backtrace", exc_info=True)
+            raise
+        else:
+            imo = None
 
     filetype = None
     try:
@@ -334,6 +550,8 @@ def open_series(
     single_frame=None,
     fixed_frames=None,
     fixed_frame_number=None,
+    prefetch=0,
+    prefetch_memory=None,
 ):
     """
     Create an object to iterate frames through a file series.
@@ -357,6 +575,10 @@ def open_series(
     :param Union[Integer,None] fixed_frame_number: If set, all files are
         supposed to contain the same amount of frames (specified by this
         argument)
+    :param int prefetch: Number of files read and decoded in background
+        threads in advance during a sequential iteration. 0 disables it.
+    :param Union[int,None] prefetch_memory: Maximum amount of bytes of data
+        held by the files read in advance. None for no limit.
     :rtype: :class:`~file_series.FileSeries`
     """
     # Here to avoid recursive import
@@ -373,4 +595,6 @@ def open_series(
         single_frame=single_frame,
         fixed_frames=fixed_frames,
         fixed_frame_number=fixed_frame_number,
+        prefetch=prefetch,
+        prefetch_memory=prefetch_memory,
     )
@@ -45,7 +45,7 @@ import logging
 import struct
 import os
 import numpy
-from .fabioimage import FabioImage
+from .fabioimage import FabioImage, RawLayout
 from .fabioutils import OrderedDict
 
 logger = logging.getLogger(__name__)
@@ -261,6 +261,53 @@ class RaxisImage(FabioImage):
                 # "end reached"
                 break
 
+    def _correct_photomultiplier(self, data):
+        """Apply the photomultiplier ratio to pixels with the 16th bit set
+
+        :param data: uint16 array
+        :return: corrected array, uint32 if any pixel needed a correction
+        """
+        di = (data >> 15) != 0  # greater than 2^15
+        if di.sum() >= 1:
+            # find indices for which we need to do the correction (for which
+            # the 16th bit is set):
+
+            logger.debug("Correct for PM: %s" % di.sum())
+            data = data << 1 >> 1  # reset bit #15 to zero
+            dtype = numpy.dtype(numpy.uint32)
+            data = data.astype(dtype)
+            # Now we do some fixing for Rigaku's refusal to adhere to standards:
+            sf = self.header["Photomultiplier Ratio"]
+            # multiply by the ratio  defined in the header
+            # data[di] *= sf
+            data[di] = (sf * data[di]).astype(dtype)
+        return data
+
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels, stored at the end of the file"""
+        self.resetvals()
+        self._readheader(infile)
+        shape = self.header["Y Pixels"], self.header["X Pixels"]
+        stype = self.get_stype(numpy.uint16, self.endianness)
+        infile.seek(0, os.SEEK_END)
+        offset = infile.tell() - shape[0] * shape[1] * stype.itemsize
+        if offset < 0:
+            return None
+        # A full read provides uint32 data if any pixel of the frame has the
+        # photomultiplier bit set: the ROI gets the same type
+        block = numpy.memmap(infile.name, dtype=stype, mode="r", offset=offset, shape=shape)
+        if (block >> 15).any():
+            dtype = numpy.dtype(numpy.uint32)
+        else:
+            dtype = stype
+        del block
+
+        def convert(data, rows, cols):
+            data = self._correct_photomultiplier(data.astype(stype, copy=False))
+            return data.astype(dtype, copy=False)
+
+        return RawLayout(offset, shape, stype, dtype, convert)
+
     def read(self, fname, frame=None):
         """
         try to read image
@@ -307,22 +354,7 @@ class RaxisImage(FabioImage):
                 logger.error("Uncommon error encountered when reading file: %s" % error)
         rawData = infile.read(size)
         data = numpy.frombuffer(rawData, self.get_stype(self._dtype, self.endianness)).copy().reshape(shape)
-        di = (data >> 15) != 0  # greater than 2^15
-        if di.sum() >= 1:
-            # find indices for which we need to do the correction (for which
-            # the 16th bit is set):
-
-            logger.debug("Correct for PM: %s" % di.sum())
-            data = data << 1 >> 1  # reset bit #15 to zero
-            self._dtype = numpy.dtype(numpy.uint32)
-            data = data.astype(self._dtype)
-            # Now we do some fixing for Rigaku's refusal to adhere to standards:
-            sf = self.header["Photomultiplier Ratio"]
-            # multiply by the ratio  defined in the header
-            # data[di] *= sf
-            data[di] = (sf * data[di]).astype(self._dtype)
-
-        self.data = data
+        self.data = self._correct_photomultiplier(data)
         self._shape = None
         self._dtype = None
         return self
@@ -0,0 +1,454 @@
+# coding: utf-8
+#
+#    Project: X-ray image reader
+#             https://github.com/silx-kit/fabio
+#
+#
+#    Copyright (C) European Synchrotron Radiation Facility, Grenoble, France
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+"""Reductions over the frames of a stack: sum, mean, min, max, variance and
+median, with an optional dark/flat correction of each frame.
+
+Frames are read by chunks of a few frames which are reduced into an
+accumulator with the shape of a single frame, so the memory used does not
+depend on the number of frames (except for the median). Each chunk is split
+into bands of rows reduced concurrently by a pool of threads.
+
+.. code-block:: python
+
+    from fabio import reduction
+
+    with fabio.open("scan.edf") as image:
+        total = reduction.sum_frames(image, dark=dark)
+
+    series = fabio.file_series.FileSeries(filenames, prefetch=4)
+    average = reduction.mean_frames(series, workers=8)
+
+The source of frames can be a :class:`FabioImage` (all its frames are used),
+a :class:`FileSeries`, a 2D or 3D numpy array, or an iterable of arrays,
+frames, images or filenames.
+"""
+
+__author__ = "Jérôme Kieffer"
+__contact__ = "Jerome.Kieffer@ESRF.eu"
+__license__ = "MIT"
+__copyright__ = "European Synchrotron Radiation Facility, Grenoble, France"
+__date__ = "17/10/2026"
+
+import os
+import logging
+import numpy
+from concurrent.futures import ThreadPoolExecutor
+from . import fabioutils
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("sum", "mean", "max", "min", "var", "median")
+"""Reductions supported by :func:`reduce_frames`"""
+
+DEFAULT_CHUNK_SIZE = 16
+"""Default number of frames reduced at once"""
+
+
+def _iter_arrays(source):
+    """Iterate the 2D arrays of a source of frames.
+
+    :param source: see :func:`reduce_frames`
+    :rtype: Iterator[numpy.ndarray]
+    """
+    if hasattr(source, "frames"):
+        for frame in source.frames():
+            yield frame.data
+        return
+    for item in source:
+        if isinstance(item, numpy.ndarray):
+            yield item
+        elif isinstance(item, fabioutils.PathTypes):
+            from .openimage import openimage
+
+            with openimage(str(item)) as image:
+                for frame in image.frames():
+                    yield frame.data
+        elif hasattr(item, "frames"):
+            for frame in item.frames():
+                yield frame.data
+        elif hasattr(item, "data"):
+            yield item.data
+        else:
+            yield numpy.asarray(item)
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Iterate the frames of a source by chunks of consecutive frames.
+
+    Stacks already in memory (numpy arrays, the `dataset` of the numpy and
+    mapped GE images) are sliced without copy. Images providing `get_frames`
+    (Eiger, Lima, Lambda) read each chunk at once. Other frames are copied
+    into a buffer which is reused from one chunk to the next: a chunk is only
+    valid until the next one is requested.
+
+    :param source: see :func:`reduce_frames`
+    :param int chunk_size: maximum number of frames per chunk
+    :rtype: Iterator[numpy.ndarray]
+    :raises ValueError: if the frames do not share the same shape
+    """
+    chunk_size = max(1, int(chunk_size))
+    if not isinstance(source, numpy.ndarray):
+        dataset = getattr(source, "dataset", None)
+        if (
+            isinstance(dataset, numpy.ndarray)
+            and dataset.ndim == 3
+            and len(dataset) == source.nframes
+        ):
+            source = dataset
+    if isinstance(source, numpy.ndarray):
+        if source.ndim == 2:
+            yield source[numpy.newaxis]
+        elif source.ndim == 3:
+            for start in range(0, len(source), chunk_size):
+                yield source[start : start + chunk_size]
+        else:
+            raise ValueError("Expected a 2D frame or a 3D stack, got %sD" % source.ndim)
+        return
+
+    if hasattr(source, "get_frames"):
+        # HDF5 based images read several frames at once
+        buffer = None
+        for start in range(0, source.nframes, chunk_size):
+            stop = min(source.nframes, start + chunk_size)
+            if buffer is None:
+                buffer = source.get_frames(start, stop)
+                yield buffer
+            else:
+                yield source.get_frames(start, stop, out=buffer[: stop - start])
+        return
+
+    buffer = None
+    count = 0
+    for data in _iter_arrays(source):
+        if data is None:
+            continue
+        if buffer is None:
+            buffer = numpy.empty((chunk_size,) + data.shape, dtype=data.dtype)
+        elif data.shape != buffer.shape[1:]:
+            raise ValueError(
+                "Frame shape %s differs from the first one %s"
+                % (data.shape, buffer.shape[1:])
+            )
+        elif data.dtype != buffer.dtype:
+            dtype = numpy.result_type(buffer.dtype, data.dtype)
+            if dtype != buffer.dtype:
+                new_buffer = numpy.empty(buffer.shape, dtype=dtype)
+                new_buffer[:count] = buffer[:count]
+                buffer = new_buffer
+        buffer[count] = data
+        count += 1
+        if count == chunk_size:
+            yield buffer
+            count = 0
+    if count:
+        yield buffer[:count]
+
+
+def _corrected_dtype(dtype, dark, flat):
+    """dtype of the frames after the dark and flat correction"""
+    if dark is None and flat is None:
+        return numpy.dtype(dtype)
+    return numpy.result_type(dtype, numpy.float32)
+
+
+def _correct(chunk, dark, flat):
+    """Dark and flat correction of a chunk (or a band of a chunk)
+
+    :return: (chunk - dark) / flat, in floating point, or the chunk itself
+    """
+    if dark is None and flat is None:
+        return chunk
+    result = numpy.array(chunk, dtype=_corrected_dtype(chunk.dtype, dark, flat))
+    if dark is not None:
+        result -= dark
+    if flat is not None:
+        result /= flat
+    return result
+
+
+def _bands(nrows, workers):
+    """Split the rows of a frame into contiguous bands, one per task"""
+    nbands = max(1, min(nrows, workers))
+    bounds = numpy.linspace(0, nrows, nbands + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _prepare(frame, shape, name):
+    """Check a dark/flat/out frame against the shape of the frames"""
+    if frame is None:
+        return None
+    frame = numpy.asarray(frame)
+    if frame.shape != shape:
+        raise ValueError(
+            "%s has the shape %s, frames have the shape %s" % (name, frame.shape, shape)
+        )
+    return frame
+
+
+def _band_of(frame, band):
+    return None if frame is None else frame[band]
+
+
+def reduce_frames(
+    source,
+    operation="sum",
+    dark=None,
+    flat=None,
+    out=None,
+    dtype=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    workers=None,
+):
+    """Reduce all the frames of a source into a single frame.
+
+    :param source: a :class:`FabioImage` or :class:`FileSeries` (all their
+        frames are used), a 2D or 3D numpy array, or an iterable of 2D arrays,
+        frames, images or filenames.
+    :param str operation: one of "sum", "mean", "max", "min", "var" (the
+        population variance) or "median"
+    :param Union[numpy.ndarray,None] dark: frame subtracted from each frame
+    :param Union[numpy.ndarray,None] flat: frame by which each frame is
+        divided, after the dark subtraction
+    :param Union[numpy.ndarray,None] out: array with the shape of a frame to
+        store the result into. Sum, mean, max and min are accumulated
+        directly into it, with its dtype. The variance is accumulated in
+        float64 and cast into it at the end.
+    :param dtype: dtype of the result when `out` is not provided. Defaults
+        to float64 for sum, mean and var, and to the dtype of the (corrected)
+        frames for max and min.
+    :param int chunk_size: number of frames reduced at once
+    :param Union[int,None] workers: number of threads, None for the number of
+        CPUs
+    :return: the reduced frame (`out` if provided)
+    :raises ValueError: if the source does not contain any frame or the
+        shapes do not match
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(
+            "Unsupported operation '%s', use one of %s" % (operation, OPERATIONS)
+        )
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, int(workers))
+    if operation == "median":
+        return _median(source, dark, flat, out, dtype, chunk_size, workers)
+
+    accumulator = None
+    mean = None
+    m2 = None
+    nframes = 0
+    bands = None
+    executor = ThreadPoolExecutor(workers) if workers > 1 else None
+    try:
+        for chunk in iter_chunks(source, chunk_size):
+            if accumulator is None:
+                shape = chunk.shape[1:]
+                dark = _prepare(dark, shape, "dark")
+                flat = _prepare(flat, shape, "flat")
+                out = _prepare(out, shape, "out")
+                if out is not None:
+                    accumulator = out
+                else:
+                    if dtype is None:
+                        if operation in ("max", "min"):
+                            dtype = _corrected_dtype(chunk.dtype, dark, flat)
+                        else:
+                            dtype = numpy.float64
+                    accumulator = numpy.zeros(shape, dtype=dtype)
+                if operation == "var":
+                    mean = numpy.zeros(shape, dtype=numpy.float64)
+                    if accumulator.dtype == numpy.float64:
+                        m2 = accumulator
+                        m2[...] = 0
+                    else:
+                        m2 = numpy.zeros(shape, dtype=numpy.float64)
+                bands = _bands(shape[0], workers)
+
+            first = nframes == 0
+            count = len(chunk)
+
+            def reduce_band(band):
+                data = _correct(chunk[:, band], _band_of(dark, band), _band_of(flat, band))
+                acc = accumulator[band]
+                if operation in ("sum", "mean"):
+                    if first:
+                        data.sum(axis=0, dtype=acc.dtype, out=acc)
+                    else:
+                        acc += data.sum(axis=0, dtype=acc.dtype)
+                elif operation == "max":
+                    if first:
+                        acc[...] = data.max(axis=0)
+                    else:
+                        numpy.maximum(acc, data.max(axis=0), out=acc)
+                elif operation == "min":
+                    if first:
+                        acc[...] = data.min(axis=0)
+                    else:
+                        numpy.minimum(acc, data.min(axis=0), out=acc)
+                else:
+                    # Merge the mean and sum of squared deviations of the chunk
+                    # with the ones of the previous frames (Chan et al.)
+                    chunk_mean = data.mean(axis=0, dtype=numpy.float64)
+                    deviation = data - chunk_mean
+                    chunk_m2 = numpy.einsum("ijk,ijk->jk", deviation, deviation)
+                    delta = chunk_mean - mean[band]
+                    total = nframes + count
+                    mean[band] += delta * (count / total)
+                    m2[band] += chunk_m2 + delta * delta * (nframes * count / total)
+
+            if executor is None or len(bands) == 1:
+                for band in bands:
+                    reduce_band(band)
+            else:
+                for _ in executor.map(reduce_band, bands):
+                    pass
+            nframes += count
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if nframes == 0:
+        raise ValueError("No frame to reduce")
+    if operation == "var":
+        if m2 is accumulator:
+            accumulator /= nframes
+        else:
+            accumulator[...] = m2 / nframes
+    elif operation == "mean":
+        if numpy.issubdtype(accumulator.dtype, numpy.inexact):
+            accumulator /= nframes
+        else:
+            numpy.floor_divide(accumulator, nframes, out=accumulator)
+    return accumulator
+
+
+def _median(source, dark, flat, out, dtype, chunk_size, workers):
+    """Median over all the frames, see :func:`reduce_frames`
+
+    All the frames are kept in memory.
+    """
+    chunks = [numpy.array(chunk) for chunk in iter_chunks(source, chunk_size)]
+    if not chunks:
+        raise ValueError("No frame to reduce")
+    stack = chunks[0] if len(chunks) == 1 else numpy.concatenate(chunks)
+    del chunks
+    shape = stack.shape[1:]
+    dark = _prepare(dark, shape, "dark")
+    flat = _prepare(flat, shape, "flat")
+    out = _prepare(out, shape, "out")
+    if out is None:
+        if dtype is None:
+            sample = numpy.zeros(1, _corrected_dtype(stack.dtype, dark, flat))
+            dtype = numpy.median(sample).dtype
+        out = numpy.empty(shape, dtype=dtype)
+
+    def reduce_band(band):
+        data = _correct(stack[:, band], _band_of(dark, band), _band_of(flat, band))
+        out[band] = numpy.median(data, axis=0)
+
+    bands = _bands(shape[0], workers)
+    if workers == 1 or len(bands) == 1:
+        for band in bands:
+            reduce_band(band)
+    else:
+        with ThreadPoolExecutor(workers) as executor:
+            for _ in executor.map(reduce_band, bands):
+                pass
+    return out
+
+
+def sum_frames(source, **kwargs):
+    """Sum of the frames, see :func:`reduce_frames` for the parameters"""
+    return reduce_frames(source, "sum", **kwargs)
+
+
+def mean_frames(source, **kwargs):
+    """Mean of the frames, see :func:`reduce_frames` for the parameters"""
+    return reduce_frames(source, "mean", **kwargs)
+
+
+def max_frames(source, **kwargs):
+    """Maximum of the frames, see :func:`reduce_frames` for the parameters"""
+    return reduce_frames(source, "max", **kwargs)
+
+
+def min_frames(source, **kwargs):
+    """Minimum of the frames, see :func:`reduce_frames` for the parameters"""
+    return reduce_frames(source, "min", **kwargs)
+
+
+def var_frames(source, **kwargs):
+    """Variance of the frames, see :func:`reduce_frames` for the parameters"""
+    return reduce_frames(source, "var", **kwargs)
+
+
+def median_frames(source, nframes=None, **kwargs):
+    """Median of the frames, see :func:`reduce_frames` for the parameters
+
+    Unlike the other reductions, all the frames are held in memory.
+
+    :param int nframes: if set, only the first `nframes` frames of the
+        source are used, for a median of N frames
+    """
+    if nframes is not None:
+        source = _first_frames(source, nframes)
+    return reduce_frames(source, "median", **kwargs)
+
+
+def _first_frames(source, nframes):
+    """Restrict a source to its first frames"""
+    if isinstance(source, numpy.ndarray) and source.ndim == 3:
+        return source[:nframes]
+    dataset = getattr(source, "dataset", None)
+    if isinstance(dataset, numpy.ndarray) and dataset.ndim == 3:
+        return dataset[:nframes]
+
+    def frames():
+        if nframes <= 0:
+            return
+        for index, data in enumerate(_iter_arrays(source)):
+            yield data
+            if index + 1 >= nframes:
+                return
+
+    return frames()
+
+
+def correct_frames(source, dark=None, flat=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Iterate the dark/flat corrected frames of a source.
+
+    :param source: see :func:`reduce_frames`
+    :param dark: frame subtracted from each frame
+    :param flat: frame by which each frame is divided
+    :rtype: Iterator[numpy.ndarray]
+    """
+    for chunk in iter_chunks(source, chunk_size):
+        corrected = _correct(chunk, dark, flat)
+        if corrected is chunk:
+            corrected = numpy.array(chunk)
+        for frame in corrected:
+            yield frame
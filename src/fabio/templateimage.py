@@ -48,8 +48,9 @@ The basic idea is the following:
    in case you have
    trouble with the transparent handling of bz2 and gz files.
 
-5) Add your new module as an import into fabio.fabioformats.
-   Your class will be registered automatically.
+5) Add your new module and class names to `_default_codecs` in
+   fabio.fabioformats, and its extensions to `_default_extensions`.
+   Your class will be registered automatically and imported on demand.
 
 6) Fill out the magic numbers for your format in fabio.openimage if you know
    them (the characteristic first few bytes in the file)
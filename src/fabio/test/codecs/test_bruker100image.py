@@ -136,10 +136,30 @@ class TestBruker100(unittest.TestCase):
         self.assertTrue(numpy.allclose(a.data, c.data), msg="data are the same")
 
 
+class TestBruker100Overflows(unittest.TestCase):
+    """Synthetic frames using the underflow and both overflow tables"""
+
+    def test_write_read(self):
+        filename = os.path.join(UtilsTest.tempdir, "%s.sfrm" % self.id())
+        rng = numpy.random.default_rng(0)
+        data = rng.normal(100, 50, (256, 300)).astype(numpy.int32)
+        index = rng.choice(data.size, 5000, replace=False)
+        data.ravel()[index[:2500]] = rng.integers(300, 60000, 2500)
+        data.ravel()[index[2500:]] = rng.integers(70000, 10**7, 2500)
+        Bruker100Image(data=data).write(filename)
+        new = openimage(filename)
+        noverfl = [int(i) for i in new.header["NOVERFL"].split()]
+        self.assertGreaterEqual(noverfl[1], 5000)
+        self.assertGreaterEqual(noverfl[2], 2500)
+        self.assertTrue(numpy.array_equal(new.data, data))
+        os.unlink(filename)
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loadTests(TestBruker100))
+    testsuite.addTest(loadTests(TestBruker100Overflows))
     return testsuite
 
 
@@ -37,7 +37,7 @@ import unittest
 import os
 import numpy
 import logging
-from ...brukerimage import brukerimage
+from ...brukerimage import brukerimage, _parse_overflows
 from ... import fabioutils
 from ..utilstest import UtilsTest
 
@@ -163,6 +163,29 @@ class TestBrukerLinear(unittest.TestCase):
             os.unlink(self.filename)
 
 
+class TestBrukerOverflows(unittest.TestCase):
+    """Frames with many entries in the overflow table"""
+
+    def test_write_read(self):
+        filename = os.path.join(UtilsTest.tempdir, "%s.gfrm" % self.id())
+        rng = numpy.random.default_rng(0)
+        data = rng.integers(0, 200, (256, 300)).astype(numpy.uint32)
+        index = rng.choice(data.size, 3000, replace=False)
+        data.ravel()[index] = rng.integers(300, 4000000, index.size)
+        brukerimage(data=data).write(filename)
+        new = brukerimage()
+        new.read(filename)
+        self.assertEqual(int(new.header["NOVERFL"]), 3000)
+        self.assertTrue(numpy.array_equal(new.data, data))
+        os.unlink(filename)
+
+    def test_parse(self):
+        table = b"000012345   1234  12345  00001  " + b"      7        0"
+        intensity, position = _parse_overflows(table)
+        self.assertEqual(intensity.tolist(), [12345, 12345, 7])
+        self.assertEqual(position.tolist(), [1234, 1, 0])
+
+
 # statistics come from fit2d I think
 # filename dim1 dim2 min max mean stddev
 TESTIMAGES = """Cr8F8140k103.0026   512  512  0  145942 289.37  432.17
@@ -238,6 +261,7 @@ def suite():
     testsuite.addTest(loadTests(TestGzipBruker))
     testsuite.addTest(loadTests(TestRealImg))
     testsuite.addTest(loadTests(TestBrukerLinear))
+    testsuite.addTest(loadTests(TestBrukerOverflows))
     return testsuite
 
 
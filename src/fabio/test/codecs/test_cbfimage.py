@@ -320,10 +320,44 @@ B   0.19750   0.50000   0.50000
         self.assertEqual(len(lab6), len(lab62), "size matches")
 
 
+class TestCbfWriter(unittest.TestCase):
+    """test the writer of cbf images"""
+
+    def test_cbf_section(self):
+        "The binary section of the written file is kept in `cbf`"
+        filename = os.path.join(UtilsTest.tempdir, "cbf_section.cbf")
+        data = numpy.arange(12, dtype=numpy.int32).reshape(3, 4)
+        image = CbfImage(header={}, data=data)
+        self.assertFalse(hasattr(image, "cbf"))
+        image.write(filename)
+        with open(filename, "rb") as f:
+            content = f.read()
+        self.assertTrue(image.cbf.startswith(CbfImage.BINARAY_SECTION))
+        self.assertTrue(image.cbf.endswith(b"--CIF-BINARY-FORMAT-SECTION----"))
+        self.assertIn(b"\r\n;\r\n" + image.cbf + b"\r\n;", content)
+
+
+class TestCbfThreads(unittest.TestCase):
+    """test the multi-threaded decompression of cbf images"""
+
+    def test_read_nthreads(self):
+        "Multi-threaded decompression of the byte-offset stream"
+        filename = os.path.join(UtilsTest.tempdir, "nthreads.cbf")
+        data = numpy.random.default_rng(0).poisson(100, (123, 457)).astype(numpy.int32)
+        data[::7, ::11] = 1 << 20
+        CbfImage(header={}, data=data).write(filename)
+        for nthreads in (0, 1, 4):
+            fimg = CbfImage().read(filename, nthreads=nthreads)
+            self.assertEqual(fimg.data.dtype, numpy.int32)
+            self.assertEqual(abs(data - fimg.data).max(), 0, "nthreads=%s" % nthreads)
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loadTests(TestCbfReader))
+    testsuite.addTest(loadTests(TestCbfWriter))
+    testsuite.addTest(loadTests(TestCbfThreads))
     return testsuite
 
 
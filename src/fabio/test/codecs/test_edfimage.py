@@ -34,6 +34,7 @@
 """
 
 import unittest
+import unittest.mock
 import os
 import numpy
 import shutil
@@ -869,6 +870,228 @@ class TestEdfIterator(unittest.TestCase):
             next(iterator)
 
 
+class TestEdfMmap(unittest.TestCase):
+    """Read uncompressed EDF files with memory mapping"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_directory = os.path.join(UtilsTest.tempdir, cls.__name__)
+        os.makedirs(cls.tmp_directory)
+        cls.data = numpy.arange(3 * 20 * 30, dtype=numpy.float32).reshape(3, 20, 30)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_directory)
+
+    def write_raw(self, filename, header, blob):
+        lines = "".join("%s = %s ;\n" % (k, v) for k, v in header.items())
+        with open(filename, "wb") as f:
+            f.write(("{\n%-1020s}\n" % lines).encode("ASCII"))
+            f.write(blob)
+
+    def test_multi_frame(self):
+        filename = os.path.join(self.tmp_directory, "multi.edf")
+        edf = edfimage(data=self.data[0])
+        for frame in self.data[1:]:
+            edf.append_frame(data=frame)
+        edf.write(filename)
+
+        with fabio.open(filename, mmap=True) as obt:
+            self.assertEqual(obt.nframes, 3)
+            for i, frame in enumerate(obt.frames()):
+                self.assertIsInstance(frame.data, numpy.memmap)
+                self.assertTrue(numpy.array_equal(frame.data, self.data[i]))
+            # data are copy-on-write
+            obt.data[0, 0] = -1
+        with fabio.open(filename) as ref:
+            self.assertEqual(ref.data[0, 0], self.data[0, 0, 0])
+
+    def test_byte_swap(self):
+        filename = os.path.join(self.tmp_directory, "swapped.edf")
+        big = not numpy.little_endian
+        header = {
+            "HeaderID": "EH:000001:000000:000000",
+            "Image": 1,
+            "ByteOrder": "LowByteFirst" if big else "HighByteFirst",
+            "DataType": "FloatValue",
+            "Dim_1": 30,
+            "Dim_2": 20,
+            "Size": self.data[0].nbytes,
+        }
+        stype = self.data.dtype.newbyteorder("<" if big else ">")
+        self.write_raw(filename, header, self.data[0].astype(stype).tobytes())
+        with fabio.open(filename, mmap=True) as obt:
+            self.assertTrue(obt.data.dtype.isnative)
+            self.assertTrue(numpy.array_equal(obt.data, self.data[0]))
+
+    def test_external_file(self):
+        filename = os.path.join(self.tmp_directory, "external.edf")
+        bfname = os.path.join(self.tmp_directory, "external.raw")
+        with open(bfname, "wb") as f:
+            f.write(b"\x00" * 100)
+            f.write(self.data[1].tobytes())
+        header = {
+            "EDF_DataBlockID": "1.Image.Psd",
+            "EDF_BinarySize": 0,
+            "ByteOrder": "LowByteFirst" if numpy.little_endian else "HighByteFirst",
+            "DataType": "FloatValue",
+            "Dim_1": 30,
+            "Dim_2": 20,
+            "EDF_BinaryFileName": "external.raw",
+            "EDF_BinaryFilePosition": 100,
+        }
+        self.write_raw(filename, header, b"")
+        with fabio.open(filename, mmap=True) as obt:
+            self.assertIsInstance(obt.data, numpy.memmap)
+            self.assertTrue(numpy.array_equal(obt.data, self.data[1]))
+
+    def test_rewrite(self):
+        """Writing mapped data into its own file"""
+        filename = os.path.join(self.tmp_directory, "rewrite.edf")
+        edfimage(data=self.data[2]).write(filename)
+        obt = fabio.open(filename, mmap=True)
+        obt.write(filename)
+        obt.close()
+        with fabio.open(filename) as ref:
+            self.assertTrue(numpy.array_equal(ref.data, self.data[2]))
+
+
+class TestEdfFrameIndex(unittest.TestCase):
+    """Persistent index of the frames of multi-frame EDF files"""
+
+    def setUp(self):
+        self.tmp_directory = os.path.join(UtilsTest.tempdir, self.id())
+        os.makedirs(self.tmp_directory)
+        self.filename = os.path.join(self.tmp_directory, "multi.edf")
+        self.data = numpy.arange(5 * 8 * 9, dtype=numpy.uint16).reshape(5, 8, 9)
+        edf = edfimage(data=self.data[0], header={"motor": 0})
+        for i, frame in enumerate(self.data[1:]):
+            edf.append_frame(data=frame, header={"motor": i + 1})
+        edf.write(self.filename)
+
+    def tearDown(self):
+        edfimage.frame_index = None
+        shutil.rmtree(self.tmp_directory)
+
+    def check_file(self):
+        with fabio.open(self.filename) as obt:
+            self.assertEqual(obt.nframes, 5)
+            for i, frame in enumerate(obt.frames()):
+                self.assertEqual(frame.header["motor"], str(i))
+                self.assertTrue(numpy.array_equal(frame.data, self.data[i]))
+            self.assertTrue(numpy.array_equal(obt.getframe(3).data, self.data[3]))
+
+    def test_sidecar(self):
+        edfimage.frame_index = fabio.edfimage.EdfFrameIndex()
+        self.check_file()
+        self.assertTrue(os.path.exists(self.filename + ".fidx"))
+
+        # Headers are not parsed anymore
+        with unittest.mock.patch.object(edfimage, "_read_header_block") as mocked:
+            self.check_file()
+        mocked.assert_not_called()
+
+    def test_outdated(self):
+        cache_dir = os.path.join(self.tmp_directory, "cache")
+        index = fabio.edfimage.EdfFrameIndex(cache_dir=cache_dir)
+        edfimage.frame_index = index
+        self.check_file()
+        self.assertTrue(os.path.exists(index.get_index_path(self.filename)))
+        self.assertIsNotNone(index.load(self.filename))
+
+        self.data = self.data[:2] + 1
+        edf = edfimage(data=self.data[0], header={"motor": 0})
+        edf.append_frame(data=self.data[1], header={"motor": 1})
+        edf.write(self.filename)
+        os.utime(self.filename, ns=(0, 0))
+        self.assertIsNone(index.load(self.filename))
+        with fabio.open(self.filename) as obt:
+            self.assertEqual(obt.nframes, 2)
+            self.assertTrue(numpy.array_equal(obt.getframe(1).data, self.data[1]))
+        self.assertIsNotNone(index.load(self.filename))
+
+
+class TestEdfWriter(unittest.TestCase):
+    """Write EDF files frame by frame"""
+
+    def setUp(self):
+        self.tmp_directory = os.path.join(UtilsTest.tempdir, self.id())
+        os.makedirs(self.tmp_directory)
+        self.filename = os.path.join(self.tmp_directory, "stream.edf")
+        self.data = numpy.arange(6 * 8 * 9, dtype=numpy.int32).reshape(6, 8, 9)
+
+    def tearDown(self):
+        edfimage.frame_index = None
+        shutil.rmtree(self.tmp_directory)
+
+    def check_file(self, nframes):
+        with fabio.open(self.filename) as obt:
+            self.assertEqual(obt.nframes, nframes)
+            for i, frame in enumerate(obt.frames()):
+                self.assertEqual(frame.header["motor"], str(i))
+                self.assertEqual(frame.header["Image"], str(i))
+                self.assertTrue(numpy.array_equal(frame.data, self.data[i]))
+
+    def test_same_as_write(self):
+        with fabio.edfimage.EdfWriter(self.filename) as writer:
+            for i, frame in enumerate(self.data[:3]):
+                writer.append_frame(frame, {"motor": i})
+        edf = edfimage(data=self.data[0], header={"motor": 0})
+        for i, frame in enumerate(self.data[1:3]):
+            edf.append_frame(data=frame, header={"motor": i + 1})
+        reference = os.path.join(self.tmp_directory, "reference.edf")
+        edf.write(reference)
+        with open(self.filename, "rb") as f1, open(reference, "rb") as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_append(self):
+        edfimage.frame_index = fabio.edfimage.EdfFrameIndex()
+        with fabio.edfimage.EdfWriter(self.filename, fsync_every=2) as writer:
+            for i, frame in enumerate(self.data[:3]):
+                writer.append_frame(frame, {"motor": i})
+        self.check_file(3)
+        self.assertTrue(os.path.exists(self.filename + ".fidx"))
+
+        # The number of frames comes from the index
+        with unittest.mock.patch.object(edfimage, "_read_header_block") as mocked:
+            writer = fabio.edfimage.EdfWriter(self.filename, mode="a")
+        mocked.assert_not_called()
+        with writer:
+            self.assertEqual(writer.nframes, 3)
+            for i, frame in enumerate(self.data[3:]):
+                writer.append_frame(frame, {"motor": i + 3})
+        self.assertEqual(writer.nframes, 6)
+        self.check_file(6)
+        self.assertRaises(ValueError, writer.append_frame, self.data[0])
+
+    def test_buffers(self):
+        frame = fabio.edfimage.EdfFrame(self.data[0, :, ::2], {"motor": 0})
+        frame._index = 0
+        header, blob = frame.get_edf_buffers(force_type="float32")
+        self.assertEqual(header + blob.tobytes(), frame.get_edf_block("float32"))
+        self.assertEqual(blob.nbytes, 8 * 5 * 4)
+
+        buffers = [b"abc", b"", numpy.arange(4, dtype=numpy.uint8)]
+        stream = io.BytesIO()
+        self.assertEqual(fabio.fabioutils.write_buffers(stream, buffers), 7)
+        self.assertEqual(stream.getvalue(), b"abc\x00\x01\x02\x03")
+
+        def partial_writev(fd, views):
+            # Write at most 2 bytes at a time
+            return os.write(fd, b"".join(views)[:2])
+
+        with unittest.mock.patch("os.writev", side_effect=partial_writev):
+            with fabio.fabioutils.File(self.filename, "wb") as f:
+                fabio.fabioutils.write_buffers(f, buffers)
+        with open(self.filename, "rb") as f:
+            self.assertEqual(f.read(), b"abc\x00\x01\x02\x03")
+
+    def test_bad_arguments(self):
+        EdfWriter = fabio.edfimage.EdfWriter
+        self.assertRaises(ValueError, EdfWriter, self.filename + ".gz")
+        self.assertRaises(ValueError, EdfWriter, self.filename, mode="r")
+
+
 class TestEdfBadHeader(unittest.TestCase):
     """Test reader behavior with corrupted header file"""
 
@@ -957,6 +1180,9 @@ def suite():
     testsuite.addTest(loadTests(TestBadFiles))
     testsuite.addTest(loadTests(TestBadGzFiles))
     testsuite.addTest(loadTests(TestEdfIterator))
+    testsuite.addTest(loadTests(TestEdfMmap))
+    testsuite.addTest(loadTests(TestEdfFrameIndex))
+    testsuite.addTest(loadTests(TestEdfWriter))
     testsuite.addTest(loadTests(TestSphere2SaxsSamples))
     testsuite.addTest(loadTests(TestEdfBadHeader))
     return testsuite
@@ -125,6 +125,20 @@ class TestEiger(_CommonTestFrames):
         for i, g in enumerate(f):
             self.assertEqual(abs(g.data - ary[i]).max(), 0, f"frame {i} matches")
 
+    def test_get_frames(self):
+        fn = os.path.join(UtilsTest.tempdir, "eiger_get_frames.h5")
+        ary = numpy.random.randint(0, 100, size=(10, 11, 13)).astype(numpy.uint32)
+        EigerImage(data=ary).write(fn)
+        with openimage(fn) as f:
+            self.assertTrue(numpy.array_equal(f.get_frames(), ary))
+            out = numpy.zeros((4, 11, 13), dtype=numpy.float32)
+            f.get_frames(3, 7, out=out, workers=2)
+            self.assertTrue(numpy.array_equal(out, ary[3:7]))
+            with self.assertRaises(IndexError):
+                f.get_frames(5, 11)
+        stack = EigerImage(data=ary).get_frames(8)
+        self.assertTrue(numpy.array_equal(stack, ary[8:]))
+
     def test_bug_479(self):
         fn = os.path.join(UtilsTest.tempdir, "eiger_479.h5")
         r = numpy.random.randint(0, 100, size=(100, 101))
@@ -35,9 +35,12 @@
 
 import unittest
 import os
+import struct
 import logging
+import numpy
 from ..utilstest import UtilsTest
-from fabio.GEimage import GEimage
+from fabio.GEimage import GEimage, GE_HEADER_INFO
+import fabio
 
 logger = logging.getLogger(__name__)
 
@@ -97,10 +100,77 @@ class TestGE(unittest.TestCase):
                 self.assertEqual(shape, obj.shape)
 
 
+class TestGEMmap(unittest.TestCase):
+    """Multi-frame GE files mapped into memory"""
+
+    def setUp(self):
+        rng = numpy.random.default_rng(0)
+        self.frames = rng.integers(0, 16000, (5, 64, 48)).astype(numpy.uint16)
+        self.filename = os.path.join(UtilsTest.tempdir, "%s.ge2" % self.id())
+        values = {
+            "ImageFormat": b"ADEPT",
+            "StandardHeaderSizeInBytes": 8192,
+            "UserHeaderSizeInBytes": 0,
+            "NumberOfRowsInFrame": 64,
+            "NumberOfColsInFrame": 48,
+            "ImageDepthInBits": 16,
+            "NumberOfFrames": 5,
+        }
+        header = b""
+        for name, nbytes, fmt in GE_HEADER_INFO:
+            value = values.get(name, 0)
+            if fmt is None:
+                header += bytes(value).ljust(nbytes, b"\x00") if value else bytes(nbytes)
+            else:
+                header += struct.pack(fmt, value)
+        with open(self.filename, "wb") as f:
+            f.write(header.ljust(8192, b"\x00"))
+            f.write(self.frames.astype("<u2").tobytes())
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def test_mmap(self):
+        with fabio.open(self.filename, 2, mmap=True) as image:
+            self.assertEqual(image.nframes, 5)
+            self.assertIsInstance(image.dataset, numpy.memmap)
+            self.assertEqual(image.dataset.shape, (5, 64, 48))
+            self.assertTrue(numpy.array_equal(image.data, self.frames[2]))
+            self.assertTrue(numpy.shares_memory(image.data, image.dataset))
+            frame = image.getframe(4)
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[4]))
+            self.assertTrue(numpy.shares_memory(frame.data, image.dataset))
+            frame = frame.previous()
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[3]))
+            for num, frame in enumerate(image.frames()):
+                self.assertTrue(numpy.array_equal(frame.data, self.frames[num]))
+            # reductions over the stack
+            dark = image.dataset[0]
+            signal = (image.dataset[1:].astype(numpy.int32) - dark).sum(axis=0)
+            expected = (self.frames[1:].astype(numpy.int32) - self.frames[0]).sum(axis=0)
+            self.assertTrue(numpy.array_equal(signal, expected))
+
+    def test_no_mmap(self):
+        with fabio.open(self.filename, 1) as image:
+            self.assertIsNone(image.dataset)
+            self.assertTrue(numpy.array_equal(image.data, self.frames[1]))
+            self.assertTrue(numpy.array_equal(image.getframe(3).data, self.frames[3]))
+
+    def test_truncated(self):
+        with open(self.filename, "r+b") as f:
+            f.truncate(8192 + 3 * 64 * 48 * 2 + 10)
+        image = GEimage()
+        image.use_mmap = True
+        image.read(self.filename)
+        self.assertEqual(image.dataset.shape, (3, 64, 48))
+        self.assertTrue(numpy.array_equal(image.getframe(2).data, self.frames[2]))
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loadTests(TestGE))
+    testsuite.addTest(loadTests(TestGEMmap))
     return testsuite
 
 
@@ -95,6 +95,19 @@ class TestLambda(unittest.TestCase):
                     f"data are the same {fname} #{idx}",
                 )
 
+    def test_get_frames(self):
+        dst = os.path.join(UtilsTest.tempdir, "lambda_get_frames.nxs")
+        ary = numpy.random.randint(0, 100, size=(7, 11, 13)).astype(numpy.uint16)
+        obj = fabio.lambdaimage.LambdaImage()
+        for i, d in enumerate(ary):
+            obj.set_data(d, i)
+        obj.write(dst)
+        with openimage(dst) as read_back:
+            self.assertIsInstance(read_back, fabio.lambdaimage.LambdaImage)
+            self.assertTrue(numpy.array_equal(read_back.get_frames(), ary))
+            self.assertTrue(numpy.array_equal(read_back.get_frames(1, 4), ary[1:4]))
+        os.unlink(dst)
+
 
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
@@ -128,6 +128,19 @@ class TestLima(_CommonTestFrames):
         for i, g in enumerate(f):
             self.assertEqual(abs(g.data - ary[i]).max(), 0, f"frame {i} matches")
 
+    def test_get_frames(self):
+        fn = os.path.join(UtilsTest.tempdir, "lima_get_frames.h5")
+        ary = numpy.random.randint(0, 100, size=(10, 11, 13)).astype(numpy.uint16)
+        e = LimaImage()
+        for i, d in enumerate(ary):
+            e.set_data(d, i)
+        e.save(fn)
+        with openimage(fn) as f:
+            self.assertTrue(numpy.array_equal(f.get_frames(), ary))
+            self.assertTrue(numpy.array_equal(f.get_frames(2, 5, workers=3), ary[2:5]))
+        self.assertTrue(numpy.array_equal(e.get_frames(9), ary[9:]))
+        os.unlink(fn)
+
     def test_identify(self):
         fn = UtilsTest.getimage("output_sparse_0_00000.h5")
         res = openimage(fn)
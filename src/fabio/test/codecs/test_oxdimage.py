@@ -39,8 +39,10 @@ __contact__ = "jerome.kieffer@esrf.fr"
 import unittest
 import os
 import logging
+import numpy
 import fabio
 from fabio.OXDimage import OXDimage
+from fabio.compression import compTY5
 from ..utilstest import UtilsTest
 
 logger = logging.getLogger(__name__)
@@ -95,7 +97,7 @@ class TestOxd(unittest.TestCase):
             name = vals[0]
             obj = OXDimage()
             obj.read(self.fn[name])
-            if obj.header.get("Compression") not in ["NO ", "TY1"]:
+            if obj.header.get("Compression") not in ["NO ", "TY1", "TY5"]:
                 logger.info("Skip write test for now")
                 continue
             obj.write(os.path.join(UtilsTest.tempdir, name))
@@ -180,6 +182,29 @@ class TestConvert(unittest.TestCase):
         os.unlink(dst)
 
 
+class TestOxdTY5(unittest.TestCase):
+    """Synthetic TY5 images, with 16 and 32 bits exceptions"""
+
+    def test_write_read(self):
+        rng = numpy.random.default_rng(0)
+        data = rng.integers(0, 50, (64, 96)).astype(numpy.int32)
+        data[10, 10] = 50000
+        data[20, 30] = -(2**30)
+        data[:, 0] = 1000
+        filename = os.path.join(UtilsTest.tempdir, "%s.img" % self.id())
+        obj = OXDimage(data=data, header={"Compression": "TY5"})
+        obj.write(filename)
+        other = fabio.open(filename)
+        self.assertEqual(other.header["Compression"], "TY5")
+        _, n16, n32 = compTY5(data)
+        self.assertEqual(other.header["OI"], n16)
+        self.assertEqual(other.header["OL"], n32)
+        self.assertGreater(n32, 0)
+        self.assertEqual(other.data.dtype, numpy.int32)
+        self.assertTrue(numpy.array_equal(other.data, data))
+        os.unlink(filename)
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
@@ -187,6 +212,7 @@ def suite():
     testsuite.addTest(loadTests(TestOxdSame))
     testsuite.addTest(loadTests(TestOxdBig))
     testsuite.addTest(loadTests(TestConvert))
+    testsuite.addTest(loadTests(TestOxdTY5))
     return testsuite
 
 
@@ -194,6 +194,31 @@ class TestCompression(unittest.TestCase):
         self.assertTrue(np.array_equal(data, uncompressed), "Cython version is OK")
         print("speed-up:", (t1 - t0) / (t3 - t2))
 
+    def test_cython_decompress(self):
+        rng = np.random.default_rng(0)
+        for size in (1, 2, 16, 17, 100):
+            data = rng.poisson(50, (size, size)).astype("int32")
+            exceptions = data.ravel()[::7]
+            exceptions[:] = rng.choice([-100000, 40000, -300, 2**30], exceptions.size)
+            data.ravel()[::7] = exceptions
+            compressed = _agi_bitfield.compress(data)
+            for nthreads in (0, 1, 3):
+                uncompressed = _agi_bitfield.decompress(compressed, data.shape, nthreads)
+                self.assertEqual(uncompressed.dtype, np.int32)
+                self.assertTrue(np.array_equal(data, uncompressed), size)
+            self.assertTrue(
+                np.array_equal(data, agi_bitfield.decompress(compressed, data.shape))
+            )
+            # Without or with a corrupted table of row offsets
+            uncompressed = _agi_bitfield.decompress(compressed[: -4 * size], data.shape)
+            self.assertTrue(np.array_equal(data, uncompressed), size)
+            corrupted = bytearray(compressed)
+            corrupted[-1] ^= 0x55
+            uncompressed = _agi_bitfield.decompress(bytes(corrupted), data.shape)
+            self.assertTrue(np.array_equal(data, uncompressed), size)
+
+        self.assertRaises(IOError, _agi_bitfield.decompress, compressed[:100], data.shape)
+
 
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
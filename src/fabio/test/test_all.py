@@ -35,6 +35,7 @@ from . import test_fabio_image
 from . import test_filenames
 from . import test_file_series
 from . import test_filename_steps
+from . import test_hdf5chunks
 from . import test_header_not_singleton
 from . import test_open_header
 from . import test_open_image
@@ -46,6 +47,8 @@ from . import test_failing_files
 from . import test_formats
 from . import test_image_convert
 from . import test_tiffio
+from . import test_framecache
+from . import test_gzipindex
 from . import test_frames
 from . import test_fabio
 from . import codecs
@@ -54,6 +57,10 @@ from . import test_densification
 from . import test_io_limits
 from . import test_utils_cli
 from . import test_import
+from . import test_benchmark
+from . import test_instrumentation
+from . import test_reduction
+from . import test_roi
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +71,7 @@ def suite():
     testSuite.addTest(test_filenames.suite())
     testSuite.addTest(test_file_series.suite())
     testSuite.addTest(test_filename_steps.suite())
+    testSuite.addTest(test_hdf5chunks.suite())
     testSuite.addTest(test_header_not_singleton.suite())
     testSuite.addTest(test_open_header.suite())
     testSuite.addTest(test_open_image.suite())
@@ -75,6 +83,8 @@ def suite():
     testSuite.addTest(test_formats.suite())
     testSuite.addTest(test_image_convert.suite())
     testSuite.addTest(test_tiffio.suite())
+    testSuite.addTest(test_framecache.suite())
+    testSuite.addTest(test_gzipindex.suite())
     testSuite.addTest(test_frames.suite())
     testSuite.addTest(test_fabio.suite())
     testSuite.addTest(codecs.suite())
@@ -83,6 +93,10 @@ def suite():
     testSuite.addTest(test_io_limits.suite())
     testSuite.addTest(test_utils_cli.suite())
     testSuite.addTest(test_import.suite())
+    testSuite.addTest(test_benchmark.suite())
+    testSuite.addTest(test_instrumentation.suite())
+    testSuite.addTest(test_reduction.suite())
+    testSuite.addTest(test_roi.suite())
     return testSuite
 
 
@@ -0,0 +1,110 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Smoke test of the benchmark suite"""
+
+import os
+import unittest
+import unittest.mock
+import logging
+from .utilstest import UtilsTest
+from ..benchmark import suite as benchmark_suite
+
+logger = logging.getLogger(__name__)
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_run(self):
+        results = benchmark_suite.run_suite(sizes=[32], repeat=1, nframes=2)
+        names = set(r["name"] for r in results["results"])
+        for name in [
+            "read/edfimage",
+            "header/cbfimage",
+            "frames/edfimage",
+            "kernel/byte_offset/decompress",
+            "series/edfimage/prefetch=4",
+        ]:
+            self.assertIn(name, names)
+        for result in results["results"]:
+            self.assertEqual(result["size"], 32)
+            self.assertTrue("best" in result or "error" in result)
+
+    def test_select_and_compare(self):
+        results = benchmark_suite.run_suite(sizes=[32], repeat=1, select="byte_offset")
+        self.assertTrue(results["results"])
+        for result in results["results"]:
+            self.assertIn("byte_offset", result["name"])
+
+        filename = os.path.join(UtilsTest.tempdir, "benchmark.json")
+        benchmark_suite.save_results(results, filename)
+        baseline = benchmark_suite.load_results(filename)
+        self.assertEqual(benchmark_suite.compare(results, baseline), [])
+        for result in baseline["results"]:
+            result["best"] /= 10
+        regressions = benchmark_suite.compare(results, baseline, tolerance=1)
+        self.assertEqual(len(regressions), len(results["results"]))
+
+    def test_select_setup(self):
+        """Only the inputs of the selected benchmarks are generated"""
+        shapes = []
+        generate_data = benchmark_suite.generate_data
+
+        def recording_generate_data(shape, *args, **kwargs):
+            shapes.append(shape)
+            return generate_data(shape, *args, **kwargs)
+
+        with unittest.mock.patch.object(
+            benchmark_suite, "generate_data", recording_generate_data
+        ):
+            results = benchmark_suite.run_suite(
+                sizes=[32], repeat=1, select="kernel/agi_bitfield/decompress"
+            )
+        self.assertEqual(shapes, [(32, 32)])
+        names = [r["name"] for r in results["results"]]
+        self.assertEqual(
+            names,
+            ["kernel/agi_bitfield/decompress", "kernel/agi_bitfield/decompress_python"],
+        )
+
+        shapes.clear()
+        with unittest.mock.patch.object(
+            benchmark_suite, "generate_data", recording_generate_data
+        ):
+            results = benchmark_suite.run_suite(sizes=[32], repeat=1, select="read/cbf")
+        self.assertEqual(len(shapes), 1)
+        names = [r["name"] for r in results["results"]]
+        self.assertEqual(names, ["read/cbfimage"])
+        self.assertIn("best", results["results"][0])
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestBenchmarkSuite))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
@@ -34,10 +34,16 @@ __license__ = "MIT"
 __copyright__ = "2011-2016 ESRF"
 __date__ = "27/10/2025"
 
+import os
+import bz2
+import gzip
+import zlib
 import unittest
+import unittest.mock
 import numpy
 import logging
 from fabio import compression
+from .utilstest import UtilsTest
 
 logger = logging.getLogger(__name__)
 
@@ -169,11 +175,178 @@ class TestByteOffset(unittest.TestCase):
         )
         self.assertEqual(abs(self.ds - obt_cy2).max(), 0.0, "cython2-numpy algo_orig")
 
+    def testParallel(self):
+        """test the multi-threaded decompression against the serial one"""
+        stream = compression.compByteOffset_cython(self.ds)
+        for nthreads in (0, 2, 3, 7, 100):
+            obt = compression.decByteOffset_cython(stream, nthreads=nthreads)
+            self.assertEqual(abs(self.ds - obt).max(), 0, "nthreads=%s" % nthreads)
+
+        rng = numpy.random.default_rng(0)
+        ds = rng.poisson(10, 100000).astype(numpy.int32)
+        ds[::97] = 70000
+        ds[::1013] = -2**30
+        stream = compression.compByteOffset_cython(ds)
+        ref = compression.decByteOffset_cython(stream, ds.size, dtype="int32")
+        obt = compression.decByteOffset_cython(stream, ds.size, "int32", nthreads=4)
+        self.assertEqual(obt.dtype, numpy.int32)
+        self.assertTrue(numpy.array_equal(ref, obt))
+        self.assertTrue(numpy.array_equal(ds, obt))
+
+        # truncated stream
+        ref = compression.decByteOffset_cython(stream[:5000], ds.size, dtype="int32")
+        obt = compression.decByteOffset_cython(stream[:5000], ds.size, "int32", 4)
+        self.assertTrue(numpy.array_equal(ref, obt))
+
+    def testParallelCompression(self):
+        """test the multi-threaded compression against the serial one"""
+        rng = numpy.random.default_rng(0)
+        ds32 = rng.poisson(10, 300000).astype(numpy.int32)
+        ds32[::97] = 70000
+        ds32[::1013] = -(2**30)
+        ds64 = ds32.astype(numpy.int64)
+        ds64[::5003] = 2**40
+        for ds in (self.ds, ds32, ds64, ds32.astype(numpy.uint16)):
+            ref = compression.compByteOffset_cython(ds)
+            for nthreads in (None, 1, 3):
+                obt, md5 = compression.compByteOffset_md5(ds, nthreads)
+                self.assertEqual(obt.tobytes(), ref)
+                self.assertEqual(md5, compression.md5sum(ref))
+
+    def testNumpyEscapes(self):
+        """test the numpy decompression with 0x80 bytes inside exceptions"""
+        rng = numpy.random.default_rng(0)
+        ds = rng.integers(-100, 100, 10000).cumsum()
+        index = rng.integers(0, ds.size, 3000)
+        values = [-(2**40), 2**33, -32640, 32896, -(2**31) - 8, 70000, 128, -128]
+        ds[index] = rng.choice(values, index.size)
+        # consecutive exceptions made of 0x80 bytes
+        ds[100:200] = numpy.cumsum(numpy.full(100, -32640))
+        stream = compression.compByteOffset_numpy(ds)
+        obt = compression.decByteOffset_numpy(stream)
+        self.assertTrue(numpy.array_equal(ds, obt))
+        self.assertEqual(compression.decByteOffset_numpy(b"").size, 0)
+
+
+class TestPackBits(unittest.TestCase):
+    # Example from the TIFF 6.0 specification, with a -128 no-op added
+    stream = bytes.fromhex("FE AA 02 80 00 2A FD AA 03 80 00 2A 22 F7 AA 80")
+    expected = bytes.fromhex(
+        "AA AA AA 80 00 2A AA AA AA AA 80 00 2A 22 AA AA AA AA AA AA AA AA AA AA"
+    )
+
+    def testPython(self):
+        obt = compression.decPackBits_python(self.stream)
+        self.assertEqual(obt.tobytes(), self.expected)
+        self.assertRaises(
+            IOError, compression.decPackBits_python, self.stream, len(self.expected) - 1
+        )
+
+    def testDecompress(self):
+        obt = compression.decPackBits(self.stream, len(self.expected))
+        self.assertEqual(obt.tobytes(), self.expected)
+        obt = compression.decPackBits(self.stream)
+        self.assertEqual(obt.tobytes(), self.expected)
+        self.assertRaises(
+            IOError, compression.decPackBits, self.stream, len(self.expected) - 1
+        )
+        # truncated literal run
+        obt = compression.decPackBits(self.stream[:4], 24)
+        self.assertEqual(obt.tobytes(), self.expected[:4])
+
+    def testOut(self):
+        out = numpy.zeros(12, dtype=numpy.uint16)
+        obt = compression.decPackBits(self.stream, out.nbytes, out=out)
+        self.assertEqual(obt.tobytes(), self.expected)
+        self.assertEqual(out.tobytes(), self.expected)
+
+
+class TestTY5(unittest.TestCase):
+    def testRoundTrip(self):
+        rng = numpy.random.default_rng(0)
+        ds = rng.integers(0, 200, (37, 53)).astype(numpy.int32)
+        ds[10:20] = rng.integers(0, 20000, (10, 53))
+        ds[20:] = rng.integers(-(2**31), 2**31 - 1, (17, 53))
+        stream, n16, n32 = compression.compTY5(ds)
+        self.assertEqual(len(stream), ds.size + 2 * n16 + 4 * n32)
+        self.assertEqual((stream, n16, n32), compression.compTY5_numpy(ds))
+        obt = compression.decTY5(stream, ds.size, 53)
+        self.assertEqual(obt.dtype, numpy.int32)
+        self.assertTrue(numpy.array_equal(obt, ds.ravel()))
+        obt = compression.decTY5_python(stream, ds.size, 53)
+        self.assertTrue(numpy.array_equal(obt, ds.ravel()))
+
+    def testTruncated(self):
+        ds = numpy.array([[0, 5, 300, -70000]], dtype=numpy.int32)
+        stream, n16, n32 = compression.compTY5(ds)
+        self.assertEqual((n16, n32), (1, 1))
+        for decoder in (compression.decTY5, compression.decTY5_python):
+            obt = decoder(stream[:-1], ds.size, 4)
+            self.assertTrue(numpy.array_equal(obt, ds.ravel()[:3]))
+
+
+class TestParallelDecompression(unittest.TestCase):
+    def setUp(self):
+        self.raw = numpy.arange(300000, dtype=numpy.uint16).tobytes()
+        self.parts = [self.raw[:150000], self.raw[150000:]]
+
+    @staticmethod
+    def bgzf_block(data):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        body = compressor.compress(data) + compressor.flush()
+        size = 18 + len(body) + 8
+        header = b"\x1f\x8b\x08\x04\0\0\0\0\0\xff\x06\0BC\x02\0"
+        trailer = zlib.crc32(data).to_bytes(4, "little")
+        trailer += len(data).to_bytes(4, "little")
+        return header + (size - 1).to_bytes(2, "little") + body + trailer
+
+    def test_gzip(self):
+        single = gzip.compress(self.raw)
+        self.assertEqual(compression.decompress_gzip(single), self.raw)
+        multi = b"".join(gzip.compress(part) for part in self.parts)
+        self.assertEqual(compression.decompress_gzip(multi + b"\0" * 8), self.raw)
+        # BGZF blocks are smaller than 64 kB
+        starts = range(0, len(self.raw), 30000)
+        blocks = [self.bgzf_block(self.raw[i : i + 30000]) for i in starts]
+        bgzf = b"".join(blocks)
+        offsets = compression.compression._bgzf_members(bgzf)
+        self.assertEqual(offsets[:2], [0, len(blocks[0])])
+        self.assertEqual(compression.decompress_gzip(bgzf, workers=2), self.raw)
+        self.assertRaises(EOFError, compression.decompress_gzip, multi[:-100])
+
+    def test_gzip_false_member(self):
+        # Stored blocks contain the magic number of a gzip member
+        data = b"\x1f\x8b\x08\x00" * 1000 + self.raw
+        stored = gzip.compress(data, compresslevel=0)
+        compressed = stored + gzip.compress(self.raw)
+        members = compression.compression._GZIP_MEMBER.findall(compressed)
+        self.assertGreater(len(members), 2)
+        self.assertEqual(compression.decompress_gzip(compressed), data + self.raw)
+
+    def test_bzip2(self):
+        multi = b"".join(bz2.compress(part) for part in self.parts)
+        self.assertEqual(compression.decompress_bzip2(multi, workers=2), self.raw)
+        self.assertEqual(compression.decompress_bzip2(bz2.compress(b"")), b"")
+
+    def test_file(self):
+        filename = os.path.join(UtilsTest.tempdir, "decompress_file.bz2")
+        with open(filename, "wb") as f:
+            f.write(bz2.compress(self.raw))
+        self.addCleanup(os.unlink, filename)
+        with unittest.mock.patch.object(
+            compression.COMPRESSORS, "is_parallel", return_value=False
+        ):
+            self.assertEqual(compression.decompress_file(filename), self.raw)
+        self.assertRaises(ValueError, compression.decompress_file, filename[:-4])
+
 
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loadTests(TestByteOffset))
+    testsuite.addTest(loadTests(TestPackBits))
+    testsuite.addTest(loadTests(TestTY5))
+    testsuite.addTest(loadTests(TestParallelDecompression))
     return testsuite
 
 
@@ -36,6 +36,8 @@ import unittest
 import logging
 import os
 import shutil
+import threading
+import unittest.mock
 import numpy
 import fabio
 from fabio.file_series import numbered_file_series, file_series, filename_series
@@ -342,6 +344,56 @@ class TestFileSeries(unittest.TestCase):
         self.assertEqual(frame_id, 9)
         serie.close()
 
+    def test_prefetch_frames(self):
+        filenames = self.get_anyframe_files()
+        expected = []
+        serie = FileSeries(filenames=filenames)
+        for frame in serie.frames():
+            expected.append((frame.index, frame.file_index, frame.data.copy()))
+        serie.close()
+        for prefetch, memory in [(1, None), (3, None), (3, 1)]:
+            serie = FileSeries(
+                filenames=iter(filenames), prefetch=prefetch, prefetch_memory=memory
+            )
+            frames = [(f.index, f.file_index, f.data) for f in serie.frames()]
+            self.assertEqual(len(frames), len(expected))
+            for frame, ref in zip(frames, expected):
+                self.assertEqual(frame[:2], ref[:2])
+                self.assertTrue(numpy.array_equal(frame[2], ref[2]))
+            self.assertEqual(serie.nframes, 10)
+            serie.close()
+
+    def test_prefetch_decoded(self):
+        filenames = self.get_anyframe_files()
+        unpack = fabio.edfimage.EdfFrame._unpack
+        decoding_threads = set()
+
+        def recording_unpack(frame):
+            if frame._data is None:
+                decoding_threads.add(threading.current_thread())
+            return unpack(frame)
+
+        serie = FileSeries(filenames=filenames, prefetch=2)
+        with unittest.mock.patch.object(
+            fabio.edfimage.EdfFrame, "_unpack", recording_unpack
+        ):
+            for frame in serie.frames():
+                # already decoded by the prefetch threads
+                self.assertIsNotNone(frame._data)
+                frame.data
+        serie.close()
+        self.assertTrue(decoding_threads)
+        self.assertNotIn(threading.main_thread(), decoding_threads)
+
+    def test_prefetch_interrupted(self):
+        filenames = self.get_singleframe_files()
+        serie = fabio.open_series(filenames=filenames, prefetch=2)
+        frames = serie.frames()
+        frame = next(frames)
+        self.assertEqual(frame.data[0, 0], 0)
+        frames.close()
+        serie.close()
+
     def test_filename_iterator(self):
         filenames = self.get_anyframe_files()
         serie = FileSeries(filenames=iter(filenames))
@@ -34,6 +34,8 @@
 
 import unittest
 import logging
+import subprocess
+import sys
 import fabio
 from .. import fabioformats
 from ..utils import deprecation
@@ -92,10 +94,54 @@ class TestRegistration(unittest.TestCase):
             self.assertFalse("." in ext)
 
 
+class TestLazyRegistration(unittest.TestCase):
+    def test_default_extensions(self):
+        """The static extensions match the ones of the codec classes"""
+        for module_name, class_name in fabioformats._default_codecs:
+            codec_class = fabioformats._import_codec(module_name, class_name)
+            if class_name not in fabioformats._default_extensions:
+                # alias
+                self.assertIsNotNone(
+                    fabioformats.get_class_by_name(codec_class.codec_name())
+                )
+                continue
+            self.assertEqual(
+                list(codec_class.DEFAULT_EXTENSIONS),
+                fabioformats._default_extensions[class_name],
+                class_name,
+            )
+
+    def test_import_on_demand(self):
+        script = "; ".join(
+            [
+                "import sys",
+                "import fabio",
+                "assert 'fabio.edfimage' not in sys.modules",
+                "assert 'h5py' not in sys.modules",
+                "assert fabio.fabioformats.is_extension_supported('edf')",
+                "assert 'fabio.edfimage' not in sys.modules",
+                "assert fabio.factory('edfimage') is not None",
+                "assert 'fabio.edfimage' in sys.modules",
+                "assert 'fabio.cbfimage' not in sys.modules",
+                "assert fabio.cbfimage.CbfImage is not None",
+            ]
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_classes_from_extension(self):
+        classes = fabioformats.get_classes_from_extension(".TIF")
+        names = [c.__name__ for c in classes]
+        self.assertEqual(names, ["TifImage", "PilatusImage"])
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loadTests(TestRegistration))
+    testsuite.addTest(loadTests(TestLazyRegistration))
     return testsuite
 
 
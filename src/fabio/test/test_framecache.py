@@ -0,0 +1,186 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Test the process-wide cache of decoded frames"""
+
+import os
+import time
+import unittest
+import logging
+import numpy
+import fabio
+from .utilstest import UtilsTest
+from .. import framecache
+from ..edfimage import EdfImage, EdfFrame
+from ..file_series import FileSeries
+
+logger = logging.getLogger(__name__)
+
+
+class TestFrameCache(unittest.TestCase):
+    def test_lru(self):
+        cache = framecache.FrameCache(max_bytes=300)
+        self.assertTrue(cache.enabled)
+        for index in range(3):
+            cache.put(("f", index), numpy.zeros(100, numpy.uint8) + index, {"i": index})
+        self.assertEqual(cache.nbytes, 300)
+        self.assertEqual(cache.get(("f", 0))[1], {"i": 0})
+        cache.put(("f", 3), numpy.zeros(100, numpy.uint8), {})
+        # frame 1 was the least recently used
+        self.assertIsNone(cache.get(("f", 1)))
+        data, _ = cache.get(("f", 2))
+        self.assertFalse(data.flags.writeable)
+        self.assertEqual(data[0], 2)
+        self.assertEqual(cache.stats(), framecache.CacheStats(2, 1, 1, 3, 300, 300))
+        # too large
+        self.assertIsNone(cache.put(("f", 4), numpy.zeros(301, numpy.uint8), {}))
+        cache.max_bytes = 150
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats().evictions, 3)
+        cache.clear()
+        self.assertEqual(cache.stats(), framecache.CacheStats(0, 0, 0, 0, 0, 150))
+        cache.max_bytes = 0
+        self.assertFalse(cache.enabled)
+
+    def test_not_cached(self):
+        cache = framecache.FrameCache(max_bytes=10**6)
+        filename = os.path.join(UtilsTest.tempdir, "framecache.raw")
+        numpy.zeros(10, numpy.uint8).tofile(filename)
+        mapped = numpy.memmap(filename, dtype=numpy.uint8, mode="r")
+        self.assertIsNone(cache.put("mapped", mapped[2:], {}))
+        del mapped
+        self.assertIsNone(cache.make_key(filename + ".missing", "codec", 0))
+        key = cache.make_key(filename, "codec", 0)
+        cache.put(key, numpy.arange(5), {})
+        cache.invalidate(filename)
+        self.assertEqual(len(cache), 0)
+        os.unlink(filename)
+
+
+class TestCachedFrames(unittest.TestCase):
+    def setUp(self):
+        self.cache = framecache.default_cache
+        self.max_bytes = self.cache.max_bytes
+        self.cache.max_bytes = 10**7
+        self.cache.clear()
+        rng = numpy.random.default_rng(0)
+        self.frames = rng.integers(0, 1000, (3, 20, 30)).astype(numpy.int32)
+        self.filename = os.path.join(UtilsTest.tempdir, "%s.edf" % self.id())
+        self.write(self.frames)
+
+    def tearDown(self):
+        self.cache.clear()
+        self.cache.max_bytes = self.max_bytes
+        os.unlink(self.filename)
+
+    def write(self, frames):
+        image = EdfImage(data=frames[0])
+        for frame in frames[1:]:
+            image.append_frame(data=frame)
+        image.write(self.filename)
+
+    def test_get_frame(self):
+        with fabio.open(self.filename) as image:
+            frame = image.get_frame(1)
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[1]))
+            self.assertTrue(frame.data.flags.writeable)
+        self.assertEqual(self.cache.stats().misses, 1)
+        with fabio.open(self.filename) as image:
+            frame = image.get_frame(1)
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[1]))
+            self.assertIsInstance(frame, EdfFrame)
+            self.assertEqual(frame.blobsize, self.frames[1].nbytes)
+            # in-place operations do not alter the cache
+            frame.data -= 1
+            self.assertIs(frame.container, image)
+            self.assertEqual(frame.header["DataType"], "SignedInteger")
+        stats = self.cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+
+        # A modified file is read again
+        time.sleep(0.01)
+        self.write(self.frames[::-1].copy())
+        with fabio.open(self.filename) as image:
+            frame = image.get_frame(1)
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[1]))
+            frame = image.get_frame(0)
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[2]))
+        self.assertEqual(self.cache.stats().hits, 1)
+
+    def test_getframe(self):
+        for _ in range(3):
+            with fabio.open(self.filename) as image:
+                frame = image.getframe(2)
+                self.assertTrue(numpy.array_equal(frame.data, self.frames[2]))
+        with fabio.open(self.filename, frame=2) as image:
+            self.assertTrue(numpy.array_equal(image.data, self.frames[2]))
+        stats = self.cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (3, 1))
+
+    def test_tiff_frame(self):
+        filename = os.path.join(UtilsTest.tempdir, "%s.tif" % self.id())
+        fabio.tifimage.TifImage(data=self.frames[0]).write(filename)
+        try:
+            frames = []
+            for _ in range(2):
+                with fabio.open(filename) as image:
+                    frames.append(image.get_frame(0))
+            self.assertEqual(self.cache.stats().hits, 1)
+            self.assertIs(type(frames[0]), type(frames[1]))
+            self.assertEqual(frames[0].header, frames[1].header)
+            self.assertTrue(frames[1].data.flags.writeable)
+            self.assertTrue(numpy.array_equal(frames[1].data, self.frames[0]))
+        finally:
+            self.cache.invalidate(filename)
+            os.unlink(filename)
+
+    def test_frames(self):
+        with fabio.open(self.filename) as image:
+            for num, frame in enumerate(image.frames()):
+                self.assertTrue(numpy.array_equal(frame.data, self.frames[num]))
+        with FileSeries([self.filename, self.filename], fixed_frames=True) as series:
+            frame = series.get_frame(4)
+            self.assertTrue(numpy.array_equal(frame.data, self.frames[1]))
+        stats = self.cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 3))
+
+    def test_disabled(self):
+        self.cache.max_bytes = 0
+        with fabio.open(self.filename) as image:
+            image.get_frame(0)
+            image.get_frame(0)
+        self.assertEqual(self.cache.stats(), framecache.CacheStats(0, 0, 0, 0, 0, 0))
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestFrameCache))
+    testsuite.addTest(loadTests(TestCachedFrames))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
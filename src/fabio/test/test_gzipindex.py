@@ -0,0 +1,130 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Test random access into gzip files"""
+
+import io
+import os
+import gzip
+import unittest
+import logging
+import numpy
+import fabio
+from .utilstest import UtilsTest
+from .. import gzipindex
+from ..fabioutils import GzipFile
+from ..edfimage import EdfImage
+
+logger = logging.getLogger(__name__)
+
+
+class TestGzipIndex(unittest.TestCase):
+    def setUp(self):
+        self.filename = os.path.join(UtilsTest.tempdir, "gzipindex.gz")
+        rng = numpy.random.RandomState(0)
+        self.raw = rng.randint(0, 4, size=2 * 10**6, dtype=numpy.uint8).tobytes()
+        gzipindex.GzipIndex.clear()
+
+    def tearDown(self):
+        gzipindex.GzipIndex.clear()
+        if os.path.exists(self.filename):
+            os.unlink(self.filename)
+
+    def reader(self, index=None):
+        fileobj = open(self.filename, "rb")
+        self.addCleanup(fileobj.close)
+        return io.BufferedReader(gzipindex.IndexedGzipReader(fileobj, index))
+
+    def test_random_access(self):
+        with open(self.filename, "wb") as f:
+            # two members and some padding
+            f.write(gzip.compress(self.raw[:500000], 1))
+            f.write(gzip.compress(self.raw[500000:], 1))
+            f.write(b"\0" * 10)
+        index = gzipindex.GzipIndex(spacing=100000)
+        reader = self.reader(index)
+        self.assertEqual(reader.seek(0, io.SEEK_END), len(self.raw))
+        self.assertEqual(index.size, len(self.raw))
+        self.assertGreater(len(index), 10)
+        for start in (1900000, 5, 1234567, 499990, 0, 1999990):
+            reader.seek(start)
+            self.assertEqual(reader.read(1000), self.raw[start : start + 1000])
+        # a new reader starts from the checkpoints
+        reader = self.reader(index)
+        reader.seek(1500000)
+        self.assertEqual(reader.read(10), self.raw[1500000:1500010])
+        reader.seek(0)
+        self.assertEqual(reader.read(), self.raw)
+
+    def test_truncated(self):
+        with open(self.filename, "wb") as f:
+            f.write(gzip.compress(self.raw, 1)[:100000])
+        reader = self.reader()
+        self.assertRaises(EOFError, reader.read)
+
+    def test_gzipfile(self):
+        with open(self.filename, "wb") as f:
+            f.write(gzip.compress(self.raw, 1))
+        with GzipFile(self.filename, "rb") as f:
+            self.assertIsInstance(f._buffer.raw, gzipindex.IndexedGzipReader)
+            self.assertEqual(f.measure_size(), len(self.raw))
+            self.assertEqual(f.tell(), 0)
+            f.seek(123456)
+            self.assertEqual(f.read(100), self.raw[123456:123556])
+        # the index is shared with the next reader of the file
+        self.assertEqual(gzipindex.GzipIndex.get(self.filename).size, len(self.raw))
+
+    def test_multiframe_edf(self):
+        data = numpy.arange(10 * 300 * 400, dtype=numpy.uint32).reshape(10, 300, 400)
+        edf = EdfImage(data=data[0], header={"motor": 0})
+        for i in range(1, len(data)):
+            edf.append_frame(data=data[i], header={"motor": i})
+        raw = io.BytesIO()
+        for i, frame in enumerate(edf._frames):
+            frame._set_container(edf, i)
+            raw.write(frame.get_edf_block())
+        with open(self.filename, "wb") as f:
+            f.write(gzip.compress(raw.getvalue(), compresslevel=1))
+        filename = self.filename[:-3] + ".edf.gz"
+        os.rename(self.filename, filename)
+        self.filename = filename
+        with fabio.open(filename) as image:
+            self.assertEqual(image.nframes, 10)
+            for i in (9, 2, 7, 0):
+                frame = image.getframe(i)
+                self.assertEqual(frame.header["motor"], str(i))
+                self.assertTrue(numpy.array_equal(frame.data, data[i]))
+        self.assertGreater(len(gzipindex.GzipIndex.get(filename)), 1)
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestGzipIndex))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
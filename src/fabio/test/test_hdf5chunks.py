@@ -0,0 +1,153 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Test the reading of HDF5 datasets chunk by chunk"""
+
+import os
+import unittest
+import logging
+import numpy
+from .utilstest import UtilsTest
+from .. import hdf5chunks
+from ..ext import bitshuffle
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+try:
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+logger = logging.getLogger(__name__)
+
+
+@unittest.skipIf(h5py is None, "h5py is not available")
+class TestDirectChunkReader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = numpy.random.default_rng(0)
+        cls.data = rng.poisson(3, (11, 37, 29)).astype(numpy.uint32)
+        cls.filename = os.path.join(UtilsTest.tempdir, "hdf5chunks.h5")
+        filters = {
+            "gzip": {"compression": "gzip"},
+            "shuffle_gzip": {"compression": "gzip", "shuffle": True},
+            "raw": {},
+        }
+        if hdf5plugin is not None:
+            filters["bitshuffle_lz4"] = hdf5plugin.Bitshuffle()
+            filters["bitshuffle"] = hdf5plugin.Bitshuffle(cname="none")
+            filters["lz4"] = hdf5plugin.LZ4()
+        cls.names = list(filters)
+        with h5py.File(cls.filename, mode="w") as h5:
+            for name, kwargs in filters.items():
+                h5.create_dataset(name, data=cls.data, chunks=(1, 37, 29), **kwargs)
+                h5.create_dataset(
+                    name + "_3", data=cls.data, chunks=(3, 37, 29), **kwargs
+                )
+            h5.create_dataset("contiguous", data=cls.data)
+            h5.create_dataset("big_endian", data=cls.data.astype(">i4"), chunks=(2, 37, 29))
+            ds = h5.create_dataset(
+                "partial", shape=cls.data.shape, dtype=numpy.uint32,
+                chunks=(1, 37, 29), compression="gzip",
+            )
+            ds[:4] = cls.data[:4]
+
+    @classmethod
+    def tearDownClass(cls):
+        os.unlink(cls.filename)
+
+    def test_filters(self):
+        with h5py.File(self.filename, mode="r") as h5:
+            for name in self.names:
+                for suffix in ("", "_3"):
+                    reader = hdf5chunks.DirectChunkReader(h5[name + suffix])
+                    self.assertTrue(reader.supported, name)
+                    for workers in (1, 3):
+                        for start, stop in ((0, 11), (2, 9), (10, 11), (4, 4)):
+                            frames = reader.read_frames(start, stop, workers=workers)
+                            self.assertTrue(
+                                numpy.array_equal(frames, self.data[start:stop]),
+                                (name + suffix, workers, start, stop),
+                            )
+
+    def test_fallback(self):
+        with h5py.File(self.filename, mode="r") as h5:
+            reader = hdf5chunks.DirectChunkReader(h5["contiguous"])
+            self.assertFalse(reader.supported)
+            self.assertTrue(numpy.array_equal(reader.read_frames(3, 8), self.data[3:8]))
+            frames = hdf5chunks.DirectChunkReader(h5["big_endian"]).read_frames(1, 6)
+            self.assertTrue(frames.dtype.isnative)
+            self.assertTrue(numpy.array_equal(frames, self.data[1:6]))
+            frames = hdf5chunks.DirectChunkReader(h5["partial"]).read_frames(2, 8)
+            self.assertTrue(numpy.array_equal(frames[:2], self.data[2:4]))
+            self.assertFalse(frames[2:].any())
+
+    def test_read_frames(self):
+        with h5py.File(self.filename, mode="r") as h5:
+            datasets = [h5["gzip"], self.data[0], h5["raw_3"]]
+            expected = numpy.concatenate([self.data, self.data[:1], self.data])
+            for start, stop in ((0, None), (9, 15), (11, 12), (20, 23)):
+                frames = hdf5chunks.read_frames(datasets, start, stop, workers=2)
+                self.assertTrue(numpy.array_equal(frames, expected[start:stop]))
+            out = numpy.empty((3, 37, 29), dtype=numpy.float64)
+            hdf5chunks.read_frames(h5["shuffle_gzip"], 5, 8, out=out)
+            self.assertTrue(numpy.array_equal(out, self.data[5:8]))
+            with self.assertRaises(IndexError):
+                hdf5chunks.read_frames(datasets, 20, 24)
+
+
+class TestBitshuffle(unittest.TestCase):
+    def test_corrupted(self):
+        data = numpy.arange(100, dtype=numpy.uint16)
+        header = numpy.array([data.nbytes], ">u8").tobytes()
+        header += numpy.array([16], ">u4").tobytes()
+        with self.assertRaises(IOError):
+            bitshuffle.bitshuffle_decompress(header + b"\x00\x00\x00\x05abc", 2)
+        with self.assertRaises(IOError):
+            bitshuffle.lz4_decompress(b"\x00" * 5)
+
+    def test_uncompressed(self):
+        """Bit-transposition of a block, with trailing elements kept as is"""
+        data = numpy.arange(21, dtype=numpy.uint16) * 1234
+        block = data[:16]
+        bits = numpy.unpackbits(block.view(numpy.uint8).reshape(16, 2), axis=1, bitorder="little")
+        shuffled = numpy.packbits(bits.T, axis=1, bitorder="little").tobytes()
+        shuffled += data[16:].tobytes()
+        result = bitshuffle.bitshuffle_decompress(shuffled, 2, data.nbytes, lz4=False)
+        self.assertTrue(numpy.array_equal(result.view(numpy.uint16), data))
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestDirectChunkReader))
+    testsuite.addTest(loadTests(TestBitshuffle))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
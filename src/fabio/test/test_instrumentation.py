@@ -0,0 +1,157 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Test the instrumentation of the reading stages"""
+
+import os
+import unittest
+import logging
+import numpy
+import fabio
+from .utilstest import UtilsTest
+from ..utils import instrumentation
+from ..edfimage import EdfImage
+from ..cbfimage import CbfImage
+from ..tifimage import TifImage
+from ..bruker100image import Bruker100Image
+from ..OXDimage import OxdImage
+from ..esperantoimage import EsperantoImage
+from ..mar345image import Mar345Image
+from ..eigerimage import EigerImage, h5py
+
+logger = logging.getLogger(__name__)
+
+
+class TestInstrumentation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data = numpy.arange(64 * 32, dtype=numpy.int32).reshape(64, 32)
+        cls.cbf = os.path.join(UtilsTest.tempdir, "instrumentation.cbf")
+        CbfImage(data=cls.data).write(cls.cbf)
+        cls.edf = os.path.join(UtilsTest.tempdir, "instrumentation.edf")
+        EdfImage(data=cls.data).write(cls.edf)
+
+    def test_disabled(self):
+        self.assertFalse(instrumentation.is_enabled())
+        stage = instrumentation.stage("io")
+        with stage as st:
+            st.nbytes = 10
+        self.assertIs(stage, instrumentation.stage("other"))
+
+    def test_cbf(self):
+        with instrumentation.record_stages() as recorder:
+            self.assertTrue(instrumentation.is_enabled())
+            image = fabio.open(self.cbf)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertTrue(numpy.array_equal(image.data, self.data))
+        stages = [r.stage for r in recorder.records]
+        for name in ["detect", "header", "io", "md5", "decompress", "convert", "read"]:
+            self.assertIn(name, stages)
+        for record in recorder.records:
+            self.assertEqual(record.codec, "cbfimage")
+            self.assertEqual(record.filename, self.cbf)
+            self.assertGreaterEqual(record.duration, 0)
+        summary = recorder.summary()
+        self.assertEqual(summary["convert"]["nbytes"], self.data.nbytes)
+        self.assertEqual(summary["read"]["count"], 1)
+        self.assertEqual(summary["read"]["nbytes"], self.data.nbytes)
+
+    def test_edf(self):
+        with instrumentation.record_stages() as recorder:
+            image = fabio.open(self.edf)
+            self.assertTrue(numpy.array_equal(image.data, self.data))
+        summary = recorder.summary()
+        for name in ["detect", "header", "io", "convert", "read"]:
+            self.assertIn(name, summary)
+        self.assertEqual(summary["io"]["nbytes"], self.data.nbytes)
+        self.assertEqual(summary["convert"]["nbytes"], self.data.nbytes)
+        self.assertEqual(summary["read"]["nbytes"], self.data.nbytes)
+
+    def test_tiff(self):
+        filename = os.path.join(UtilsTest.tempdir, "instrumentation.tif")
+        data = self.data.astype(numpy.uint16)
+        TifImage(data=data).write(filename)
+        with instrumentation.record_stages() as recorder:
+            image = fabio.open(filename)
+        self.assertTrue(numpy.array_equal(image.data, data))
+        summary = recorder.summary()
+        for name in ["detect", "header", "io", "convert", "read"]:
+            self.assertIn(name, summary)
+        self.assertEqual(summary["io"]["nbytes"], data.nbytes)
+        self.assertEqual(summary["read"]["nbytes"], data.nbytes)
+        self.assertEqual({r.codec for r in recorder.records}, {"tifimage"})
+
+    def test_compressed_codecs(self):
+        # Esperanto and Mar345 images are square
+        data = numpy.arange(256 * 256, dtype=numpy.int32).reshape(256, 256) % 1000
+        codecs = [
+            (Bruker100Image, "sfrm"),
+            (OxdImage, "img"),
+            (EsperantoImage, "esperanto"),
+            (Mar345Image, "mar3450"),
+        ]
+        if h5py is not None:
+            codecs.append((EigerImage, "h5"))
+        for codec, extension in codecs:
+            with self.subTest(codec=codec.codec_name()):
+                filename = os.path.join(
+                    UtilsTest.tempdir, "instrumentation.%s" % extension
+                )
+                image = codec(data=data)
+                if codec is Mar345Image:
+                    image.byteorder = "<"
+                image.write(filename)
+                with instrumentation.record_stages() as recorder:
+                    image = codec().read(filename)
+                self.assertTrue(numpy.array_equal(image.data, data))
+                summary = recorder.summary()
+                for name in ["header", "io"]:
+                    self.assertIn(name, summary)
+                self.assertGreater(summary["io"]["nbytes"], 0)
+                for record in recorder.records:
+                    self.assertEqual(record.codec, codec.codec_name())
+
+    def test_failing_listener(self):
+        def listener(record):
+            raise RuntimeError("expected")
+
+        instrumentation.add_listener(listener)
+        try:
+            with self.assertLogs(instrumentation.logger, "ERROR"):
+                fabio.open(self.cbf)
+        finally:
+            instrumentation.remove_listener(listener)
+        self.assertFalse(instrumentation.is_enabled())
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestInstrumentation))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
@@ -30,10 +30,24 @@
 Jerome Kieffer, 04/12/2014
 """
 
+import os
 import unittest
 import logging
-from fabio.openimage import openheader
+import numpy
+import fabio
+from fabio.openimage import openheader, openheaders
 from .utilstest import UtilsTest
+from ..cbfimage import CbfImage
+from ..edfimage import EdfImage
+from ..tifimage import TifImage
+from ..eigerimage import EigerImage
+from ..limaimage import LimaImage
+from ..lambdaimage import LambdaImage
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
 
 logger = logging.getLogger(__name__)
 
@@ -55,10 +69,101 @@ class Test1(unittest.TestCase):
             )
 
 
+class TestHeaderOnly(unittest.TestCase):
+    """openheader reads the header without the data"""
+
+    def setUp(self):
+        self.data = numpy.arange(60 * 50, dtype=numpy.int32).reshape(60, 50)
+        self.files = []
+
+    def tearDown(self):
+        for filename in self.files:
+            if os.path.exists(filename):
+                os.unlink(filename)
+
+    def write(self, image, name):
+        filename = os.path.join(UtilsTest.tempdir, name)
+        image.write(filename)
+        self.files.append(filename)
+        return filename
+
+    def test_cbf_truncated(self):
+        """the header of a CBF is read even if the data are missing"""
+        header = {"_array_data.header_contents": "# Exposure_time 0.5 s"}
+        filename = self.write(CbfImage(self.data, header), "header_only.cbf")
+        with open(filename, "rb") as f:
+            raw = f.read()
+        with open(filename, "wb") as f:
+            f.write(raw[: raw.index(CbfImage.STARTER) + len(CbfImage.STARTER)])
+        obj = openheader(filename)
+        self.assertEqual(obj.shape, self.data.shape)
+        self.assertEqual(obj.header["X-Binary-Size-Fastest-Dimension"], "50")
+        # the binary section never starts
+        with open(filename, "wb") as f:
+            f.write(raw[: raw.index(CbfImage.STARTER)])
+        self.assertRaises(IOError, openheader, filename)
+
+    def test_tif(self):
+        """the header of a TIFF is read from its image file directory"""
+        filename = self.write(TifImage(self.data), "header_only.tif")
+        obj = openheader(filename)
+        self.assertEqual(obj.shape, self.data.shape)
+        self.assertEqual(obj.nbits, 32)
+        self.assertEqual(dict(obj.header), dict(fabio.open(filename).header))
+
+    def test_hdf5_stacks(self):
+        """the HDF5 stacks are located without reading any frame"""
+        if h5py is None:
+            self.skipTest("h5py is not available")
+        stack = numpy.arange(3 * 60 * 50, dtype=numpy.uint16).reshape(3, 60, 50)
+        for codec in (EigerImage, LimaImage, LambdaImage):
+            image = codec()
+            for index, frame in enumerate(stack):
+                image.set_data(frame, index)
+            filename = self.write(image, "header_only_%s.h5" % codec.__name__)
+            obj = openheader(filename)
+            self.assertIsInstance(obj, codec)
+            self.assertEqual(obj.nframes, 3)
+            self.assertEqual(obj.shape, (60, 50))
+            self.assertEqual(obj.dtype, numpy.uint16)
+            self.assertEqual(
+                dict(obj.header), dict(fabio.open(filename).header), codec.__name__
+            )
+            # the data are still reachable
+            self.assertTrue(numpy.array_equal(obj.data, stack[0]))
+            obj.close()
+
+    def test_openheaders(self):
+        filenames = []
+        for index in range(5):
+            header = {"index": str(index)}
+            filenames.append(
+                self.write(EdfImage(self.data, header), "header_%i.edf" % index)
+            )
+        images = openheaders(filenames, workers=3)
+        self.assertEqual([i.header["index"] for i in images], list("01234"))
+        self.assertEqual([i.filename for i in images], filenames)
+        self.assertTrue(all(i.shape == self.data.shape for i in images))
+
+        # a corrupt file does not stop the others
+        corrupt = os.path.join(UtilsTest.tempdir, "header_corrupt.edf")
+        with open(corrupt, "wb") as f:
+            f.write(b"{\nEDF_DataBlockID = 0.Image.Psd ;\n")
+        self.files.append(corrupt)
+        images = openheaders(filenames[:2] + [corrupt] + filenames[2:], workers=3)
+        self.assertEqual(len(images), 6)
+        self.assertIsInstance(images[2], Exception)
+        self.assertEqual(
+            [i.header["index"] for i in images if not isinstance(i, Exception)],
+            list("01234"),
+        )
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
     testsuite.addTest(loadTests(Test1))
+    testsuite.addTest(loadTests(TestHeaderOnly))
     return testsuite
 
 
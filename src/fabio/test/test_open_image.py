@@ -35,7 +35,12 @@ Jerome Kieffer 04/12/2014
 import unittest
 import logging
 import io
-from fabio.openimage import openimage
+import os
+import unittest.mock
+import numpy
+from fabio import openimage as openimage_module
+from fabio.openimage import openimage, read_stack
+from fabio.cbfimage import CbfImage
 from fabio.edfimage import EdfImage
 from fabio.marccdimage import MarccdImage
 from fabio.fit2dmaskimage import Fit2dMaskImage
@@ -299,6 +304,108 @@ class TestOpenOxd(unittest.TestCase):
         self.assertEqual(ref.dtype, fimg.dtype, "dtype matches")
 
 
+class TestMagic(unittest.TestCase):
+    """Format detection from the magic number"""
+
+    def test_dispatch_table(self):
+        """The dispatch table gives the same verdict as a linear scan"""
+        for magic, _ in openimage_module.MAGIC_NUMBERS:
+            byts = magic + b"\x00" * 20
+            expected = None
+            for other, format_type in openimage_module.MAGIC_NUMBERS:
+                if byts.startswith(other):
+                    expected = format_type
+                    break
+            if "/" in expected:
+                continue
+            self.assertEqual(openimage_module._do_magic(byts), expected)
+        self.assertRaises(Exception, openimage_module._do_magic, b"")
+        self.assertRaises(Exception, openimage_module._do_magic, b"\x01\x02\x03")
+
+    def test_stream(self):
+        filename = os.path.join(UtilsTest.tempdir, "magic_stream.edf")
+        data = numpy.arange(12, dtype=numpy.uint16).reshape(3, 4)
+        EdfImage(data=data).write(filename)
+        with open(filename, "rb") as f:
+            raw = f.read()
+
+        stream = io.BytesIO(raw)
+        stream.seek(5)
+        obj = openimage_module._openimage(stream)
+        self.assertIsInstance(obj, EdfImage)
+        self.assertEqual(stream.tell(), 0)
+
+        class Unseekable(io.BufferedReader):
+            def seek(self, *args):
+                raise io.UnsupportedOperation("seek")
+
+        stream = Unseekable(io.BytesIO(raw))
+        obj = openimage_module._openimage(stream)
+        self.assertIsInstance(obj, EdfImage)
+        self.assertEqual(stream.read(), raw)
+
+    def test_hdf5_flavour_cache(self):
+        filename = os.path.join(UtilsTest.tempdir, "magic_flavour.h5")
+        with open(filename, "wb") as f:
+            f.write(b"\x89HDF\r\n\x1a\n")
+        with unittest.mock.patch.object(
+            openimage_module, "_read_hdf5_flavour", return_value="eiger"
+        ) as reader:
+            for _ in range(3):
+                self.assertEqual(openimage_module._get_hdf5_flavour(filename), "eiger")
+            self.assertEqual(reader.call_count, 1)
+            # A modified file is inspected again
+            stat = os.stat(filename)
+            os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            openimage_module._get_hdf5_flavour(filename)
+            self.assertEqual(reader.call_count, 2)
+
+
+class TestReadStack(unittest.TestCase):
+    """read_stack of a series of single-frame files"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tempdir = os.path.join(UtilsTest.tempdir, cls.__name__)
+        os.makedirs(cls.tempdir, exist_ok=True)
+        shape = (37, 53)
+        cls.data = numpy.random.randint(-100, 2**20, size=(5,) + shape).astype(
+            numpy.int32
+        )
+        cls.cbf_files = []
+        cls.edf_files = []
+        for i, frame in enumerate(cls.data):
+            filename = os.path.join(cls.tempdir, "frame_%04i.cbf" % i)
+            CbfImage(data=frame).write(filename)
+            cls.cbf_files.append(filename)
+            filename = os.path.join(cls.tempdir, "frame_%04i.edf" % i)
+            EdfImage(data=frame).write(filename)
+            cls.edf_files.append(filename)
+
+    def test_cbf(self):
+        stack = read_stack(self.cbf_files, workers=3)
+        self.assertEqual(stack.dtype, numpy.int32)
+        self.assertTrue(numpy.array_equal(stack, self.data))
+
+    def test_edf(self):
+        stack = read_stack(self.edf_files, workers=1)
+        self.assertTrue(numpy.array_equal(stack, self.data))
+
+    def test_out(self):
+        for dtype in (numpy.int32, numpy.int64, numpy.float32):
+            out = numpy.zeros(self.data.shape, dtype=dtype)
+            stack = read_stack(self.cbf_files, out=out, workers=2)
+            self.assertIs(stack, out)
+            self.assertTrue(numpy.array_equal(out, self.data), dtype)
+
+    def test_shape_mismatch(self):
+        out = numpy.zeros((5, 10, 10), dtype=numpy.int32)
+        self.assertRaises(ValueError, read_stack, self.cbf_files, out=out)
+        self.assertRaises(ValueError, read_stack, self.edf_files, out=out)
+        out = numpy.zeros((4,) + self.data.shape[1:], dtype=numpy.int32)
+        self.assertRaises(ValueError, read_stack, self.cbf_files, out=out)
+
+
 def suite():
     loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
     testsuite = unittest.TestSuite()
@@ -308,6 +415,8 @@ def suite():
     testsuite.addTest(loadTests(TestOpenMask))
     testsuite.addTest(loadTests(TestOpenMccd))
     testsuite.addTest(loadTests(TestOpenOxd))
+    testsuite.addTest(loadTests(TestMagic))
+    testsuite.addTest(loadTests(TestReadStack))
     return testsuite
 
 
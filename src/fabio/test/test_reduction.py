@@ -0,0 +1,162 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Test the reductions over the frames of a stack"""
+
+import os
+import unittest
+import logging
+import numpy
+from .utilstest import UtilsTest
+from .. import reduction
+from ..edfimage import EdfImage
+from ..file_series import FileSeries
+
+logger = logging.getLogger(__name__)
+
+
+class TestReduction(unittest.TestCase):
+    def setUp(self):
+        rng = numpy.random.default_rng(0)
+        self.stack = rng.integers(0, 60000, (37, 30, 20)).astype(numpy.uint16)
+        self.dark = rng.normal(100, 10, (30, 20)).astype(numpy.float32)
+        self.flat = rng.uniform(0.5, 1.5, (30, 20)).astype(numpy.float32)
+
+    def edf_file(self):
+        filename = os.path.join(UtilsTest.tempdir, "%s.edf" % self.id())
+        image = EdfImage(data=self.stack[0])
+        for frame in self.stack[1:]:
+            image.append_frame(data=frame)
+        image.write(filename)
+        self.addCleanup(os.unlink, filename)
+        return filename
+
+    def expected(self, operation, stack):
+        if operation == "var":
+            return stack.astype(numpy.float64).var(axis=0)
+        if operation in ("sum", "mean"):
+            return getattr(stack.astype(numpy.float64), operation)(axis=0)
+        return getattr(numpy, operation)(stack, axis=0)
+
+    def check(self, source, stack, **kwargs):
+        for operation in reduction.OPERATIONS:
+            result = reduction.reduce_frames(source, operation, **kwargs)
+            expected = self.expected(operation, stack)
+            self.assertEqual(result.shape, stack.shape[1:])
+            numpy.testing.assert_allclose(result, expected, rtol=1e-5, err_msg=operation)
+
+    def test_array(self):
+        for workers in (1, 4):
+            for chunk_size in (1, 5, 100):
+                self.check(self.stack, self.stack, workers=workers, chunk_size=chunk_size)
+        self.assertEqual(reduction.max_frames(self.stack).dtype, numpy.uint16)
+
+    def test_image(self):
+        filename = self.edf_file()
+        with EdfImage().read(filename) as image:
+            self.check(image, self.stack, chunk_size=8, workers=3)
+
+    def test_iterable(self):
+        filename = self.edf_file()
+        frames = [EdfImage(data=frame) for frame in self.stack[:5]]
+        stack = numpy.concatenate([self.stack[:5], self.stack])
+        self.check(frames + [filename], stack, chunk_size=4, workers=2)
+
+    def test_file_series(self):
+        filenames = []
+        for index, frame in enumerate(self.stack[:6]):
+            filename = os.path.join(UtilsTest.tempdir, "%s_%04d.edf" % (self.id(), index))
+            EdfImage(data=frame).write(filename)
+            filenames.append(filename)
+            self.addCleanup(os.unlink, filename)
+        with FileSeries(filenames, prefetch=2) as series:
+            self.check(series, self.stack[:6], chunk_size=4)
+
+    def test_get_frames(self):
+        """Images reading several frames at once"""
+        try:
+            from ..eigerimage import EigerImage
+            image = EigerImage(data=self.stack)
+        except RuntimeError as error:
+            self.skipTest(str(error))
+        self.check(image, self.stack, chunk_size=10)
+
+    def test_correction(self):
+        corrected = (self.stack.astype(numpy.float32) - self.dark) / self.flat
+        for operation in reduction.OPERATIONS:
+            result = reduction.reduce_frames(
+                self.stack, operation, dark=self.dark, flat=self.flat, chunk_size=7
+            )
+            expected = self.expected(operation, corrected)
+            numpy.testing.assert_allclose(result, expected, rtol=1e-4, err_msg=operation)
+        frames = list(reduction.correct_frames(self.stack, dark=self.dark))
+        numpy.testing.assert_allclose(frames, self.stack - self.dark, rtol=1e-6)
+
+    def test_out(self):
+        out = numpy.full((30, 20), 7, dtype=numpy.int64)
+        result = reduction.sum_frames(self.stack, out=out, chunk_size=10)
+        self.assertIs(result, out)
+        self.assertTrue(numpy.array_equal(out, self.stack.sum(axis=0, dtype=numpy.int64)))
+        out = numpy.empty((30, 20), dtype=numpy.float32)
+        reduction.median_frames(self.stack, out=out, workers=2)
+        numpy.testing.assert_allclose(out, numpy.median(self.stack, axis=0))
+        with self.assertRaises(ValueError):
+            reduction.mean_frames(self.stack, out=numpy.empty((20, 30)))
+
+    def test_var_out(self):
+        expected = self.expected("var", self.stack)
+        for dtype in (numpy.int32, numpy.uint64, numpy.float32):
+            out = numpy.full((30, 20), 7, dtype=dtype)
+            result = reduction.var_frames(self.stack, out=out, chunk_size=10, workers=2)
+            self.assertIs(result, out)
+            numpy.testing.assert_allclose(out, expected.astype(dtype), rtol=1e-6)
+        result = reduction.var_frames(self.stack, dtype=numpy.int64)
+        self.assertEqual(result.dtype, numpy.int64)
+        numpy.testing.assert_allclose(result, expected.astype(numpy.int64))
+
+    def test_median_of_n(self):
+        result = reduction.median_frames(self.stack, nframes=5)
+        self.assertTrue(numpy.array_equal(result, numpy.median(self.stack[:5], axis=0)))
+        result = reduction.median_frames(iter(self.stack), nframes=3, chunk_size=2)
+        self.assertTrue(numpy.array_equal(result, numpy.median(self.stack[:3], axis=0)))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            reduction.sum_frames([])
+        with self.assertRaises(ValueError):
+            reduction.reduce_frames(self.stack, "mode")
+        with self.assertRaises(ValueError):
+            reduction.sum_frames([self.stack[0], self.stack[0, :10]])
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestReduction))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
@@ -0,0 +1,228 @@
+# coding: utf-8
+#
+#    Project: FabIO X-ray image reader
+#
+#    Copyright (C) 2010-2026 European Synchrotron Radiation Facility
+#                       Grenoble, France
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+"""Test the reading of regions of interest from uncompressed frames"""
+
+import os
+import gzip
+import struct
+import unittest
+import logging
+import numpy
+from .utilstest import UtilsTest
+from ..fabioimage import RawLayout, _read_raw_roi
+from ..edfimage import EdfImage
+from ..brukerimage import BrukerImage
+from ..tifimage import TifImage
+from ..pilatusimage import PilatusImage
+from ..numpyimage import NumpyImage
+from ..binaryimage import BinaryImage
+from ..GEimage import GeImage, GE_HEADER_INFO
+from ..mrcimage import MrcImage
+from ..raxisimage import RaxisImage, RIGAKU_KEYS
+
+logger = logging.getLogger(__name__)
+
+SLICES = [
+    (slice(10, 50), slice(20, 300)),
+    (slice(None, None, 3), slice(5, 380, 7)),
+    (slice(250, 10, -2), slice(390, 3, -5)),
+    (slice(0, 0), slice(1, 5)),
+    (slice(299, None), slice(None)),
+]
+
+
+class TestReadROI(unittest.TestCase):
+    def setUp(self):
+        rng = numpy.random.default_rng(0)
+        self.data = rng.integers(0, 60000, (300, 400)).astype(numpy.uint16)
+
+    def filename(self, extension):
+        return os.path.join(UtilsTest.tempdir, "%s.%s" % (self.id(), extension))
+
+    def check_roi(self, cls, filename, reference, frame=None):
+        for coords in SLICES:
+            image = cls()
+            roi = image.readROI(filename, frame, coords)
+            expected = reference[coords]
+            self.assertEqual(roi.dtype, expected.dtype, coords)
+            self.assertTrue(numpy.array_equal(roi, expected), coords)
+            # the full frame is read on demand
+            self.assertTrue(numpy.array_equal(image.data, reference), coords)
+            self.assertEqual(image.data.dtype, reference.dtype, coords)
+            self.assertIs(image.roi, roi)
+
+    def test_written(self):
+        for cls, extension in (
+            (EdfImage, "edf"),
+            (BrukerImage, "gfrm"),
+            (TifImage, "tif"),
+            (PilatusImage, "tif"),
+            (NumpyImage, "npy"),
+        ):
+            filename = self.filename(cls.__name__ + "." + extension)
+            cls(data=self.data).write(filename)
+            reference = cls().read(filename).data
+            self.check_roi(cls, filename, reference)
+            os.unlink(filename)
+
+    def test_edf_frames(self):
+        filename = self.filename("edf")
+        image = EdfImage(data=self.data)
+        image.append_frame(data=(self.data // 2).astype(numpy.float32))
+        image.write(filename)
+        self.check_roi(EdfImage, filename, (self.data // 2).astype(numpy.float32), 1)
+        image = EdfImage()
+        image.readROI(filename, 1, SLICES[0])
+        self.assertEqual(image.header["DataType"], "FloatValue")
+        self.assertTrue(numpy.array_equal(image.getframe(0).data, self.data))
+        self.assertTrue(numpy.array_equal(image.get_frame(1).data, self.data // 2))
+        image.close()
+
+    def test_raxis(self):
+        filename = self.filename("img")
+        header = b""
+        values = {"X Pixels": 400, "Y Pixels": 300, "Photomultiplier Ratio": 8.0}
+        for key, kind in RIGAKU_KEYS.items():
+            if kind == "float":
+                header += struct.pack(">f", values.get(key, 0))
+            elif kind == "long":
+                header += struct.pack(">l", values.get(key, 0))
+            elif kind > 0:
+                header += bytes(kind)
+        data = self.data // 2
+        for with_pm in (False, True):
+            if with_pm:
+                # a photomultiplier pixel outside of all the ROIs
+                data[5, 0] = 0x8000 + 100
+            with open(filename, "wb") as f:
+                f.write(header.ljust(1400, b"\x00"))
+                f.write(data.astype(">u2").tobytes())
+            reference = RaxisImage().read(filename).data
+            self.assertEqual(reference.dtype.type, numpy.uint32 if with_pm else numpy.uint16)
+            self.check_roi(RaxisImage, filename, reference)
+
+    def test_bruker_overflows(self):
+        filename = self.filename("gfrm")
+        data = (self.data // 256).astype(numpy.uint32)
+        data[12, 30] = 70000
+        data[12, 31] = 4000000
+        data[200, 100] = 300
+        BrukerImage(data=data).write(filename)
+        self.check_roi(BrukerImage, filename, data)
+
+    def test_numpy_stack(self):
+        filename = self.filename("npy")
+        stack = numpy.stack([self.data, self.data[::-1]]).astype(">i4")
+        numpy.save(filename, stack)
+        self.check_roi(NumpyImage, filename, stack[1], 1)
+
+    def test_binary(self):
+        filename = self.filename("bin")
+        with open(filename, "wb") as f:
+            f.write(b"garbage")
+            f.write(self.data.astype(">u2").tobytes())
+        for coords in SLICES:
+            roi = BinaryImage().readROI(
+                filename, 400, 300, coords, offset=-1, bytecode="uint16", endian=">"
+            )
+            self.assertTrue(numpy.array_equal(roi, self.data[coords]), coords)
+
+    def test_ge(self):
+        filename = self.filename("ge")
+        values = {
+            "ImageFormat": b"synthetic!",
+            "StandardHeaderSizeInBytes": 8192,
+            "UserHeaderSizeInBytes": 0,
+            "NumberOfRowsInFrame": 300,
+            "NumberOfColsInFrame": 400,
+            "ImageDepthInBits": 16,
+            "NumberOfFrames": 2,
+        }
+        header = b""
+        for name, nbytes, fmt in GE_HEADER_INFO:
+            value = values.get(name, 0)
+            if fmt is None:
+                header += bytes(value).ljust(nbytes, b"\x00") if value else bytes(nbytes)
+            else:
+                header += struct.pack(fmt, value)
+        with open(filename, "wb") as f:
+            f.write(header.ljust(8192, b"\x00"))
+            f.write(self.data[::-1].astype("<u2").tobytes())
+            f.write(self.data.astype("<u2").tobytes())
+        self.check_roi(GeImage, filename, GeImage().read(filename, 1).data, 1)
+        self.check_roi(GeImage, filename, self.data, 1)
+
+    def test_mrc(self):
+        filename = self.filename("mrc")
+        header = numpy.zeros(56, dtype=numpy.int32)
+        header[:4] = 400, 300, 2, 6  # NX, NY, NZ, MODE (uint16)
+        header[23] = 16  # NSYMBT
+        header[52] = numpy.frombuffer(b"MAP ", numpy.int32)[0]
+        with open(filename, "wb") as f:
+            f.write(header.tobytes())
+            f.write(b" " * 800)
+            f.write(b"\x00" * 16)
+            f.write(self.data[::-1].tobytes())
+            f.write(self.data.tobytes())
+        self.check_roi(MrcImage, filename, MrcImage().read(filename, 1).data, 1)
+        self.check_roi(MrcImage, filename, self.data, 1)
+
+    def test_read_raw_roi(self):
+        """Rows far apart are read one by one, missing bytes are zeros"""
+        filename = self.filename("raw")
+        data = numpy.arange(64 * 40000, dtype=numpy.float64).reshape(64, 40000)
+        with open(filename, "wb") as f:
+            f.write(b"header")
+            f.write(data.tobytes()[:-8])
+        expected = data.astype(numpy.float32)
+        expected[-1, -1] = 0
+        layout = RawLayout(6, data.shape, numpy.float64, numpy.float32)
+        for coords in SLICES + [(slice(None), slice(39000, None))]:
+            roi = _read_raw_roi(filename, layout, coords)
+            self.assertEqual(roi.dtype, numpy.float32)
+            self.assertTrue(numpy.array_equal(roi, expected[coords]), coords)
+
+    def test_compressed(self):
+        """Compressed files fall back on reading the full frame"""
+        filename = self.filename("edf")
+        EdfImage(data=self.data).write(filename)
+        with open(filename, "rb") as src, gzip.open(filename + ".gz", "wb") as dst:
+            dst.write(src.read())
+        image = EdfImage()
+        roi = image.readROI(filename + ".gz", None, SLICES[0])
+        self.assertTrue(numpy.array_equal(roi, self.data[SLICES[0]]))
+        self.assertIsNotNone(image.data)
+
+
+def suite():
+    loadTests = unittest.defaultTestLoader.loadTestsFromTestCase
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(loadTests(TestReadROI))
+    return testsuite
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner()
+    runner.run(suite())
@@ -31,7 +31,9 @@ Test to check TiffIO
 
 import unittest
 import os
+import io
 import logging
+import unittest.mock
 import numpy
 from .utilstest import UtilsTest
 from ..TiffIO import TiffIO
@@ -87,6 +89,49 @@ class TestTiffIO(unittest.TestCase):
             data = tif.getImage(i)[0, 0:10]
             logger.info("data [0, 0:10] = %s", data)
 
+    def test_packbits(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("PIL is not available")
+        rng = numpy.random.default_rng(0)
+        data = rng.integers(0, 4, (300, 200)).astype(numpy.uint16)
+        data[50:60] = 7
+        for strip_size in (None, 4096):
+            filename = os.path.join(
+                UtilsTest.tempdir, "%s_%s.tiff" % (self.id(), strip_size)
+            )
+            kwargs = {"compression": "packbits"}
+            if strip_size is not None:
+                kwargs["strip_size"] = strip_size
+            Image.fromarray(data).save(filename, **kwargs)
+            for workers in (None, 3):
+                with TiffIO(filename, workers=workers) as tif:
+                    self.assertEqual(tif.getInfo(0)["compression_type"], 32773)
+                    self.assertTrue(numpy.array_equal(tif.getData(0), data))
+            with open(filename, "rb") as stream:
+                tif = TiffIO(io.BytesIO(stream.read()))
+                self.assertTrue(numpy.array_equal(tif.getData(0, workers=2), data))
+
+    def test_packbits_truncated(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("PIL is not available")
+        data = numpy.arange(300 * 200, dtype=numpy.uint16).reshape(300, 200)
+        filename = os.path.join(UtilsTest.tempdir, "%s.tiff" % self.id())
+        Image.fromarray(data).save(filename, compression="packbits", strip_size=4096)
+        getStripReader = TiffIO._getStripReader
+
+        def truncatedReader(tif, fd):
+            readBytes = getStripReader(tif, fd)
+            return lambda offset, nBytes: readBytes(offset, nBytes)[: nBytes // 2]
+
+        with unittest.mock.patch.object(TiffIO, "_getStripReader", truncatedReader):
+            for workers in (None, 3):
+                with TiffIO(filename, workers=workers) as tif:
+                    self.assertRaises(IOError, tif.getData, 0)
+
 
 def suite():
     loader = unittest.defaultTestLoader.loadTestsFromTestCase
@@ -49,10 +49,10 @@ __status__ = "stable"
 
 import time
 import logging
-import numpy
 from .utils import pilutils
 from . import fabioimage
 from . import TiffIO
+from .utils import instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -99,15 +99,28 @@ class TifImage(fabioimage.FabioImage):
 
     def _readheader(self, infile):
         """
-        Try to read Tiff images header...
+        Read the header of the first image from its image file directory,
+        without reading the pixels.
         """
-        header = numpy.frombuffer(infile.read(64), numpy.uint16)
-        # TODO: this values dim1/dim2 looks to be wrong
-        dim1 = int(header[9])
-        dim2 = int(header[15])
-        self._shape = dim2, dim1
-        # nbits is not a FabioImage attribute...
-        self.nbits = int(header[21])  # number of bits
+        self.header = self.check_header()
+        if _USE_TIFFIO:
+            try:
+                tiffIO = TiffIO.TiffIO(infile)
+                self._nframes = tiffIO.getNumberOfImages()
+                if self._nframes > 0:
+                    info = tiffIO.getInfo(0)
+                    self.header = self._create_frame(None, info).header
+                    self._shape = info["nRows"], info["nColumns"]
+                    self.nbits = info["nBits"]
+                return
+            except Exception as error:
+                logger.debug("Unable to read the header with TiffIO: %s", error)
+                infile.seek(0)
+        if _USE_PIL and PIL is not None:
+            # PIL only parses the tags until the pixels are requested
+            pilimage = PIL.Image.open(infile)
+            self.header = self._read_header_from_pil(pilimage)
+            self._shape = pilimage.size[::-1]
 
     def _create_frame(self, image_data, tiff_header):
         """Create exposed data from TIFF information"""
@@ -127,11 +140,15 @@ class TifImage(fabioimage.FabioImage):
         return header
 
     def _read_with_tiffio(self, infile):
-        tiffIO = TiffIO.TiffIO(infile)
-        self._nframes = tiffIO.getNumberOfImages()
+        codec = self.codec_name()
+        with instrumentation.stage("header", codec, infile):
+            tiffIO = TiffIO.TiffIO(infile, codec_name=codec)
+            self._nframes = tiffIO.getNumberOfImages()
+            if self.nframes > 0:
+                # No support for now of multi-frame tiff images
+                header = tiffIO.getInfo(0)
         if self.nframes > 0:
-            # No support for now of multi-frame tiff images
-            header = tiffIO.getInfo(0)
+            self.nbits = header["nBits"]
             data = tiffIO.getData(0)
             frame = self._create_frame(data, header)
             self.header = frame.header
@@ -150,6 +167,21 @@ class TifImage(fabioimage.FabioImage):
             )
         self.lib = "TiffIO"
 
+    def _get_raw_layout(self, infile, frame=None):
+        """Locate the pixels of uncompressed images, as read by TiffIO"""
+        if not _USE_TIFFIO:
+            return None
+        tiffIO = TiffIO.TiffIO(infile)
+        if frame is None:
+            frame = 0
+        layout = tiffIO.getRawLayout(frame)
+        if layout is None:
+            return None
+        self._nframes = tiffIO.getNumberOfImages()
+        self.header = self._create_frame(None, tiffIO.getInfo(frame)).header
+        self.lib = "TiffIO"
+        return fabioimage.RawLayout(*layout)
+
     def _read_with_pil(self, infile):
         pilimage = PIL.Image.open(infile)
         header = self._read_header_from_pil(pilimage)
@@ -165,9 +197,7 @@ class TifImage(fabioimage.FabioImage):
         Wrapper for TiffIO.
         """
         infile = self._open(fname, "rb")
-        self._readheader(infile)
         self.lib = None
-        infile.seek(0)
 
         if _USE_TIFFIO:
             try:
@@ -228,6 +258,11 @@ class TifImage(fabioimage.FabioImage):
             return frame
         raise IndexError("getframe out of range")
 
+    def _get_cached_frame(self, num, data, header):
+        if self._tiffio is None:
+            return super(TifImage, self)._get_cached_frame(num, data, header)
+        return self._create_frame(data, self._tiffio.getInfo(num))
+
     def getframe(self, num):
         """Returns the frame `num`.
 
@@ -0,0 +1,205 @@
+# coding: utf-8
+# /*##########################################################################
+#
+# Copyright (c) 2016-2024 European Synchrotron Radiation Facility
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+# ###########################################################################*/
+"""Opt-in instrumentation of the reading stages of the codecs
+
+Codecs wrap their stages (format detection, header parsing, raw I/O,
+decompression, dtype conversion, checksum...) into :func:`stage`. Nothing is
+measured unless a listener is registered, in which case each stage emits a
+:class:`StageRecord` with its duration and the amount of bytes it handled.
+
+.. code-block:: python
+
+    from fabio.utils import instrumentation
+
+    with instrumentation.record_stages() as recorder:
+        fabio.open("image.cbf").data
+    for record in recorder.records:
+        print(record.stage, record.duration, record.nbytes)
+
+Listeners are process-wide: they receive the stages of all threads.
+"""
+
+__authors__ = ["Jérôme Kieffer"]
+__license__ = "MIT"
+__date__ = "17/10/2026"
+
+import collections
+import contextlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+StageRecord = collections.namedtuple(
+    "StageRecord", ["codec", "filename", "stage", "duration", "nbytes", "thread"]
+)
+"""Measurement of a stage: name of the codec and of the file, name of the
+stage, duration in seconds, number of bytes handled (or None) and identifier
+of the thread"""
+
+_listeners = []
+"""Registered callables, receiving a StageRecord for each stage"""
+
+
+def add_listener(callback):
+    """Register a callable which will receive a StageRecord for each stage
+
+    :param callable callback: function taking a StageRecord
+    """
+    global _listeners
+    # Replace the list, so that stages being emitted are not disturbed
+    _listeners = _listeners + [callback]
+
+
+def remove_listener(callback):
+    """Unregister a callable registered with :func:`add_listener`"""
+    global _listeners
+    _listeners = [i for i in _listeners if i is not callback]
+
+
+def is_enabled():
+    """Returns True if stages are measured"""
+    return bool(_listeners)
+
+
+class _NullStage(object):
+    """Stage doing nothing, used when instrumentation is disabled"""
+
+    __slots__ = ("codec", "filename", "nbytes")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage(object):
+    """Stage measuring its duration and emitting it to the listeners"""
+
+    __slots__ = ("codec", "filename", "name", "nbytes", "_start")
+
+    def __init__(self, name, codec, filename, nbytes):
+        self.name = name
+        self.codec = codec
+        self.filename = filename
+        self.nbytes = nbytes
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, tb):
+        duration = time.perf_counter() - self._start
+        filename = self.filename
+        if filename is not None and not isinstance(filename, str):
+            filename = getattr(filename, "name", str(filename))
+        record = StageRecord(
+            self.codec,
+            filename,
+            self.name,
+            duration,
+            self.nbytes,
+            threading.get_ident(),
+        )
+        for callback in _listeners:
+            try:
+                callback(record)
+            except Exception:
+                logger.error("Instrumentation listener failed", exc_info=True)
+        return False
+
+
+def stage(name, codec=None, filename=None, nbytes=None):
+    """Returns a context manager measuring a stage of a codec.
+
+    The amount of bytes handled (and the codec) can be set on the returned
+    object when only known at the end of the stage.
+
+    .. code-block:: python
+
+        with instrumentation.stage("io", "cbfimage", filename) as st:
+            raw = f.read()
+            st.nbytes = len(raw)
+
+    :param str name: name of the stage ("detect", "header", "io",
+        "decompress", "convert", "md5", "read"...)
+    :param str codec: name of the codec
+    :param str filename: name of the file
+    :param int nbytes: number of bytes handled, if known at the start
+    """
+    if not _listeners:
+        return _NULL_STAGE
+    return _Stage(name, codec, filename, nbytes)
+
+
+class StageRecorder(object):
+    """Listener storing the records of the stages"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self):
+        """Returns the cumulated duration, bytes and count of each stage
+
+        :return: dict indexed by stage name of dict with "count", "duration"
+            and "nbytes"
+        """
+        result = collections.OrderedDict()
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            item = result.setdefault(
+                record.stage, {"count": 0, "duration": 0.0, "nbytes": 0}
+            )
+            item["count"] += 1
+            item["duration"] += record.duration
+            if record.nbytes is not None:
+                item["nbytes"] += record.nbytes
+        return result
+
+
+@contextlib.contextmanager
+def record_stages():
+    """Context manager recording the stages of all the reads done inside.
+
+    :rtype: StageRecorder
+    """
+    recorder = StageRecorder()
+    add_listener(recorder)
+    try:
+        yield recorder
+    finally:
+        remove_listener(recorder)